@@ -1,9 +1,16 @@
-from typing import Optional, List, Union
+from typing import Optional, List, Tuple, Union
 from analisador_lexico import Token
+from tabela_de_simbolos import Simbolo
 
 
 class ASTNode:
-    """Nó base para todos os nós da AST."""
+    """Nó base para todos os nós da AST.
+
+    Os nós de expressão guardam em `tipo_resolvido` o tipo calculado pelo
+    AnalisadorSemantico; os de variável guardam também o `simbolo` e o `slot`.
+    """
+
+    __slots__ = ()
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}()"
@@ -13,12 +20,15 @@ class ASTNode:
 
 
 class ProgramaNode(ASTNode):
+    __slots__ = ("nome", "declaracoes", "bloco", "total_slots")
+
     def __init__(
         self, nome: str, declaracoes: Optional["DeclaracoesNode"], bloco: "BlocoNode"
     ) -> None:
         self.nome = nome
         self.declaracoes = declaracoes
         self.bloco = bloco
+        self.total_slots = 0
 
     def __str__(self) -> str:
         declaracoes_count = 0
@@ -37,6 +47,8 @@ class ProgramaNode(ASTNode):
 
 
 class BlocoNode(ASTNode):
+    __slots__ = ("lista_comandos",)
+
     def __init__(self, lista_comandos: List["ComandoNode"]) -> None:
         self.lista_comandos = lista_comandos
 
@@ -45,6 +57,8 @@ class BlocoNode(ASTNode):
 
 
 class DeclaracaoVarNode(ASTNode):
+    __slots__ = ("var_nodes", "tipo_node")
+
     def __init__(self, var_nodes: List["VariavelNode"], tipo_node: "TipoNode") -> None:
         self.var_nodes = var_nodes
         self.tipo_node = tipo_node
@@ -64,18 +78,31 @@ class DeclaracaoVarNode(ASTNode):
 
 
 class VariavelNode(ASTNode):
+    __slots__ = ("token", "slot", "simbolo", "tipo_resolvido")
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.valor = token.valor
+        self.slot: Optional[int] = None
+        self.simbolo: Optional[Simbolo] = None
+        self.tipo_resolvido: Optional[str] = None
+
+    @property
+    def valor(self) -> str:
+        return self.token.valor
 
     def __str__(self) -> str:
         return f"VariavelNode('{self.valor}')"
 
 
 class TipoNode(ASTNode):
+    __slots__ = ("token",)
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.valor = token.valor
+
+    @property
+    def valor(self) -> str:
+        return self.token.valor
 
     def __str__(self) -> str:
         return f"TipoNode('{self.valor}')"
@@ -84,11 +111,13 @@ class TipoNode(ASTNode):
 class ComandoNode(ASTNode):
     """Nó base para todos os tipos de comando"""
 
-    pass
+    __slots__ = ()
 
 
 class AtribuicaoNode(ComandoNode):
-    def __init__(self, esquerda: VariavelNode, op: Token, direita: "ExprNode") -> None:
+    __slots__ = ("esquerda", "op", "direita")
+
+    def __init__(self, esquerda: VariavelNode, op: Token, direita: "Expressao") -> None:
         self.esquerda = esquerda
         self.op = op
         self.direita = direita
@@ -104,32 +133,49 @@ class AtribuicaoNode(ComandoNode):
 
 
 class SeNode(ComandoNode):
+    __slots__ = ("condicao", "ramo_entao", "ramo_senao", "token")
+
     def __init__(
         self,
         condicao: "ExprLogicoNode",
         ramo_entao: ComandoNode,
         ramo_senao: Optional[ComandoNode] = None,
+        token: Optional[Token] = None,
     ) -> None:
         self.condicao = condicao
         self.ramo_entao = ramo_entao
         self.ramo_senao = ramo_senao
+        self.token = token
 
     def __str__(self) -> str:
         return f"SeNode(condicao={type(self.condicao).__name__}, entao={type(self.ramo_entao).__name__}, senao={type(self.ramo_senao).__name__ if self.ramo_senao else None})"
 
 
 class EnquantoNode(ComandoNode):
-    def __init__(self, condicao: "ExprLogicoNode", corpo: ComandoNode) -> None:
+    __slots__ = ("condicao", "corpo", "token")
+
+    def __init__(
+        self,
+        condicao: "ExprLogicoNode",
+        corpo: ComandoNode,
+        token: Optional[Token] = None,
+    ) -> None:
         self.condicao = condicao
         self.corpo = corpo
+        self.token = token
 
     def __str__(self) -> str:
         return f"EnquantoNode(condicao={type(self.condicao).__name__}, corpo={type(self.corpo).__name__})"
 
 
 class EscreverNode(ComandoNode):
-    def __init__(self, expressoes: List["StringVarNode"]) -> None:
+    __slots__ = ("expressoes", "token")
+
+    def __init__(
+        self, expressoes: List["StringVarNode"], token: Optional[Token] = None
+    ) -> None:
         self.expressoes = expressoes
+        self.token = token
 
     def __str__(self) -> str:
         tipos_expr = (
@@ -139,8 +185,13 @@ class EscreverNode(ComandoNode):
 
 
 class LerNode(ComandoNode):
-    def __init__(self, variaveis: List[VariavelNode]) -> None:
+    __slots__ = ("variaveis", "token")
+
+    def __init__(
+        self, variaveis: List[VariavelNode], token: Optional[Token] = None
+    ) -> None:
         self.variaveis = variaveis
+        self.token = token
 
     def __str__(self) -> str:
         vars_names = (
@@ -152,6 +203,8 @@ class LerNode(ComandoNode):
 
 
 class OpBinariaNode(ASTNode):
+    __slots__ = ("esquerda", "op", "direita")
+
     def __init__(self, esquerda: ASTNode, op: Token, direita: ASTNode) -> None:
         self.esquerda = esquerda
         self.op = op
@@ -165,9 +218,12 @@ class OpBinariaNode(ASTNode):
 
 
 class OpUnariaNode(ASTNode):
+    __slots__ = ("op", "expr", "tipo_resolvido")
+
     def __init__(self, op: Token, expr: ASTNode) -> None:
         self.op = op
         self.expr = expr
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
         op_valor = self.op.valor if hasattr(self.op, "valor") else str(self.op)
@@ -176,43 +232,49 @@ class OpUnariaNode(ASTNode):
 
 
 class NumeroNode(ASTNode):
+    __slots__ = ("token", "valor", "tipo_resolvido")
+
     def __init__(self, token: Token) -> None:
         self.token = token
         self.valor = int(token.valor)
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
         return f"NumeroNode({self.valor})"
 
 
-class ExprNode(ASTNode):
-    def __init__(self, termo: "TermoNode", expr2: Optional["Expr2Node"]) -> None:
-        self.termo = termo
-        self.expr2 = expr2
+class OpEncadeadaNode(ASTNode):
+    """Sequência de operações de mesma precedência, avaliada da esquerda para a
+    direita: primeiro op1 operando1 op2 operando2 ...
 
-    def __str__(self) -> str:
-        termo_tipo = type(self.termo).__name__ if self.termo else "None"
-        expr2_tipo = type(self.expr2).__name__ if self.expr2 else "None"
-        return f"ExprNode(termo={termo_tipo}, expr2={expr2_tipo})"
+    Substitui as cadeias <expr2>/<termo2> da gramática, sem nós ε e sem
+    aninhamento proporcional ao tamanho da expressão.
+    """
 
+    __slots__ = ("primeiro", "operacoes", "tipo_resolvido")
 
-class TermoNode(ASTNode):
-    def __init__(self, fator: "FatorNode", termo2: Optional["Termo2Node"]) -> None:
-        self.fator = fator
-        self.termo2 = termo2
+    def __init__(
+        self, primeiro: "Expressao", operacoes: List[Tuple[Token, "Expressao"]]
+    ) -> None:
+        self.primeiro = primeiro
+        self.operacoes = operacoes
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
-        fator_tipo = type(self.fator).__name__ if self.fator else "None"
-        termo2_tipo = type(self.termo2).__name__ if self.termo2 else "None"
-        return f"TermoNode(fator={fator_tipo}, termo2={termo2_tipo})"
+        operadores = "".join(operador.valor for operador, _ in self.operacoes)
+        return f"OpEncadeadaNode({type(self.primeiro).__name__} {operadores}, operandos={len(self.operacoes) + 1})"
 
 
 class ExprLogicoNode(ASTNode):
+    __slots__ = ("esquerda", "operador", "direita", "tipo_resolvido")
+
     def __init__(
-        self, esquerda: ExprNode, operador: "OpLogicoNode", direita: ExprNode
+        self, esquerda: "Expressao", operador: "OpLogicoNode", direita: "Expressao"
     ) -> None:
         self.esquerda = esquerda
         self.operador = operador
         self.direita = direita
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
         op_valor = (
@@ -225,100 +287,26 @@ class ExprLogicoNode(ASTNode):
         return f"ExprLogicoNode({esq_tipo} {op_valor} {dir_tipo})"
 
 
-class Expr2Node(ASTNode):
-    """Representa a continuação de uma expressão: + <termo> <expr2> | - <termo> <expr2> | ε"""
-
-    def __init__(
-        self,
-        operador: Optional[Token] = None,
-        termo: Optional[TermoNode] = None,
-        expr2: Optional["Expr2Node"] = None,
-    ) -> None:
-        self.operador = operador
-        self.termo = termo
-        self.expr2 = expr2
-
-    def __str__(self) -> str:
-        if self.operador is None:
-            return "Expr2Node(ε)"
-        op_valor = (
-            self.operador.valor
-            if hasattr(self.operador, "valor")
-            else str(self.operador)
-        )
-        termo_tipo = type(self.termo).__name__ if self.termo else "None"
-        expr2_tipo = type(self.expr2).__name__ if self.expr2 else "None"
-        return f"Expr2Node({op_valor} {termo_tipo} {expr2_tipo})"
-
-
-class Termo2Node(ASTNode):
-    """Representa a continuação de um termo: * <fator> <termo2> | / <fator> <termo2> | ε"""
-
-    def __init__(
-        self,
-        operador: Optional[Token] = None,
-        fator: Optional["FatorNode"] = None,
-        termo2: Optional["Termo2Node"] = None,
-    ) -> None:
-        self.operador = operador
-        self.fator = fator
-        self.termo2 = termo2
-
-    def __str__(self) -> str:
-        if self.operador is None:
-            return "Termo2Node(ε)"
-        op_valor = (
-            self.operador.valor
-            if hasattr(self.operador, "valor")
-            else str(self.operador)
-        )
-        fator_tipo = type(self.fator).__name__ if self.fator else "None"
-        termo2_tipo = type(self.termo2).__name__ if self.termo2 else "None"
-        return f"Termo2Node({op_valor} {fator_tipo} {termo2_tipo})"
-
-
-class FatorNode(ASTNode):
-    def __init__(
-        self,
-        tipo: str,
-        valor: Optional[Union[str, int]] = None,
-        expr: Optional[ExprNode] = None,
-        fator: Optional["FatorNode"] = None,
-        token: Optional[Token] = None,
-    ) -> None:
-        self.tipo = tipo
-        self.valor = valor
-        self.expr = expr
-        self.fator = fator
-        self.token = token
-
-    def __str__(self) -> str:
-        if self.tipo == "parenteses":
-            expr_tipo = type(self.expr).__name__ if self.expr else "None"
-            return f"FatorNode(({expr_tipo}))"
-        elif self.tipo == "negativo":
-            fator_tipo = type(self.fator).__name__ if self.fator else "None"
-            return f"FatorNode(-{fator_tipo})"
-        elif self.tipo == "id":
-            return f"FatorNode(id='{self.valor}')"
-        elif self.tipo == "num":
-            return f"FatorNode(num={self.valor})"
-        else:
-            return f"FatorNode(tipo='{self.tipo}')"
-
-
 class OpLogicoNode(ASTNode):
+    __slots__ = ("token",)
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.valor = token.valor
+
+    @property
+    def valor(self) -> str:
+        return self.token.valor
 
     def __str__(self) -> str:
         return f"OpLogicoNode('{self.valor}')"
 
 
 class ExprLogicoSimpleNode(ASTNode):
+    __slots__ = ("id_node", "tipo_resolvido")
+
     def __init__(self, id_node: "IdNode") -> None:
         self.id_node = id_node
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
         id_valor = (
@@ -328,6 +316,8 @@ class ExprLogicoSimpleNode(ASTNode):
 
 
 class ListaComandosNode(ASTNode):
+    __slots__ = ("comandos",)
+
     def __init__(self, comandos: List[ComandoNode]) -> None:
         self.comandos = comandos
 
@@ -336,12 +326,15 @@ class ListaComandosNode(ASTNode):
 
 
 class StringVarNode(ASTNode):
+    __slots__ = ("tipo", "valor", "expr", "tipo_resolvido")
+
     def __init__(
-        self, tipo: str, valor: Optional[str] = None, expr: Optional[ExprNode] = None
+        self, tipo: str, valor: Optional[str] = None, expr: Optional["Expressao"] = None
     ) -> None:
         self.tipo = tipo
         self.valor = valor
         self.expr = expr
+        self.tipo_resolvido: Optional[str] = None
 
     def __str__(self) -> str:
         if self.tipo == "string":
@@ -352,15 +345,25 @@ class StringVarNode(ASTNode):
 
 
 class IdNode(ASTNode):
+    __slots__ = ("token", "slot", "simbolo", "tipo_resolvido")
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.valor = token.valor
+        self.slot: Optional[int] = None
+        self.simbolo: Optional[Simbolo] = None
+        self.tipo_resolvido: Optional[str] = None
+
+    @property
+    def valor(self) -> str:
+        return self.token.valor
 
     def __str__(self) -> str:
         return f"IdNode('{self.valor}')"
 
 
 class DeclaracoesNode(ASTNode):
+    __slots__ = ("declaracoes",)
+
     def __init__(self, declaracoes: List[DeclaracaoVarNode]) -> None:
         self.declaracoes = declaracoes
 
@@ -368,3 +371,6 @@ class DeclaracoesNode(ASTNode):
         return (
             f"DeclaracoesNode(total={len(self.declaracoes) if self.declaracoes else 0})"
         )
+
+
+Expressao = Union[OpEncadeadaNode, OpUnariaNode, NumeroNode, VariavelNode]
@@ -0,0 +1,598 @@
+import math
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from abstract_syntax_tree import *
+from analisador_lexico import AnalisadorLexico, Token
+from analisador_sintatico import AnalisadorSintatico, SyntacticError
+
+
+TAMANHO_MINIMO_BLOCO = 256
+ESPACO_MARCOS = 16 * 1024
+
+
+class BlocoTokens:
+    """Tokens consecutivos de um DocumentoIncremental cujas linhas são
+    guardadas em relação a uma mesma linha base."""
+
+    __slots__ = ("linha", "indice", "quantidade")
+
+    def __init__(self, linha: int, indice: int) -> None:
+        self.linha = linha
+        self.indice = indice
+        self.quantidade = 0
+
+
+# Bloco dos tokens recém-varridos, cuja linha ainda é a absoluta.
+_SEM_BLOCO = BlocoTokens(0, -1)
+
+
+class TokenIncremental(Token):
+    """Token cuja linha é relativa à do seu bloco: inserir ou remover
+    quebras de linha desloca a base dos blocos seguintes, não cada token."""
+
+    __slots__ = ("bloco", "linha_relativa")
+
+    def __init__(self, tipo: str, valor: str, linha: int, coluna: int) -> None:
+        self.tipo = tipo
+        self.valor = valor
+        self.coluna = coluna
+        self.bloco = _SEM_BLOCO
+        self.linha_relativa = linha
+
+    @property
+    def linha(self) -> int:
+        return self.bloco.linha + self.linha_relativa
+
+    @linha.setter
+    def linha(self, linha: int) -> None:
+        self.linha_relativa = linha - self.bloco.linha
+
+
+class AnalisadorLexicoIncremental(AnalisadorLexico):
+    classe_token = TokenIncremental
+
+
+class RegistroComando:
+    """Um comando já analisado: o nó, o token em que começa, quantos tokens
+    ocupa e o comando que o contém (`None` no bloco principal)."""
+
+    __slots__ = ("no", "primeiro", "comprimento", "pai", "geracao")
+
+    def __init__(
+        self, primeiro: Token, pai: Optional["RegistroComando"], geracao: int
+    ) -> None:
+        self.no: Optional[ComandoNode] = None
+        self.primeiro = primeiro
+        self.comprimento = 0
+        self.pai = pai
+        self.geracao = geracao
+
+
+class AnalisadorSintaticoIncremental(AnalisadorSintatico):
+    """Analisador sintático sobre a lista de tokens de um DocumentoIncremental.
+
+    Ao encontrar o início de um comando já analisado cujos tokens (e o token
+    seguinte, que decide onde ele termina) não mudaram, reaproveita o nó e
+    salta seus tokens. Registra, para cada token consumido, o comando mais
+    interno que o contém.
+    """
+
+    def __init__(
+        self, documento: "DocumentoIncremental", inicio: int = 0
+    ) -> None:
+        super().__init__(())
+        self.documento = documento
+        self.lista = documento.tokens
+        self.posicao = inicio
+        self.atual: Optional[RegistroComando] = None
+        self.analisados = 0
+        self.reutilizados = 0
+
+    def _token_atual(self) -> Token:
+        if self.posicao >= len(self.lista):
+            raise SyntacticError(
+                "Erro de sintaxe: Fim inesperado do código fonte após "
+                f"{self.posicao} tokens."
+            )
+        return self.lista[self.posicao]
+
+    def _espiar(self, distancia: int) -> Optional[Token]:
+        indice = self.posicao + distancia
+        return self.lista[indice] if indice < len(self.lista) else None
+
+    def _avancar(self) -> None:
+        token = self.lista[self.posicao]
+        self.posicao += 1
+        donos = self.documento.donos
+        anterior = donos.get(id(token))
+        if anterior is not self.atual:
+            # O token mudou de dono: o comando antigo deixou de existir.
+            if anterior is not None:
+                self.documento.descartar(anterior)
+            if self.atual is None:
+                del donos[id(token)]
+            else:
+                donos[id(token)] = self.atual
+
+    def _comando(self) -> ComandoNode:
+        token = self._token_atual()
+        inicio = self.posicao
+        documento = self.documento
+        registro = documento.registros.get(id(token))
+        if (
+            registro is not None
+            and registro.primeiro is token
+            and documento.reutilizavel(registro, inicio)
+        ):
+            registro.pai = self.atual
+            self.posicao += registro.comprimento
+            self.reutilizados += 1
+            return registro.no
+
+        registro = RegistroComando(token, self.atual, documento.geracao)
+        pai, self.atual = self.atual, registro
+        try:
+            no = super()._comando()
+        finally:
+            self.atual = pai
+        registro.no = no
+        registro.comprimento = self.posicao - inicio
+        documento.registros[id(token)] = registro
+        self.analisados += 1
+        return no
+
+
+class DocumentoIncremental:
+    """Código fonte mantido em análise entre edições, para editores.
+
+    `editar` aplica uma edição de texto (posição, quantidade de caracteres
+    removidos, texto inserido) e devolve a nova árvore. Só os tokens da região
+    editada são varridos de novo: a varredura recomeça no token anterior à
+    edição (ou antes de um `/*` que a edição possa ter fechado) e termina assim
+    que volta a coincidir com um token antigo. Em seguida só o comando mais
+    interno que contém a alteração é analisado de novo, e dentro dele todo
+    comando inalterado é reaproveitado; se a alteração muda onde o comando
+    termina, tenta-se o comando que o contém, e por fim o programa inteiro,
+    ainda reaproveitando os comandos inalterados.
+
+    Erros léxicos e sintáticos são lançados como na análise completa; a
+    edição seguinte recomeça a partir do estado válido mais próximo.
+    """
+
+    def __init__(self, codigo_fonte: str) -> None:
+        self.codigo_fonte = codigo_fonte
+        self.tokens: Optional[List[Token]] = None
+        self.arvore: Optional[ProgramaNode] = None
+        self.registros: Dict[int, RegistroComando] = {}
+        self.donos: Dict[int, RegistroComando] = {}
+        self.geracao = 0
+        self.inicio_alterado = 0
+        self.fim_alterado = 0
+        # Strings com quebra de linha não avançam a linha dos tokens seguintes
+        # no AnalisadorLexico, o que impede converter posições do texto em
+        # linha/coluna; enquanto houver alguma, cada edição refaz tudo.
+        self.strings_multilinha = 0
+        self.blocos: List[BlocoTokens] = []
+        self.tamanho_bloco = TAMANHO_MINIMO_BLOCO
+        # Posições do texto com a linha em que estão, a cada ESPACO_MARCOS
+        # caracteres, para achar a linha de uma edição sem contar as quebras
+        # desde o começo do texto.
+        self.marcos: List[int] = []
+        self.linhas_marcos: List[int] = []
+        self.tokens_varridos = 0
+        self.comandos_analisados = 0
+        self.comandos_reutilizados = 0
+        self._analisar_tudo()
+
+    def editar(self, posicao: int, removidos: int, inseridos: str) -> ProgramaNode:
+        texto = self.codigo_fonte
+        if not 0 <= posicao <= posicao + removidos <= len(texto):
+            raise ValueError(
+                f"Edição fora do texto: posição {posicao}, {removidos} removidos"
+            )
+        self.codigo_fonte = texto[:posicao] + inseridos + texto[posicao + removidos :]
+        self.geracao += 1
+        self.comandos_analisados = self.comandos_reutilizados = 0
+
+        if self.tokens is None or self.strings_multilinha:
+            return self._analisar_tudo()
+
+        try:
+            inicio, fim, novos = self._varrer_edicao(texto, posicao, removidos, inseridos)
+        except Exception:
+            self.tokens = self.arvore = None
+            raise
+
+        candidatos = self._invalidar(inicio, fim)
+        antigos = self.tokens[inicio:fim]
+        self.tokens[inicio:fim] = novos
+        self._reagrupar(inicio, antigos, novos)
+        for token in antigos:
+            self.donos.pop(id(token), None)
+            registro = self.registros.get(id(token))
+            if registro is not None and registro.primeiro is token:
+                del self.registros[id(token)]
+        self.inicio_alterado = inicio
+        self.fim_alterado = inicio + len(novos)
+        self.tokens_varridos = len(novos)
+
+        arvore_anterior, self.arvore = self.arvore, None
+        if arvore_anterior is not None:
+            diferenca = len(novos) - (fim - inicio)
+            for registro, comeco in candidatos:
+                if comeco + registro.comprimento < fim:
+                    continue
+                if self._reanalisar_comando(arvore_anterior, registro, comeco, diferenca):
+                    self.arvore = arvore_anterior
+                    return self.arvore
+        return self._analisar_programa()
+
+    def reutilizavel(self, registro: RegistroComando, indice: int) -> bool:
+        if registro.geracao == self.geracao:
+            return True
+        # O comando e o token que o segue devem estar inteiros antes ou
+        # depois da região alterada.
+        return (
+            indice + registro.comprimento < self.inicio_alterado
+            or indice >= self.fim_alterado
+        )
+
+    def descartar(self, registro: RegistroComando) -> None:
+        chave = id(registro.primeiro)
+        if self.registros.get(chave) is registro:
+            del self.registros[chave]
+
+    def _analisar_tudo(self) -> ProgramaNode:
+        self.tokens = self.arvore = None
+        self.registros.clear()
+        self.donos.clear()
+        self._marcar_linhas()
+        tokens = AnalisadorLexicoIncremental(self.codigo_fonte).analisar()
+        self.strings_multilinha = sum(
+            1 for token in tokens if token.tipo == "STRING" and "\n" in token.valor
+        )
+        # Os blocos começam com base 0: a linha relativa é a absoluta.
+        tamanho = self.tamanho_bloco = max(
+            TAMANHO_MINIMO_BLOCO, math.isqrt(len(tokens))
+        )
+        self.blocos = []
+        for comeco in range(0, max(len(tokens), 1), tamanho):
+            bloco = BlocoTokens(0, len(self.blocos))
+            trecho = tokens[comeco : comeco + tamanho]
+            for token in trecho:
+                token.bloco = bloco
+            bloco.quantidade = len(trecho)
+            self.blocos.append(bloco)
+        self.tokens = tokens
+        self.tokens_varridos = len(tokens)
+        self.comandos_analisados = self.comandos_reutilizados = 0
+        self.inicio_alterado = 0
+        self.fim_alterado = len(tokens)
+        return self._analisar_programa()
+
+    def _marcar_linhas(self) -> None:
+        texto = self.codigo_fonte
+        self.marcos = [0]
+        self.linhas_marcos = [1]
+        linha = 1
+        for marco in range(ESPACO_MARCOS, len(texto), ESPACO_MARCOS):
+            linha += texto.count("\n", marco - ESPACO_MARCOS, marco)
+            self.marcos.append(marco)
+            self.linhas_marcos.append(linha)
+
+    def _linha_de(self, texto: str, posicao: int) -> int:
+        """Linha de `posicao` no texto anterior à edição, contando as quebras
+        a partir do marco anterior."""
+        indice = bisect_right(self.marcos, posicao) - 1
+        marco = self.marcos[indice]
+        linha = self.linhas_marcos[indice] + texto.count("\n", marco, posicao)
+        if posicao - marco > 2 * ESPACO_MARCOS:
+            self.marcos.insert(indice + 1, posicao)
+            self.linhas_marcos.insert(indice + 1, linha)
+        return linha
+
+    def _mover_marcos(
+        self, posicao: int, fim_removido: int, delta: int, delta_linhas: int
+    ) -> None:
+        """Descarta os marcos no trecho removido e desloca os seguintes."""
+        marcos = self.marcos
+        comeco = bisect_right(marcos, posicao)
+        fim = bisect_right(marcos, fim_removido - 1, comeco)
+        del marcos[comeco:fim]
+        del self.linhas_marcos[comeco:fim]
+        if delta or delta_linhas:
+            linhas = self.linhas_marcos
+            for indice in range(comeco, len(marcos)):
+                marcos[indice] += delta
+                linhas[indice] += delta_linhas
+
+    def _reagrupar(
+        self, inicio: int, antigos: List[Token], novos: List[Token]
+    ) -> None:
+        """Põe os tokens novos, já em `self.tokens[inicio:]`, no bloco do token
+        anterior (ou do seguinte), descarta os blocos vazios e divide os que
+        ficaram grandes demais."""
+        tokens = self.tokens
+        for token in antigos:
+            token.bloco.quantidade -= 1
+        if novos:
+            if inicio > 0:
+                bloco = tokens[inicio - 1].bloco
+            elif len(novos) < len(tokens):
+                bloco = tokens[len(novos)].bloco
+            else:
+                bloco = self.blocos[0]
+            for token in novos:
+                linha = token.linha
+                token.bloco = bloco
+                token.linha = linha
+            bloco.quantidade += len(novos)
+
+        if any(token.bloco.quantidade == 0 for token in antigos):
+            self.blocos = [vivo for vivo in self.blocos if vivo.quantidade]
+            if not self.blocos:
+                self.blocos.append(BlocoTokens(0, 0))
+            for indice, vivo in enumerate(self.blocos):
+                vivo.indice = indice
+
+        if novos and bloco.quantidade > 2 * self.tamanho_bloco:
+            self._dividir(bloco, inicio)
+
+    def _dividir(self, bloco: BlocoTokens, indice: int) -> None:
+        tokens = self.tokens
+        comeco = fim = indice
+        while comeco > 0 and tokens[comeco - 1].bloco is bloco:
+            comeco -= 1
+        while fim < len(tokens) and tokens[fim].bloco is bloco:
+            fim += 1
+        meio = (comeco + fim) // 2
+        # Com a mesma base, as linhas relativas continuam valendo.
+        novo = BlocoTokens(bloco.linha, bloco.indice + 1)
+        for token in tokens[meio:fim]:
+            token.bloco = novo
+        novo.quantidade = fim - meio
+        bloco.quantidade = meio - comeco
+        self.blocos.insert(novo.indice, novo)
+        for indice in range(novo.indice + 1, len(self.blocos)):
+            self.blocos[indice].indice = indice
+
+    def _analisar_programa(self) -> ProgramaNode:
+        analisador = AnalisadorSintaticoIncremental(self)
+        try:
+            self.arvore = analisador.analisar()
+        finally:
+            self.comandos_analisados += analisador.analisados
+            self.comandos_reutilizados += analisador.reutilizados
+        return self.arvore
+
+    def _reanalisar_comando(
+        self,
+        arvore: ProgramaNode,
+        registro: RegistroComando,
+        inicio: int,
+        diferenca: int,
+    ) -> bool:
+        analisador = AnalisadorSintaticoIncremental(self, inicio)
+        analisador.atual = registro.pai
+        try:
+            no = analisador._comando()
+        finally:
+            self.comandos_analisados += analisador.analisados
+            self.comandos_reutilizados += analisador.reutilizados
+        if analisador.posicao - inicio != registro.comprimento + diferenca:
+            # O comando passou a terminar em outro ponto; quem o contém
+            # precisa ser analisado de novo.
+            return False
+
+        pai = registro.pai.no if registro.pai else arvore.bloco
+        _substituir_filho(pai, registro.no, no)
+        ancestral = registro.pai
+        while ancestral is not None:
+            ancestral.comprimento += diferenca
+            self.registros[id(ancestral.primeiro)] = ancestral
+            ancestral = ancestral.pai
+        return True
+
+    def _invalidar(
+        self, inicio: int, fim: int
+    ) -> List[Tuple[RegistroComando, int]]:
+        """Descarta os comandos que contêm tokens alterados ou terminam logo
+        antes deles. Devolve os que começam antes da alteração, do mais interno
+        para o mais externo, com o índice do primeiro token, como candidatos a
+        uma nova análise."""
+        tokens = self.tokens
+        candidatos = []
+        if inicio > 0 and self.arvore is not None:
+            registro = self.donos.get(id(tokens[inicio - 1]))
+            # Um comando descartado por uma edição anterior que falhou não
+            # tem mais comprimento confiável, nem os que o contêm.
+            while (
+                registro is not None
+                and self.registros.get(id(registro.primeiro)) is registro
+            ):
+                limite = max(inicio - registro.comprimento, 0)
+                comeco = tokens.index(registro.primeiro, limite, inicio)
+                candidatos.append((registro, comeco))
+                registro = registro.pai
+
+        vistos = set()
+        for indice in range(max(inicio - 1, 0), fim):
+            registro = self.donos.get(id(tokens[indice]))
+            while registro is not None and id(registro) not in vistos:
+                vistos.add(id(registro))
+                self.descartar(registro)
+                registro = registro.pai
+        return candidatos
+
+    def _varrer_edicao(
+        self, texto: str, posicao: int, removidos: int, inseridos: str
+    ) -> Tuple[int, int, List[Token]]:
+        """Varre de novo a região editada. Devolve o intervalo [inicio, fim)
+        dos tokens antigos substituídos e os tokens novos, já com linha e
+        coluna dos tokens seguintes corrigidas."""
+        tokens = self.tokens
+        novo_texto = self.codigo_fonte
+        # Só a linha da edição exige contar quebras, a partir do marco
+        # anterior; as demais saem das quebras removidas e inseridas.
+        linha_edicao = self._linha_de(texto, posicao)
+        coluna_edicao = posicao - texto.rfind("\n", 0, posicao)
+        fim_removido = posicao + removidos
+        linha_fim = linha_edicao + texto.count("\n", posicao, fim_removido)
+        coluna_fim = fim_removido - texto.rfind("\n", 0, fim_removido)
+        fim_inserido = posicao + len(inseridos)
+        linha_nova = linha_edicao + inseridos.count("\n")
+        coluna_nova = fim_inserido - novo_texto.rfind("\n", 0, fim_inserido)
+        delta_linhas = linha_nova - linha_fim
+
+        def nova_posicao(token: Token) -> Tuple[int, int]:
+            if token.linha == linha_fim:
+                return linha_nova, token.coluna - coluna_fim + coluna_nova
+            return token.linha + delta_linhas, token.coluna
+
+        # A varredura recomeça no último token que começa antes da edição,
+        # pois a edição pode estendê-lo ou juntá-lo ao seguinte.
+        reinicio = _contar_antes(tokens, linha_edicao, coluna_edicao) - 1
+        janela = novo_texto[max(posicao - 1, 0) : fim_inserido + 1]
+        if "*/" in janela:
+            # Um `/*` sem fechamento antes da edição (varrido como DIV e MULT)
+            # pode ter sido fechado por ela. Como não há `*/` depois dele, ele
+            # começa no máximo um caractere antes do último `*/` (em `/*/` os
+            # dois se sobrepõem).
+            fechamento = texto.rfind("*/", 0, posicao)
+            abertura = texto.find("/*", max(fechamento - 1, 0), posicao)
+            if abertura >= 0:
+                linha_abertura = linha_edicao - texto.count("\n", abertura, posicao)
+                coluna_abertura = abertura - texto.rfind("\n", 0, abertura)
+                reinicio = min(
+                    reinicio,
+                    _contar_antes(tokens, linha_abertura, coluna_abertura) - 1,
+                )
+
+        analisador = AnalisadorLexicoIncremental(novo_texto)
+        if reinicio >= 0:
+            token = tokens[reinicio]
+            analisador.posicao = _posicao_de(
+                texto, token.linha, token.coluna, posicao, linha_edicao
+            )
+            analisador.linha = token.linha
+            analisador.coluna = token.coluna
+        inicio = max(reinicio, 0)
+
+        fim = _contar_antes(tokens, linha_fim, coluna_fim)
+        novos: List[Token] = []
+        ressincronizar = True
+        for novo in analisador.iter_tokens():
+            if novo.tipo == "STRING" and "\n" in novo.valor:
+                # Daqui em diante as linhas do analisador léxico não seguem
+                # as do texto; a varredura vai até o fim.
+                ressincronizar = False
+            if not ressincronizar:
+                novos.append(novo)
+                continue
+            chave = (novo.linha, novo.coluna)
+            while fim < len(tokens) and nova_posicao(tokens[fim]) < chave:
+                fim += 1
+            if fim < len(tokens):
+                antigo = tokens[fim]
+                if (
+                    nova_posicao(antigo) == chave
+                    and antigo.tipo == novo.tipo
+                    and antigo.valor == novo.valor
+                ):
+                    break
+            novos.append(novo)
+        else:
+            fim = len(tokens)
+        if not ressincronizar:
+            fim = len(tokens)
+
+        # Tokens do começo da região que saíram iguais mantêm o objeto
+        # antigo, e com ele o comando que começa neles.
+        while novos and inicio < fim:
+            antigo, novo = tokens[inicio], novos[0]
+            if (antigo.tipo, antigo.valor, antigo.linha, antigo.coluna) != (
+                novo.tipo,
+                novo.valor,
+                novo.linha,
+                novo.coluna,
+            ):
+                break
+            inicio += 1
+            novos.pop(0)
+
+        for token in tokens[inicio:fim]:
+            if token.tipo == "STRING" and "\n" in token.valor:
+                self.strings_multilinha -= 1
+        for token in novos:
+            if token.tipo == "STRING" and "\n" in token.valor:
+                self.strings_multilinha += 1
+
+        if delta_linhas or coluna_nova != coluna_fim:
+            # Os blocos depois da edição mudam de base juntos; só os tokens da
+            # linha em que a edição termina, e os que seguem a edição dentro
+            # do bloco que ela divide, são corrigidos um a um.
+            bloco = tokens[fim].bloco if fim < len(tokens) else None
+            dividido = (
+                bloco is not None and inicio > 0 and tokens[inicio - 1].bloco is bloco
+            )
+            ajustes = []
+            indice = fim
+            while indice < len(tokens):
+                token = tokens[indice]
+                if token.linha == linha_fim:
+                    ajustes.append((token, *nova_posicao(token)))
+                elif delta_linhas and dividido and token.bloco is bloco:
+                    ajustes.append((token, token.linha + delta_linhas, token.coluna))
+                else:
+                    break
+                indice += 1
+            if delta_linhas and bloco is not None:
+                for seguinte in self.blocos[bloco.indice + dividido :]:
+                    seguinte.linha += delta_linhas
+            for token, linha, coluna in ajustes:
+                token.linha = linha
+                token.coluna = coluna
+        self._mover_marcos(
+            posicao, fim_removido, len(inseridos) - removidos, delta_linhas
+        )
+        return inicio, fim, novos
+
+
+def _posicao_de(
+    texto: str, linha: int, coluna: int, referencia: int, linha_referencia: int
+) -> int:
+    """Posição no texto de (linha, coluna), voltando linha a linha a partir
+    de uma posição conhecida em uma linha igual ou posterior."""
+    inicio_linha = texto.rfind("\n", 0, referencia) + 1
+    while linha_referencia > linha:
+        inicio_linha = texto.rfind("\n", 0, inicio_linha - 1) + 1
+        linha_referencia -= 1
+    return inicio_linha + coluna - 1
+
+
+def _contar_antes(tokens: List[Token], linha: int, coluna: int) -> int:
+    """Número de tokens que começam antes de (linha, coluna)."""
+    baixo, alto = 0, len(tokens)
+    while baixo < alto:
+        meio = (baixo + alto) // 2
+        token = tokens[meio]
+        if (token.linha, token.coluna) < (linha, coluna):
+            baixo = meio + 1
+        else:
+            alto = meio
+    return baixo
+
+
+def _substituir_filho(pai: ASTNode, antigo: ASTNode, novo: ASTNode) -> None:
+    for classe in type(pai).__mro__:
+        for nome in getattr(classe, "__slots__", ()):
+            valor = getattr(pai, nome, None)
+            if valor is antigo:
+                setattr(pai, nome, novo)
+                return
+            if isinstance(valor, list) and antigo in valor:
+                # Os nós não definem __eq__: `index` compara por identidade.
+                valor[valor.index(antigo)] = novo
+                return
+    raise ValueError(f"{type(antigo).__name__} não encontrado em {type(pai).__name__}")
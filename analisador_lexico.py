@@ -1,8 +1,67 @@
+import mmap
+import os
 import re
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+TAMANHO_BLOCO = 1 << 20
+
+PALAVRAS_RESERVADAS: Dict[str, str] = {
+    "programa": "PROGRAMA",
+    "var": "VAR",
+    "início": "INÍCIO",
+    "fim": "FIM",
+    "inteiro": "INTEIRO",
+    "lógico": "LÓGICO",
+    "ler": "LER",
+    "escrever": "ESCREVER",
+    "se": "SE",
+    "então": "ENTÃO",
+    "senão": "SENÃO",
+    "enquanto": "ENQUANTO",
+    "faça": "FAÇA",
+}
+
+ESPECIFICACOES_TOKENS: List[Tuple[str, str]] = [
+    ("COMENTÁRIO", r"/\*.*?\*/"),
+    ("ESPAÇO", r"[ \t]+"),
+    ("NOVA_LINHA", r"\n"),
+    ("STRING", r'"(?:\\.|[^"\\])*"'),
+    ("ATRIBUIÇÃO", r":="),
+    ("MENOR_IGUAL", r"<="),
+    ("MAIOR_IGUAL", r">="),
+    ("DIFERENTE", r"<>"),
+    ("NÚMERO", r"\d+"),
+    ("ID", r"[a-zA-Z_À-ú][a-zA-Z0-9_À-ú]*"),
+    ("MAIS", r"\+"),
+    ("MENOS", r"-"),
+    ("MULT", r"\*"),
+    ("DIV", r"/"),
+    ("IGUAL", r"="),
+    ("MENOR", r"<"),
+    ("MAIOR", r">"),
+    ("LPAREN", r"\("),
+    ("RPAREN", r"\)"),
+    ("LCOLCH", r"\["),
+    ("RCOLCH", r"\]"),
+    ("PONTO_VÍRGULA", r";"),
+    ("DOIS_PONTOS", r":"),
+    ("PONTO", r"\."),
+    ("VÍRGULA", r","),
+    ("ERRO", r"."),
+]
+
+# Compilada uma única vez, na importação, e compartilhada por todos os
+# analisadores.
+TOKEN_REGEX = re.compile(
+    "|".join(f"(?P<{tipo}>{padrao})" for tipo, padrao in ESPECIFICACOES_TOKENS),
+    re.DOTALL,
+)
 
 
 class Token:
+    __slots__ = ("tipo", "valor", "linha", "coluna")
+
     def __init__(self, tipo: str, valor: str, linha: int, coluna: int) -> None:
         self.tipo = tipo
         self.valor = valor
@@ -15,110 +74,146 @@ class Token:
         )
 
 
+def ler_blocos_mapeados(
+    caminho: str, tamanho_bloco: int = TAMANHO_BLOCO
+) -> Iterator[str]:
+    """Decodifica um arquivo mapeado em memória em blocos de aproximadamente
+    `tamanho_bloco` bytes, sempre terminados em quebra de linha, de modo que
+    nenhum caractere UTF-8 nem um par \\r\\n fique dividido entre dois blocos.
+
+    As quebras de linha são normalizadas como na leitura em modo texto. O
+    arquivo só é aberto quando o primeiro bloco é pedido e é fechado ao fim
+    da leitura, ou quando o gerador é fechado."""
+    with open(caminho, "rb") as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        if tamanho == 0:
+            return
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            inicio = 0
+            while inicio < tamanho:
+                fim = mapa.find(b"\n", min(inicio + tamanho_bloco, tamanho) - 1)
+                fim = tamanho if fim == -1 else fim + 1
+                bloco = mapa[inicio:fim].decode("utf-8")
+                if "\r" in bloco:
+                    bloco = bloco.replace("\r\n", "\n").replace("\r", "\n")
+                yield bloco
+                inicio = fim
+
+
+class LexicalError(ValueError):
+    def __init__(self, mensagem: str, token: Optional[Token] = None) -> None:
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.token = token
+
+
 class AnalisadorLexico:
-    def __init__(self, codigo_fonte: str) -> None:
+    palavras_reservadas = PALAVRAS_RESERVADAS
+    especificacoes_tokens = ESPECIFICACOES_TOKENS
+    token_regex = TOKEN_REGEX
+    classe_token = Token
+
+    def __init__(
+        self, codigo_fonte: str = "", blocos: Optional[Iterable[str]] = None
+    ) -> None:
         self.codigo_fonte = codigo_fonte
+        # Quando `blocos` é informado, o código fonte é lido aos pedaços e
+        # nunca fica inteiro na memória; `codigo_fonte` é ignorado.
+        self.blocos = iter(blocos) if blocos is not None else None
         self.posicao = 0
         self.linha = 1
         self.coluna = 1
 
-        self.palavras_reservadas: Dict[str, str] = {
-            "programa": "PROGRAMA",
-            "var": "VAR",
-            "início": "INÍCIO",
-            "fim": "FIM",
-            "inteiro": "INTEIRO",
-            "lógico": "LÓGICO",
-            "ler": "LER",
-            "escrever": "ESCREVER",
-            "se": "SE",
-            "então": "ENTÃO",
-            "senão": "SENÃO",
-            "enquanto": "ENQUANTO",
-            "faça": "FAÇA",
-        }
-
-        self.especificacoes_tokens: List[Tuple[str, str]] = [
-            ("COMENTÁRIO", r"/\*.*?\*/"),
-            ("ESPAÇO", r"[ \t]+"),
-            ("NOVA_LINHA", r"\n"),
-            ("STRING", r'"(?:\\.|[^"\\])*"'),
-            ("ATRIBUIÇÃO", r":="),
-            ("MENOR_IGUAL", r"<="),
-            ("MAIOR_IGUAL", r">="),
-            ("DIFERENTE", r"<>"),
-            ("NÚMERO", r"\d+"),
-            ("ID", r"[a-zA-Z_À-ú][a-zA-Z0-9_À-ú]*"),
-            ("MAIS", r"\+"),
-            ("MENOS", r"-"),
-            ("MULT", r"\*"),
-            ("DIV", r"/"),
-            ("IGUAL", r"="),
-            ("MENOR", r"<"),
-            ("MAIOR", r">"),
-            ("LPAREN", r"\("),
-            ("RPAREN", r"\)"),
-            ("LCOLCH", r"\["),
-            ("RCOLCH", r"\]"),
-            ("PONTO_VÍRGULA", r";"),
-            ("DOIS_PONTOS", r":"),
-            ("PONTO", r"\."),
-            ("VÍRGULA", r","),
-            ("ERRO", r"."),
-        ]
-
-        regex_unidas = "|".join(
-            f"(?P<{par[0]}>{par[1]})" for par in self.especificacoes_tokens
-        )
-        self.token_regex = re.compile(regex_unidas, re.DOTALL)
+    @classmethod
+    def de_arquivo(
+        cls, caminho: str, tamanho_bloco: int = TAMANHO_BLOCO
+    ) -> "AnalisadorLexico":
+        """Analisa o arquivo por meio de um mmap, sem carregá-lo em uma string."""
+        return cls(blocos=ler_blocos_mapeados(caminho, tamanho_bloco))
 
     def analisar(self) -> List[Token]:
-        tokens = []
-        while self.posicao < len(self.codigo_fonte):
-            token = self._proximo_token()
-            if token and token.tipo != "ESPAÇO" and token.tipo != "COMENTÁRIO":
-                tokens.append(token)
-        return tokens
-
-    def _proximo_token(self) -> Optional[Token]:
-        match = self.token_regex.match(self.codigo_fonte, self.posicao)
-        if not match:
-            return None
-
-        tipo = match.lastgroup
-        valor = match.group()
-        coluna_inicial = self.coluna
-
-        if tipo == "ESPAÇO":
-            self.posicao = match.end()
-            self.coluna += len(valor)
-            return self._proximo_token()
-
-        if tipo == "NOVA_LINHA":
-            self.posicao = match.end()
-            self.linha += 1
-            self.coluna = 1
-            return self._proximo_token()
-
-        if tipo == "COMENTÁRIO":
-            self.posicao = match.end()
-            num_novas_linhas = valor.count("\n")
-            if num_novas_linhas > 0:
-                self.linha += num_novas_linhas
-                self.coluna = len(valor) - valor.rfind("\n")
-            else:
-                self.coluna += len(valor)
-            return self._proximo_token()
-
-        if tipo == "ID" and valor.lower() in self.palavras_reservadas:
-            tipo = self.palavras_reservadas[valor.lower()]
-
-        if tipo == "ERRO":
-            raise ValueError(
-                f"Erro léxico: Caractere não reconhecido '{valor}' na linha {self.linha}, coluna {coluna_inicial}"
-            )
-
-        token = Token(tipo, valor, self.linha, coluna_inicial)
-        self.posicao = match.end()
-        self.coluna += len(valor)
-        return token
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Gera os tokens sob demanda, descartando espaços, quebras de linha e
+        comentários dentro do próprio laço de varredura."""
+        palavras_reservadas = self.palavras_reservadas
+        buscar = self.token_regex.finditer
+        criar_token = self.classe_token
+        blocos = self.blocos
+        final = blocos is None
+        texto = self.codigo_fonte if final else ""
+        # Posição absoluta de texto[0] no código fonte.
+        base = 0 if final else self.posicao
+        posicao = self.posicao - base
+        linha = self.linha
+        # A coluna é derivada da posição do início da linha atual, sem
+        # acumular o tamanho de cada token.
+        inicio_linha = posicao - self.coluna + 1
+
+        try:
+            while True:
+                fim_texto = len(texto)
+                # Como o grupo ERRO casa qualquer caractere, as ocorrências de
+                # `finditer` cobrem o texto sem lacunas.
+                for match in buscar(texto, posicao):
+                    tipo = match.lastgroup
+                    posicao = match.end()
+
+                    # Com mais blocos por vir, um token que chega ao fim do
+                    # texto pode continuar no próximo bloco, e um comentário
+                    # ou string sem fechamento pode fechar nele.
+                    if not final and (
+                        posicao == fim_texto
+                        or tipo == "DIV"
+                        and texto.startswith("*", posicao)
+                        or tipo == "ERRO"
+                        and match.group() == '"'
+                    ):
+                        posicao = match.start()
+                        break
+
+                    if tipo == "ESPAÇO":
+                        continue
+
+                    if tipo == "NOVA_LINHA":
+                        linha += 1
+                        inicio_linha = posicao
+                        continue
+
+                    valor = match.group()
+                    if tipo == "COMENTÁRIO":
+                        num_novas_linhas = valor.count("\n")
+                        if num_novas_linhas > 0:
+                            linha += num_novas_linhas
+                            inicio_linha = match.start() + valor.rfind("\n") + 1
+                        continue
+
+                    if tipo == "ID":
+                        tipo = palavras_reservadas.get(valor.lower(), tipo)
+                    elif tipo == "ERRO":
+                        posicao = match.start()
+                        coluna = posicao - inicio_linha + 1
+                        raise LexicalError(
+                            f"Erro léxico: Caractere não reconhecido '{valor}' na linha {linha}, coluna {coluna}",
+                            Token(tipo, valor, linha, coluna),
+                        )
+
+                    yield criar_token(
+                        tipo, valor, linha, match.start() - inicio_linha + 1
+                    )
+
+                if final:
+                    break
+                proximo = next(blocos, None)
+                if proximo is None:
+                    final = True
+                    proximo = ""
+                texto = texto[posicao:] + proximo
+                base += posicao
+                inicio_linha -= posicao
+                posicao = 0
+        finally:
+            self.posicao = base + posicao
+            self.linha = linha
+            self.coluna = posicao - inicio_linha + 1
@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import Optional, Union
 from abstract_syntax_tree import *
 from tabela_de_simbolos import TabelaDeSimbolos, Simbolo
+from visitante import Visitante
 
 
 class SemanticError(Exception):
@@ -15,32 +16,75 @@ class SemanticError(Exception):
         return f"Erro Semântico: {self.mensagem}"
 
 
-class AnalisadorSemantico:
+def tipo_numero(numero: int) -> str:
+    if numero == 0 or numero == 1:
+        return "lógico"
+    return "inteiro"
+
+
+def juncao_tipos(tipo1: str, tipo2: str) -> str:
+    if tipo1 == "lógico" and tipo2 == "lógico":
+        return "lógico"
+    return "inteiro"
+
+
+def anotar_tipo(no: ASTNode) -> Optional[str]:
+    """Recalcula o `tipo_resolvido` de uma expressão reescrita depois da
+    análise (pelo otimizador). As variáveis mantêm o tipo do símbolo que já
+    foi resolvido."""
+    if isinstance(no, NumeroNode):
+        tipo = tipo_numero(no.valor)
+    elif isinstance(no, OpEncadeadaNode):
+        tipo = anotar_tipo(no.primeiro)
+        for _, operando in no.operacoes:
+            tipo = juncao_tipos(tipo, anotar_tipo(operando))
+    elif isinstance(no, OpUnariaNode):
+        tipo = anotar_tipo(no.expr)
+    else:
+        return no.tipo_resolvido
+    no.tipo_resolvido = tipo
+    return tipo
+
+
+class AnalisadorSemantico(Visitante):
+    """Verifica declarações e tipos e anota a árvore: cada variável recebe o
+    símbolo e o slot, e cada expressão o `tipo_resolvido`, para que as fases
+    seguintes não precisem consultar a tabela de símbolos."""
+
     def __init__(self) -> None:
         self.tabela_de_simbolos = TabelaDeSimbolos()
 
     def visitar(self, no: ASTNode) -> Optional[str]:
-        nome_metodo = f"visitar_{type(no).__name__}"
-        visitante = getattr(self, nome_metodo, self.visitante_generico)
-        return visitante(no)
+        return self.despacho[type(no)](self, no)
 
     def visitante_generico(self, no: ASTNode) -> None:
         raise Exception(f"Nenhum método visitar_{type(no).__name__} definido")
 
+    def resolver_variavel(self, no: Union[VariavelNode, IdNode]) -> Simbolo:
+        simbolo = self.tabela_de_simbolos.buscar(no.token.valor)
+        if not simbolo:
+            raise SemanticError(
+                f"Variável '{no.token.valor}' não declarada.", token=no.token
+            )
+        no.simbolo = simbolo
+        no.slot = simbolo.slot
+        no.tipo_resolvido = simbolo.tipo
+        return simbolo
+
     def visitar_ProgramaNode(self, no: ProgramaNode) -> None:
         if no.declaracoes:
             self.visitar(no.declaracoes)
+        no.total_slots = self.tabela_de_simbolos.total_slots()
         self.visitar(no.bloco)
 
     def visitar_DeclaracoesNode(self, no: DeclaracoesNode) -> None:
-        if hasattr(no, "declaracoes") and no.declaracoes:
-            for declaracao in no.declaracoes:
-                self.visitar(declaracao)
+        for declaracao in no.declaracoes:
+            self.visitar(declaracao)
 
     def visitar_BlocoNode(self, no: BlocoNode) -> None:
-        if hasattr(no, "lista_comandos") and no.lista_comandos:
-            for comando in no.lista_comandos:
-                self.visitar(comando)
+        despacho = self.despacho
+        for comando in no.lista_comandos:
+            despacho[type(comando)](self, comando)
 
     def visitar_DeclaracaoVarNode(self, no: DeclaracaoVarNode) -> None:
         nome_tipo = no.tipo_node.valor
@@ -52,168 +96,136 @@ class AnalisadorSemantico:
                 )
             simbolo = Simbolo(nome_variavel, nome_tipo)
             self.tabela_de_simbolos.definir(simbolo)
+            no_var.simbolo = simbolo
+            no_var.slot = simbolo.slot
+            no_var.tipo_resolvido = nome_tipo
 
     def visitar_AtribuicaoNode(self, no: AtribuicaoNode) -> None:
-        no_variavel = no.esquerda
-        simbolo = self.tabela_de_simbolos.buscar(no_variavel.valor)
-        if not simbolo:
-            raise SemanticError(
-                f"Variável '{no_variavel.valor}' não declarada.",
-                token=no_variavel.token,
-            )
-        tipo_expressao = self.visitar(no.direita)
+        simbolo = self.resolver_variavel(no.esquerda)
+        self.verificar_atribuicao(no, simbolo, self.visitar(no.direita))
+
+    def verificar_atribuicao(
+        self, no: AtribuicaoNode, simbolo: Simbolo, tipo_expressao: Optional[str]
+    ) -> None:
         if simbolo.tipo == "lógico" and tipo_expressao == "inteiro":
             raise SemanticError(
-                f"Incompatibilidade de tipos. Não é possível atribuir '{tipo_expressao}' para a variável '{no_variavel.valor}' do tipo '{simbolo.tipo}'.",
+                f"Incompatibilidade de tipos. Não é possível atribuir '{tipo_expressao}' para a variável '{no.esquerda.valor}' do tipo '{simbolo.tipo}'.",
                 token=no.op,
             )
 
     def extrair_token_de_no(self, no: ASTNode) -> Optional[Token]:
-        if hasattr(no, "token") and no.token:
+        if getattr(no, "token", None):
             return no.token
         elif hasattr(no, "esquerda") and hasattr(no.esquerda, "token"):
             return no.esquerda.token
         elif hasattr(no, "id_node") and hasattr(no.id_node, "token"):
             return no.id_node.token
-        elif hasattr(no, "termo") and hasattr(no.termo, "token"):
-            return no.termo.token
-        elif hasattr(no, "fator") and hasattr(no.fator, "token"):
-            return no.fator.token
+        elif hasattr(no, "primeiro") and hasattr(no.primeiro, "token"):
+            return no.primeiro.token
 
         return None
 
+    def verificar_condicao(
+        self, condicao: ASTNode, tipo_condicao: Optional[str], comando: str
+    ) -> None:
+        if tipo_condicao != "lógico":
+            raise SemanticError(
+                f"Condição em '{comando}' deve ser do tipo lógico, mas encontrado '{tipo_condicao}'.",
+                token=self.extrair_token_de_no(condicao),
+            )
+
     def visitar_SeNode(self, no: SeNode) -> None:
         if no.condicao:
-            tipo_condicao = self.visitar(no.condicao)
-            if tipo_condicao != "lógico":
-                token_erro = self.extrair_token_de_no(no.condicao)
-                raise SemanticError(
-                    f"Condição em 'se' deve ser do tipo lógico, mas encontrado '{tipo_condicao}'.",
-                    token=token_erro,
-                )
+            self.verificar_condicao(no.condicao, self.visitar(no.condicao), "se")
 
         if no.ramo_entao:
             self.visitar(no.ramo_entao)
 
-        if hasattr(no, "ramo_senao") and no.ramo_senao:
+        if no.ramo_senao:
             self.visitar(no.ramo_senao)
 
     def visitar_EnquantoNode(self, no: EnquantoNode) -> None:
         if no.condicao:
-            tipo_condicao = self.visitar(no.condicao)
-            if tipo_condicao != "lógico":
-                token_erro = self.extrair_token_de_no(no.condicao)
-                raise SemanticError(
-                    f"Condição em 'enquanto' deve ser do tipo lógico, mas encontrado '{tipo_condicao}'.",
-                    token=token_erro,
-                )
+            self.verificar_condicao(no.condicao, self.visitar(no.condicao), "enquanto")
 
         if no.corpo:
             self.visitar(no.corpo)
 
     def visitar_LerNode(self, no: LerNode) -> None:
-        if hasattr(no, "variaveis") and no.variaveis:
-            for variavel in no.variaveis:
-                simbolo = self.tabela_de_simbolos.buscar(variavel.valor)
-                if not simbolo:
-                    raise SemanticError(
-                        f"Variável '{variavel.valor}' não declarada.",
-                        token=variavel.token,
-                    )
+        for variavel in no.variaveis:
+            self.resolver_variavel(variavel)
 
     def visitar_EscreverNode(self, no: EscreverNode) -> None:
-        if hasattr(no, "expressoes") and no.expressoes:
-            for expr in no.expressoes:
-                self.visitar(expr)
+        for expr in no.expressoes:
+            self.visitar(expr)
 
     def visitar_StringVarNode(self, no: StringVarNode) -> str:
-        if hasattr(no, "tipo") and no.tipo == "expr":
-            if hasattr(no, "expr") and no.expr:
-                return self.visitar(no.expr)
-        return "string"
-
-    def visitar_ExprNode(self, no: ExprNode) -> str:
-        if hasattr(no, "termo") and no.termo:
-            tipo_termo = self.visitar(no.termo)
-            if hasattr(no, "expr2") and no.expr2:
-                tipo_expr2 = self.visitar(no.expr2)
-            return self.juncao_tipos(tipo_termo, tipo_expr2)
-        return "inteiro"
-
-    def visitar_TermoNode(self, no: TermoNode) -> str:
-        tipo_fator = self.visitar(no.fator)
-        if hasattr(no, "termo2") and no.termo2:
-            tipo_termo2 = self.visitar(no.termo2)
-        return self.juncao_tipos(tipo_fator, tipo_termo2)
-
-    def visitar_FatorNode(self, no: FatorNode) -> str:
-        if no.tipo == "parenteses" and hasattr(no, "expr") and no.expr:
-            return self.visitar(no.expr)
-        elif no.tipo == "negativo" and hasattr(no, "fator") and no.fator:
-            return self.visitar(no.fator)
-        elif no.tipo == "id" and hasattr(no, "valor"):
-            simbolo = self.tabela_de_simbolos.buscar(no.valor)
-            if not simbolo:
-                raise SemanticError(
-                    f"Variável '{no.valor}' não declarada.",
-                    token=no.token if hasattr(no, "token") else None,
-                )
-            return simbolo.tipo
-        elif no.tipo == "num":
-            return self.verificar_tipo_numero(no.valor)
-
-    def visitar_Expr2Node(self, no: Expr2Node) -> str:
-        if hasattr(no, "operador") and no.operador:
-            if hasattr(no, "termo") and no.termo:
-                tipo_termo = self.visitar(no.termo)
-            if hasattr(no, "expr2") and no.expr2:
-                tipo_expr2 = self.visitar(no.expr2)
-            return self.juncao_tipos(tipo_termo, tipo_expr2)
-        return "lógico"
-
-    def visitar_Termo2Node(self, no: Termo2Node) -> str:
-        if hasattr(no, "operador") and no.operador:
-            if hasattr(no, "fator") and no.fator:
-                tipo_fator = self.visitar(no.fator)
-            if hasattr(no, "termo2") and no.termo2:
-                tipo_termo2 = self.visitar(no.termo2)
-            return self.juncao_tipos(tipo_fator, tipo_termo2)
-        return "lógico"
+        if no.tipo == "expr" and no.expr:
+            tipo = self.visitar(no.expr)
+        else:
+            tipo = "string"
+        no.tipo_resolvido = tipo
+        return tipo
+
+    def visitar_OpEncadeadaNode(self, no: OpEncadeadaNode) -> str:
+        despacho = self.despacho
+        primeiro = no.primeiro
+        tipo = despacho[type(primeiro)](self, primeiro)
+        for _, operando in no.operacoes:
+            if despacho[type(operando)](self, operando) != "lógico":
+                # juncao_tipos: só é lógico se todos os operandos forem.
+                tipo = "inteiro"
+        no.tipo_resolvido = tipo
+        return tipo
+
+    def visitar_OpUnariaNode(self, no: OpUnariaNode) -> str:
+        tipo = no.tipo_resolvido = self.visitar(no.expr)
+        return tipo
 
     def visitar_IdNode(self, no: IdNode) -> str:
-        if hasattr(no, "valor"):
-            simbolo = self.tabela_de_simbolos.buscar(no.valor)
-            if not simbolo:
-                raise SemanticError(
-                    f"Variável '{no.valor}' não declarada.",
-                    token=no.token if hasattr(no, "token") else None,
-                )
-            return simbolo.tipo
-        return "inteiro"
+        return self.resolver_variavel(no).tipo
 
     def visitar_ExprLogicoSimpleNode(self, no: ExprLogicoSimpleNode) -> str:
-        if hasattr(no, "id_node") and no.id_node:
-            return self.visitar(no.id_node)
-        return "lógico"
+        if no.id_node:
+            tipo = self.visitar(no.id_node)
+        else:
+            tipo = "lógico"
+        no.tipo_resolvido = tipo
+        return tipo
 
     def visitar_ExprLogicoNode(self, no: ExprLogicoNode) -> str:
+        self.visitar(no.esquerda)
+        self.visitar(no.direita)
+        no.tipo_resolvido = "lógico"
         return "lógico"
 
     def visitar_NumeroNode(self, no: NumeroNode) -> str:
-        return self.verificar_tipo_numero(no.valor)
+        tipo = no.tipo_resolvido = tipo_numero(no.valor)
+        return tipo
 
     def visitar_VariavelNode(self, no: VariavelNode) -> str:
-        simbolo = self.tabela_de_simbolos.buscar(no.valor)
-        if not simbolo:
-            raise SemanticError(f"Variável '{no.valor}' não declarada.", token=no.token)
-        return simbolo.tipo
+        return self.resolver_variavel(no).tipo
+
+    # Anotações usadas pelo AnalisadorSintatico na passagem única: os filhos
+    # do nó já foram anotados quando ele é criado, então não há recursão.
+
+    def anotar_operacoes(self, no: OpEncadeadaNode) -> None:
+        tipo = no.primeiro.tipo_resolvido
+        for _, operando in no.operacoes:
+            tipo = juncao_tipos(tipo, operando.tipo_resolvido)
+        no.tipo_resolvido = tipo
+
+    def anotar_negacao(self, no: OpUnariaNode) -> None:
+        no.tipo_resolvido = no.expr.tipo_resolvido
+
+    def anotar_comparacao(self, no: ExprLogicoNode) -> None:
+        no.tipo_resolvido = "lógico"
+
+    def anotar_texto(self, no: StringVarNode) -> None:
+        no.tipo_resolvido = no.expr.tipo_resolvido if no.expr else "string"
 
     def verificar_tipo_numero(self, numero: int) -> str:
-        if numero == 0 or numero == 1:
-            return "lógico"
-        return "inteiro"
+        return tipo_numero(numero)
 
     def juncao_tipos(self, tipo1: str, tipo2: str) -> str:
-        if tipo1 == "lógico" and tipo2 == "lógico":
-            return "lógico"
-        return "inteiro"
+        return juncao_tipos(tipo1, tipo2)
@@ -1,17 +1,73 @@
-from typing import List, Optional, Union
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, List, Optional, Tuple, Union
 from abstract_syntax_tree import *
 from analisador_lexico import Token
+from analisador_semantico import AnalisadorSemantico, SemanticError
+
+
+class SyntacticError(SyntaxError):
+    def __init__(self, mensagem: str, token: Optional[Token] = None) -> None:
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.token = token
 
 
 class AnalisadorSintatico:
-    def __init__(self, tokens: List[Token]) -> None:
-        self.tokens = tokens
+    """Analisador descendente recursivo que consome os tokens como um fluxo.
+
+    Só os tokens ainda não consumidos que a gramática precisa enxergar ficam
+    em memória: o atual e, em `_exprLogico`, o seguinte.
+
+    Com `semantico`, as ações semânticas acontecem durante a própria análise
+    (passagem única): as declarações entram na tabela de símbolos, as
+    variáveis são resolvidas e as expressões anotadas à medida que os nós são
+    criados, e as condições de `se`/`enquanto` são verificadas. Os erros são
+    os mesmos da análise semântica em uma passagem separada.
+    """
+
+    TAMANHO_LOOKAHEAD = 2
+
+    def __init__(
+        self,
+        tokens: Iterable[Token],
+        semantico: Optional[AnalisadorSemantico] = None,
+    ) -> None:
+        # Aceita tanto a lista de `analisar()` quanto o gerador de `iter_tokens()`.
+        self.tokens = iter(tokens)
         self.posicao = 0
+        self.lookahead: Deque[Token] = deque()
+        self.semantico = semantico
+        self.erro_semantico: Optional[SemanticError] = None
+        self.manter_arvore = True
 
     def _token_atual(self) -> Token:
-        return self.tokens[self.posicao]
+        if not self.lookahead and not self._buscar():
+            raise SyntacticError(
+                "Erro de sintaxe: Fim inesperado do código fonte após "
+                f"{self.posicao} tokens."
+            )
+        return self.lookahead[0]
+
+    def _espiar(self, distancia: int) -> Optional[Token]:
+        """Retorna o token `distancia` posições à frente do atual, sem consumi-lo."""
+        if distancia >= self.TAMANHO_LOOKAHEAD:
+            raise ValueError(
+                f"Lookahead de {distancia} excede o buffer de {self.TAMANHO_LOOKAHEAD} tokens"
+            )
+        while len(self.lookahead) <= distancia:
+            if not self._buscar():
+                return None
+        return self.lookahead[distancia]
+
+    def _buscar(self) -> bool:
+        token = next(self.tokens, None)
+        if token is None:
+            return False
+        self.lookahead.append(token)
+        return True
 
     def _avancar(self) -> None:
+        self.lookahead.popleft()
         self.posicao += 1
 
     def _consumir(self, tipo_esperado: str) -> Token:
@@ -20,13 +76,48 @@ class AnalisadorSintatico:
             self._avancar()
             return token
         else:
-            raise SyntaxError(
+            raise SyntacticError(
                 f"Erro de sintaxe: Esperado token '{tipo_esperado}', mas encontrou '{token.tipo}' "
-                f"na linha {token.linha}, coluna {token.coluna}."
+                f"na linha {token.linha}, coluna {token.coluna}.",
+                token,
             )
 
+    def _acao_semantica(self, acao: Callable[..., Any], *argumentos: Any) -> Any:
+        # Numa passagem separada, a análise semântica só começa depois que o
+        # programa inteiro foi analisado; por isso o primeiro erro semântico só
+        # é lançado no fim, depois de qualquer erro léxico ou sintático.
+        if self.erro_semantico is None:
+            try:
+                return acao(*argumentos)
+            except SemanticError as e:
+                self.erro_semantico = e
+        return None
+
     def analisar(self) -> ProgramaNode:
-        return self._programa()
+        erro_sintatico: Optional[SyntacticError] = None
+        try:
+            programa = self._programa()
+        except SyntacticError as e:
+            erro_sintatico = e
+        # Tokens depois do ponto final são ignorados, mas o restante do fluxo
+        # ainda é varrido para que erros léxicos nele continuem sendo relatados.
+        # Isso vale também depois de um erro sintático: com a lista completa de
+        # tokens, um erro léxico em qualquer ponto do código tinha precedência.
+        self.lookahead.clear()
+        for _ in self.tokens:
+            pass
+        if erro_sintatico is not None:
+            raise erro_sintatico
+        if self.erro_semantico is not None:
+            raise self.erro_semantico
+        return programa
+
+    def verificar(self) -> None:
+        """Só verifica o programa: cada declaração e comando é descartado
+        assim que analisado, de modo que a árvore nunca fica inteira em
+        memória. Com `semantico`, verifica também a semântica."""
+        self.manter_arvore = False
+        self.analisar()
 
     def _programa(self) -> ProgramaNode:
         """<prog>::=programa id; [<declarações>] <bloco> ."""
@@ -38,7 +129,10 @@ class AnalisadorSintatico:
         bloco = self._bloco()
 
         self._consumir("PONTO")
-        return ProgramaNode(nome_programa, declaracoes, bloco)
+        programa = ProgramaNode(nome_programa, declaracoes, bloco)
+        if self.semantico is not None:
+            programa.total_slots = self.semantico.tabela_de_simbolos.total_slots()
+        return programa
 
     def _declaracoes(self) -> Optional[DeclaracoesNode]:
         """<declarações>::=var <lista_declaracao_var> {<lista_declaracao_var>}"""
@@ -46,7 +140,9 @@ class AnalisadorSintatico:
         if self._token_atual().tipo == "VAR":
             self._consumir("VAR")
             while self._token_atual().tipo == "ID":
-                declaracoes.append(self._lista_declaracao_var())
+                declaracao = self._lista_declaracao_var()
+                if self.manter_arvore:
+                    declaracoes.append(declaracao)
         return DeclaracoesNode(declaracoes) if declaracoes else None
 
     def _lista_declaracao_var(self) -> DeclaracaoVarNode:
@@ -59,7 +155,10 @@ class AnalisadorSintatico:
         self._consumir("DOIS_PONTOS")
         tipo_no = self._tipo()
         self._consumir("PONTO_VÍRGULA")
-        return DeclaracaoVarNode(vars_nos, tipo_no)
+        declaracao = DeclaracaoVarNode(vars_nos, tipo_no)
+        if self.semantico is not None:
+            self._acao_semantica(self.semantico.visitar_DeclaracaoVarNode, declaracao)
+        return declaracao
 
     def _tipo(self) -> TipoNode:
         """<tipo> ::= inteiro | lógico"""
@@ -71,8 +170,9 @@ class AnalisadorSintatico:
             self._consumir("LÓGICO")
             return TipoNode(token)
         else:
-            raise SyntaxError(
-                f"Erro de sintaxe: Tipo desconhecido '{token.valor}' na linha {token.linha} coluna {token.coluna}"
+            raise SyntacticError(
+                f"Erro de sintaxe: Tipo desconhecido '{token.valor}' na linha {token.linha} coluna {token.coluna}",
+                token,
             )
 
     def _bloco(self) -> BlocoNode:
@@ -84,12 +184,15 @@ class AnalisadorSintatico:
 
     def _lista_comandos(self) -> ListaComandosNode:
         """<lista comandos> ::= <comando>; {<comando>;}"""
-        comandos = [self._comando()]
+        comando = self._comando()
+        comandos = [comando] if self.manter_arvore else []
         while self._token_atual().tipo == "PONTO_VÍRGULA":
             self._consumir("PONTO_VÍRGULA")
             if self._token_atual().tipo == "FIM":
                 break
-            comandos.append(self._comando())
+            comando = self._comando()
+            if self.manter_arvore:
+                comandos.append(comando)
         return ListaComandosNode(comandos)
 
     def _comando(self) -> ComandoNode:
@@ -109,128 +212,153 @@ class AnalisadorSintatico:
             return self._repeticao()
         else:
             token_atual = self._token_atual()
-            raise SyntaxError(
-                f"Erro de sintaxe: Comando inesperado '{token_atual.valor}' na linha {token_atual.linha} coluna {token_atual.coluna}"
+            raise SyntacticError(
+                f"Erro de sintaxe: Comando inesperado '{token_atual.valor}' na linha {token_atual.linha} coluna {token_atual.coluna}",
+                token_atual,
             )
 
     def _atribuicao(self) -> AtribuicaoNode:
         """<atribuição> ::= id := <expr>"""
         esquerda = VariavelNode(self._consumir("ID"))
+        simbolo = None
+        if self.semantico is not None:
+            simbolo = self._acao_semantica(self.semantico.resolver_variavel, esquerda)
         op = self._consumir("ATRIBUIÇÃO")
         direita = self._expr()
-        return AtribuicaoNode(esquerda, op, direita)
+        atribuicao = AtribuicaoNode(esquerda, op, direita)
+        if simbolo is not None:
+            self._acao_semantica(
+                self.semantico.verificar_atribuicao,
+                atribuicao,
+                simbolo,
+                direita.tipo_resolvido,
+            )
+        return atribuicao
 
     def _leitura(self) -> LerNode:
         """<leitura> ::= ler (id {,id})"""
-        self._consumir("LER")
+        token = self._consumir("LER")
         self._consumir("LPAREN")
         variaveis = [VariavelNode(self._consumir("ID"))]
         while self._token_atual().tipo == "VÍRGULA":
             self._consumir("VÍRGULA")
             variaveis.append(VariavelNode(self._consumir("ID")))
         self._consumir("RPAREN")
-        return LerNode(variaveis)
+        leitura = LerNode(variaveis, token)
+        if self.semantico is not None:
+            self._acao_semantica(self.semantico.visitar_LerNode, leitura)
+        return leitura
 
     def _escrita(self) -> EscreverNode:
         """<escrita> ::= escrever (<stringvar> {,<stringvar>})"""
-        self._consumir("ESCREVER")
+        token = self._consumir("ESCREVER")
         self._consumir("LPAREN")
         expressoes = [self._stringvar()]
         while self._token_atual().tipo == "VÍRGULA":
             self._consumir("VÍRGULA")
             expressoes.append(self._stringvar())
         self._consumir("RPAREN")
-        return EscreverNode(expressoes)
+        return EscreverNode(expressoes, token)
 
     def _condicional(self) -> SeNode:
         """<condicional> ::= se <exprLogico> então <comando> [senão <comando>]"""
-        self._consumir("SE")
+        token = self._consumir("SE")
         condicao = self._exprLogico()
+        if self.semantico is not None:
+            self._acao_semantica(
+                self.semantico.verificar_condicao,
+                condicao,
+                condicao.tipo_resolvido,
+                "se",
+            )
         self._consumir("ENTÃO")
         ramo_entao = self._comando()
         ramo_senao = None
         if self._token_atual().tipo == "SENÃO":
             self._consumir("SENÃO")
             ramo_senao = self._comando()
-        return SeNode(condicao, ramo_entao, ramo_senao)
+        return SeNode(condicao, ramo_entao, ramo_senao, token)
 
     def _repeticao(self) -> EnquantoNode:
         """<repetição> ::= enquanto <exprLogico> faça <comando>"""
-        self._consumir("ENQUANTO")
+        token = self._consumir("ENQUANTO")
         condicao = self._exprLogico()
+        if self.semantico is not None:
+            self._acao_semantica(
+                self.semantico.verificar_condicao,
+                condicao,
+                condicao.tipo_resolvido,
+                "enquanto",
+            )
         self._consumir("FAÇA")
         corpo = self._comando()
-        return EnquantoNode(condicao, corpo)
-
-    def _expr(self) -> ExprNode:
-        """<expr> ::= <termo> <expr2>"""
-        termo = self._termo()
-        expr2 = self._expr2()
-        return ExprNode(termo, expr2)
-
-    def _termo(self) -> TermoNode:
-        """<termo> ::= <fator> <termo2>"""
-        fator = self._fator()
-        termo2 = self._termo2()
-        return TermoNode(fator, termo2)
-
-    def _termo2(self) -> Termo2Node:
-        """<termo2> ::= * <fator> <termo2> | / <fator> <termo2> | ε"""
-        if self._token_atual().tipo == "MULT":
-            op = self._consumir("MULT")
-            fator = self._fator()
-            termo2 = self._termo2()
-            return Termo2Node(op, fator, termo2)
-        elif self._token_atual().tipo == "DIV":
-            op = self._consumir("DIV")
-            fator = self._fator()
-            termo2 = self._termo2()
-            return Termo2Node(op, fator, termo2)
-        else:
-            return Termo2Node()
-
-    def _expr2(self) -> Expr2Node:
-        """<expr2> ::= + <termo> <expr2> | - <termo> <expr2> | ε"""
-        if self._token_atual().tipo == "MAIS":
-            op = self._consumir("MAIS")
-            termo = self._termo()
-            expr2 = self._expr2()
-            return Expr2Node(op, termo, expr2)
-        elif self._token_atual().tipo == "MENOS":
-            op = self._consumir("MENOS")
-            termo = self._termo()
-            expr2 = self._expr2()
-            return Expr2Node(op, termo, expr2)
-        else:
-            return Expr2Node()
+        return EnquantoNode(condicao, corpo, token)
+
+    def _expr(self) -> Expressao:
+        """<expr> ::= <termo> <expr2>
+        <expr2> ::= + <termo> <expr2> | - <termo> <expr2> | ε"""
+        primeiro = self._termo()
+        operacoes = []
+        while self._token_atual().tipo in ("MAIS", "MENOS"):
+            op = self._consumir(self._token_atual().tipo)
+            operacoes.append((op, self._termo()))
+        return self._encadear(primeiro, operacoes)
+
+    def _termo(self) -> Expressao:
+        """<termo> ::= <fator> <termo2>
+        <termo2> ::= * <fator> <termo2> | / <fator> <termo2> | ε"""
+        primeiro = self._fator()
+        operacoes = []
+        while self._token_atual().tipo in ("MULT", "DIV"):
+            op = self._consumir(self._token_atual().tipo)
+            operacoes.append((op, self._fator()))
+        return self._encadear(primeiro, operacoes)
+
+    def _encadear(
+        self, primeiro: Expressao, operacoes: List[Tuple[Token, Expressao]]
+    ) -> Expressao:
+        if not operacoes:
+            return primeiro
+        no = OpEncadeadaNode(primeiro, operacoes)
+        if self.semantico is not None:
+            self.semantico.anotar_operacoes(no)
+        return no
 
-    def _fator(self) -> FatorNode:
+    def _fator(self) -> Expressao:
         """<fator> ::= (<expr>) | - <fator> | id | num"""
         if self._token_atual().tipo == "LPAREN":
             self._consumir("LPAREN")
             expr = self._expr()
             self._consumir("RPAREN")
-            return FatorNode("parenteses", expr=expr)
+            return expr
         elif self._token_atual().tipo == "MENOS":
             op = self._consumir("MENOS")
-            fator = self._fator()
-            return FatorNode("negativo", fator=fator, token=op)
+            negacao = OpUnariaNode(op, self._fator())
+            if self.semantico is not None:
+                self.semantico.anotar_negacao(negacao)
+            return negacao
         elif self._token_atual().tipo == "ID":
-            token = self._consumir("ID")
-            return FatorNode("id", valor=token.valor, token=token)
+            variavel = VariavelNode(self._consumir("ID"))
+            if self.semantico is not None:
+                self._acao_semantica(self.semantico.visitar_VariavelNode, variavel)
+            return variavel
         elif self._token_atual().tipo == "NÚMERO":
-            token = self._consumir("NÚMERO")
-            return FatorNode("num", valor=int(token.valor), token=token)
+            numero = NumeroNode(self._consumir("NÚMERO"))
+            if self.semantico is not None:
+                self.semantico.visitar_NumeroNode(numero)
+            return numero
         else:
-            raise SyntaxError(
-                f"Erro de sintaxe: Fator inesperado '{self._token_atual().valor}' na linha {self._token_atual().linha} coluna {self._token_atual().coluna}"
+            token = self._token_atual()
+            raise SyntacticError(
+                f"Erro de sintaxe: Fator inesperado '{token.valor}' na linha {token.linha} coluna {token.coluna}",
+                token,
             )
 
     def _exprLogico(self) -> Union[ExprLogicoNode, ExprLogicoSimpleNode]:
         """<exprLogico> ::= <expr> <opLogico> <expr> | id"""
         if self._token_atual().tipo == "ID":
-            if self.posicao + 1 < len(self.tokens):
-                proximo_token = self.tokens[self.posicao + 1]
+            proximo_token = self._espiar(1)
+            if proximo_token is not None:
                 if proximo_token.tipo not in {
                     "MENOR",
                     "MENOR_IGUAL",
@@ -240,12 +368,20 @@ class AnalisadorSintatico:
                     "DIFERENTE",
                 }:
                     token_id = self._consumir("ID")
-                    return ExprLogicoSimpleNode(IdNode(token_id))
+                    simples = ExprLogicoSimpleNode(IdNode(token_id))
+                    if self.semantico is not None:
+                        self._acao_semantica(
+                            self.semantico.visitar_ExprLogicoSimpleNode, simples
+                        )
+                    return simples
 
         node_esquerda = self._expr()
         op_token = self._opLogico()
         node_direita = self._expr()
-        return ExprLogicoNode(node_esquerda, op_token, node_direita)
+        comparacao = ExprLogicoNode(node_esquerda, op_token, node_direita)
+        if self.semantico is not None:
+            self.semantico.anotar_comparacao(comparacao)
+        return comparacao
 
     def _opLogico(self) -> OpLogicoNode:
         """<opLogico> ::= < | <= | > | >= | = | <>"""
@@ -261,15 +397,19 @@ class AnalisadorSintatico:
             self._avancar()
             return OpLogicoNode(token)
         else:
-            raise SyntaxError(
-                f"Erro de sintaxe: Operador lógico inesperado '{token.valor}' na linha {token.linha} coluna {token.coluna}"
+            raise SyntacticError(
+                f"Erro de sintaxe: Operador lógico inesperado '{token.valor}' na linha {token.linha} coluna {token.coluna}",
+                token,
             )
 
     def _stringvar(self) -> StringVarNode:
         """<stringvar> ::= str | <expr>"""
         if self._token_atual().tipo == "STRING":
             token = self._consumir("STRING")
-            return StringVarNode("string", valor=token.valor[1:-1])
+            texto = StringVarNode("string", valor=token.valor[1:-1])
         else:
             expr = self._expr()
-            return StringVarNode("expr", expr=expr)
+            texto = StringVarNode("expr", expr=expr)
+        if self.semantico is not None:
+            self.semantico.anotar_texto(texto)
+        return texto
@@ -0,0 +1,308 @@
+"""Verifica que as otimizações de `-O` não mudam o comportamento observável
+dos programas: para cada programa, a saída, o erro e o estado final das
+variáveis da execução otimizada são comparados com os da execução sem
+otimização, em cada backend.
+
+Os programas vêm de `benchmarks.gerador`, com parâmetros e sementes variados
+(inclusive laços que não executam nenhuma vez), e de um pequeno conjunto de
+casos escritos à mão para as situações em que as otimizações precisam ser
+conservadoras: `ler` dentro do laço, divisão por zero, variáveis lidas antes
+de serem atribuídas, condições constantes, atribuições sobrescritas e
+expressões repetidas entre leituras e atribuições.
+
+Uso: python -m benchmarks.equivalencia [--programas N] [--semente N]
+
+Termina com código 1 se alguma execução divergir.
+"""
+
+import random
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from benchmarks.gerador import ParametrosPrograma, gerar_programa
+from entrada import EntradaIteravel
+from interpretador import BACKENDS, ExecutorInterpretador
+from saida import SaidaMemoria
+
+
+class Caso(NamedTuple):
+    nome: str
+    codigo_fonte: str
+    entradas: Sequence[str] = ()
+
+
+CASOS = [
+    Caso(
+        "laço que não executa",
+        """programa zero;
+var i, a, b, x: inteiro;
+início
+    a := 2; b := 3; x := 7;
+    enquanto i > 0 faça
+    início
+        x := a * b;
+        i := i - 1
+    fim;
+    escrever(x)
+fim.
+""",
+    ),
+    Caso(
+        "ler no corpo",
+        """programa leitura;
+var i, a, b, x, s: inteiro;
+início
+    b := 5;
+    enquanto i < 3 faça
+    início
+        ler(a);
+        x := b * 2;
+        s := s + x * a + b * 3;
+        i := i + 1
+    fim;
+    escrever(s, " ", x)
+fim.
+""",
+        ("1", "2", "3"),
+    ),
+    Caso(
+        "variável lida antes da atribuição",
+        """programa antes;
+var i, a, b, x: inteiro;
+início
+    a := 2; b := 3;
+    enquanto i < 3 faça
+    início
+        escrever(x);
+        x := a * b + 1;
+        i := i + 1
+    fim
+fim.
+""",
+    ),
+    Caso(
+        "divisão por zero no corpo",
+        """programa divisao;
+var i, a, z, x: inteiro;
+início
+    a := 8;
+    enquanto i < 3 faça
+    início
+        escrever("iteração ", i);
+        x := a / z + a * 2;
+        i := i + 1
+    fim
+fim.
+""",
+    ),
+    Caso(
+        "divisão por zero na condição",
+        """programa condicao;
+var i, a, z: inteiro;
+início
+    a := 8;
+    escrever("antes");
+    enquanto i < a / z faça
+        i := i + 1;
+    escrever(i)
+fim.
+""",
+    ),
+    Caso(
+        "lógicos e laços aninhados",
+        """programa aninhados;
+var i, j, a, s: inteiro;
+    p, q: lógico;
+início
+    a := 4; p := 1;
+    enquanto i < 3 faça
+    início
+        q := p;
+        j := 0;
+        enquanto j < a * 2 faça
+        início
+            s := s + (a - 1) * j + i;
+            j := j + 1
+        fim;
+        i := i + 1
+    fim;
+    escrever(s, " ", q, " ", p * 1)
+fim.
+""",
+    ),
+    Caso(
+        "condições constantes",
+        """programa constantes;
+var i, x, y: inteiro;
+início
+    x := 1;
+    se 2 * 3 > 5 então
+        x := x + 10
+    senão
+        x := x + 20;
+    se 1 = 2 então
+        escrever("nunca");
+    enquanto 0 > 1 faça
+        y := y + 1;
+    se 4 <> 4 então
+        y := 1
+    senão
+    início
+        y := x * 2;
+        escrever(y)
+    fim
+fim.
+""",
+    ),
+    Caso(
+        "atribuições sobrescritas",
+        """programa sobrescritas;
+var i, x, y, z: inteiro;
+início
+    x := 5;
+    x := 6;
+    y := x;
+    z := 8 / (i + 1);
+    z := 1;
+    enquanto i < 3 faça
+    início
+        y := i * 2;
+        y := y + x;
+        i := i + 1
+    fim;
+    escrever(y)
+fim.
+""",
+    ),
+    Caso(
+        "subexpressões repetidas",
+        """programa repetidas;
+var a, b, c, x, y, z: inteiro;
+    p: lógico;
+início
+    a := 3; b := 4; c := 5;
+    x := a * b + c;
+    y := (a * b + c) * 2 + (a - c) * (b + 1) * 3;
+    a := a + 1;
+    z := c + b * a + (a - c) * (b + 1) * 3;
+    escrever(x, " ", y, " ", z, " ", (a - c) * (b + 1) * 3 - p * 1);
+    ler(b, p);
+    escrever((a - c) * (b + 1) * 3 + p * 1, " ", (a - c) * (b + 1) * 3);
+    se (a - c) * (b + 1) * 3 < 0 então
+        escrever(z / (b - 4), " ", z / (b - 4))
+fim.
+""",
+        ("4", "1"),
+    ),
+    Caso(
+        "se sem efeito com divisão por zero na condição",
+        """programa condicao_se;
+var a, z, x: inteiro;
+início
+    a := 3;
+    se 1 < a / z então
+        x := 1;
+    x := 2;
+    escrever(x)
+fim.
+""",
+    ),
+]
+
+
+class ExecutorSilencioso(ExecutorInterpretador):
+    def relatar_erro(self, erro: Exception) -> None:
+        pass
+
+
+Observado = Tuple[str, bool, Optional[str], Optional[Dict[str, Any]]]
+
+
+def executar(
+    codigo_fonte: str, backend: str, otimizar: bool, entradas: Sequence[str]
+) -> Tuple[Observado, List[str]]:
+    """Saída, sucesso, erro e estado final das variáveis (só com sucesso: com
+    erro, o estado não é mostrado ao usuário) e as reescritas aplicadas."""
+    saida = SaidaMemoria()
+    executor = ExecutorSilencioso(
+        backend=backend,
+        otimizar=otimizar,
+        saida=saida,
+        entrada=EntradaIteravel(entradas),
+    )
+    resultado = executor.interpretar_codigo(codigo_fonte)
+    variaveis = None
+    if resultado.sucesso:
+        variaveis = executor.interpretador.variaveis
+    observado = (saida.conteudo(), resultado.sucesso, resultado.erro, variaveis)
+    return observado, executor.reescritas
+
+
+def parametros_aleatorios(aleatorio: random.Random) -> ParametrosPrograma:
+    return ParametrosPrograma(
+        declaracoes=aleatorio.randint(2, 12),
+        comandos=aleatorio.randint(4, 60),
+        tamanho_expressao=aleatorio.randint(1, 6),
+        profundidade=aleatorio.randint(0, 4),
+        iteracoes=aleatorio.randint(0, 4),
+        agrupamento=aleatorio.randint(1, 5),
+        semente=aleatorio.randrange(2**32),
+    )
+
+
+def verificar(
+    casos: Sequence[Caso], backends: Sequence[str] = BACKENDS
+) -> Tuple[int, int, int]:
+    """Devolve o número de divergências, de programas reescritos e de
+    reescritas; cada divergência é relatada em stderr."""
+    divergencias = reescritos = total_reescritas = 0
+    for caso in casos:
+        esperado, _ = executar(caso.codigo_fonte, "arvore", False, caso.entradas)
+        reescritas: List[str] = []
+        for backend in backends:
+            for otimizar in (False, True):
+                observado, reescritas_execucao = executar(
+                    caso.codigo_fonte, backend, otimizar, caso.entradas
+                )
+                if otimizar:
+                    reescritas = reescritas_execucao
+                if observado != esperado:
+                    divergencias += 1
+                    print(
+                        f"DIVERGÊNCIA em '{caso.nome}' (backend {backend}, "
+                        f"otimizar={otimizar}):\n  esperado {esperado!r}\n"
+                        f"  obtido   {observado!r}",
+                        file=sys.stderr,
+                    )
+        reescritos += bool(reescritas)
+        total_reescritas += len(reescritas)
+    return divergencias, reescritos, total_reescritas
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compara execuções com e sem -O em programas gerados."
+    )
+    parser.add_argument("--programas", type=int, default=100)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(args.semente)
+    casos = list(CASOS)
+    for indice in range(args.programas):
+        parametros = parametros_aleatorios(aleatorio)
+        casos.append(Caso(f"gerado {indice} {parametros}", gerar_programa(parametros)))
+
+    divergencias, reescritos, total_reescritas = verificar(casos)
+    print(
+        f"{len(casos)} programas em {len(BACKENDS)} backends: {reescritos} "
+        f"reescritos pelo otimizador ({total_reescritas} reescritas), "
+        f"{divergencias} divergências"
+    )
+    sys.exit(1 if divergencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Mede separadamente cada fase (léxica, sintática, semântica e interpretação)
+em programas gerados por `benchmarks.gerador`, com aquecimento, repetições e
+estatísticas, e compara o resultado com uma linha de base salva.
+
+Cada repetição executa o programa inteiro, do código fonte à interpretação,
+cronometrando cada fase à parte. A saída de `escrever` vai para a memória.
+
+Uso:
+    python -m benchmarks.fases --json atual.json
+    python -m benchmarks.fases --linha-base base.json [--tolerancia 0.10]
+
+Com `--linha-base`, o processo termina com código 1 se alguma fase de algum
+cenário ficar mais lenta que a linha de base além da tolerância.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico
+from benchmarks.gerador import ParametrosPrograma, gerar_programa
+from entrada import EntradaIteravel
+from interpretador import Interpretador
+from saida import SaidaMemoria
+
+
+VERSAO_FORMATO = 1
+
+FASES = ("lexico", "sintatico", "semantico", "interpretacao")
+
+CENARIOS: Dict[str, ParametrosPrograma] = {
+    "linear": ParametrosPrograma(declaracoes=20, comandos=5000),
+    "expressoes_longas": ParametrosPrograma(
+        declaracoes=20, comandos=500, tamanho_expressao=60
+    ),
+    "muitas_declaracoes": ParametrosPrograma(declaracoes=5000, comandos=2000),
+    "aninhado": ParametrosPrograma(
+        declaracoes=10, comandos=200, profundidade=6, iteracoes=4
+    ),
+    "laco_quente": ParametrosPrograma(
+        declaracoes=8, comandos=8, profundidade=2, iteracoes=5000, agrupamento=8
+    ),
+}
+
+
+class Estatisticas(NamedTuple):
+    minimo: float
+    mediana: float
+    media: float
+    desvio: float
+    maximo: float
+    amostras: List[float]
+
+
+def estatisticas(amostras: List[float]) -> Estatisticas:
+    return Estatisticas(
+        min(amostras),
+        statistics.median(amostras),
+        statistics.fmean(amostras),
+        statistics.stdev(amostras) if len(amostras) > 1 else 0.0,
+        max(amostras),
+        amostras,
+    )
+
+
+def executar_fases(codigo_fonte: str) -> Tuple[Dict[str, float], int]:
+    """Executa o programa uma vez e devolve o tempo de cada fase e o número
+    de tokens."""
+    tempos = {}
+    relogio = time.perf_counter
+
+    inicio = relogio()
+    tokens = AnalisadorLexico(codigo_fonte).analisar()
+    tempos["lexico"] = relogio() - inicio
+
+    inicio = relogio()
+    arvore = AnalisadorSintatico(tokens).analisar()
+    tempos["sintatico"] = relogio() - inicio
+
+    inicio = relogio()
+    AnalisadorSemantico().visitar(arvore)
+    tempos["semantico"] = relogio() - inicio
+
+    interpretador = Interpretador(SaidaMemoria(), EntradaIteravel(()))
+    inicio = relogio()
+    interpretador.interpretar(arvore)
+    tempos["interpretacao"] = relogio() - inicio
+    return tempos, len(tokens)
+
+
+def medir_cenario(
+    parametros: ParametrosPrograma, aquecimento: int, repeticoes: int
+) -> Dict[str, Any]:
+    codigo_fonte = gerar_programa(parametros)
+    for _ in range(aquecimento):
+        executar_fases(codigo_fonte)
+
+    amostras: Dict[str, List[float]] = {fase: [] for fase in FASES}
+    total_tokens = 0
+    for _ in range(repeticoes):
+        gc.collect()
+        tempos, total_tokens = executar_fases(codigo_fonte)
+        for fase in FASES:
+            amostras[fase].append(tempos[fase])
+
+    return {
+        "parametros": parametros._asdict(),
+        "bytes": len(codigo_fonte.encode("utf-8")),
+        "tokens": total_tokens,
+        "fases": {
+            fase: estatisticas(amostras[fase])._asdict() for fase in FASES
+        },
+    }
+
+
+def medir(
+    cenarios: Dict[str, ParametrosPrograma],
+    aquecimento: int,
+    repeticoes: int,
+    progresso: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    resultados = {}
+    for nome, parametros in cenarios.items():
+        if progresso:
+            progresso(nome)
+        resultados[nome] = medir_cenario(parametros, aquecimento, repeticoes)
+    return {
+        "versao_formato": VERSAO_FORMATO,
+        "python": platform.python_version(),
+        "implementacao": platform.python_implementation(),
+        "plataforma": platform.platform(),
+        "aquecimento": aquecimento,
+        "repeticoes": repeticoes,
+        "cenarios": resultados,
+    }
+
+
+class Comparacao(NamedTuple):
+    cenario: str
+    fase: str
+    base: float
+    atual: float
+
+    @property
+    def razao(self) -> float:
+        return self.atual / self.base if self.base else float("inf")
+
+
+def comparar(
+    atual: Dict[str, Any], base: Dict[str, Any], estatistica: str = "mediana"
+) -> List[Comparacao]:
+    """Compara os cenários e fases presentes nos dois resultados."""
+    comparacoes = []
+    for cenario, resultado in atual["cenarios"].items():
+        referencia = base["cenarios"].get(cenario)
+        if referencia is None:
+            continue
+        if referencia["parametros"] != resultado["parametros"]:
+            raise ValueError(
+                f"Cenário '{cenario}' usa parâmetros diferentes na linha de base"
+            )
+        for fase in FASES:
+            if fase in referencia["fases"]:
+                comparacoes.append(
+                    Comparacao(
+                        cenario,
+                        fase,
+                        referencia["fases"][fase][estatistica],
+                        resultado["fases"][fase][estatistica],
+                    )
+                )
+    return comparacoes
+
+
+def formatar_resultado(resultado: Dict[str, Any]) -> str:
+    linhas = []
+    for cenario, dados in resultado["cenarios"].items():
+        linhas.append(f"{cenario}: {dados['bytes']} bytes, {dados['tokens']} tokens")
+        for fase in FASES:
+            e = dados["fases"][fase]
+            linhas.append(
+                f"  {fase:<14} mediana {e['mediana'] * 1000:9.2f} ms  "
+                f"mín {e['minimo'] * 1000:9.2f} ms  "
+                f"desvio {e['desvio'] * 1000:7.2f} ms"
+            )
+    return "\n".join(linhas)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Mede cada fase do compilador em programas gerados."
+    )
+    parser.add_argument("--aquecimento", type=int, default=1)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument(
+        "--cenarios",
+        nargs="+",
+        choices=list(CENARIOS),
+        default=list(CENARIOS),
+        help="Cenários medidos (padrão: todos)",
+    )
+    parser.add_argument("--json", metavar="ARQUIVO", help="Grava o resultado em JSON")
+    parser.add_argument(
+        "--linha-base",
+        metavar="ARQUIVO",
+        help="Compara com um resultado JSON salvo anteriormente",
+    )
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=0.10,
+        help="Aumento relativo tolerado antes de acusar regressão (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--estatistica",
+        choices=("minimo", "mediana", "media"),
+        default="mediana",
+        help="Estatística comparada com a linha de base (padrão: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    resultado = medir(
+        {nome: CENARIOS[nome] for nome in args.cenarios},
+        args.aquecimento,
+        max(1, args.repeticoes),
+        progresso=lambda nome: print(f"medindo {nome}...", file=sys.stderr),
+    )
+    print(formatar_resultado(resultado))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+
+    if not args.linha_base:
+        return
+
+    with open(args.linha_base, "r", encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    comparacoes = comparar(resultado, base, args.estatistica)
+    regressoes = [c for c in comparacoes if c.razao > 1 + args.tolerancia]
+
+    print(f"\nComparação com {args.linha_base} ({args.estatistica}):")
+    for c in comparacoes:
+        marca = "  REGRESSÃO" if c in regressoes else ""
+        print(
+            f"  {c.cenario:<20} {c.fase:<14} {c.base * 1000:9.2f} → "
+            f"{c.atual * 1000:9.2f} ms  ({c.razao:.2f}x){marca}"
+        )
+    if not comparacoes:
+        print("  nenhum cenário em comum", file=sys.stderr)
+        sys.exit(2)
+    if regressoes:
+        print(
+            f"\n{len(regressoes)} REGRESSÕES acima de {args.tolerancia:.0%}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
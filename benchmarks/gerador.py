@@ -0,0 +1,137 @@
+"""Gera programas válidos de tamanho controlado para os benchmarks.
+
+Os programas usam apenas variáveis inteiras, divisões por constantes não nulas
+e expressões lineares (produtos sempre entre uma variável e uma constante),
+com o resultado de cada atribuição dividido por uma constante maior que a
+soma dos coeficientes, de modo que os valores permanecem pequenos mesmo em
+laços longos. A saída depende apenas dos parâmetros e da semente.
+
+Uso: python -m benchmarks.gerador [--declaracoes N] [--comandos N]
+         [--tamanho-expressao N] [--profundidade N] [--iteracoes N]
+         [--semente N] > programa.txt
+"""
+
+import random
+import sys
+from typing import List, NamedTuple
+
+
+class ParametrosPrograma(NamedTuple):
+    # Variáveis inteiras declaradas, além dos contadores dos laços.
+    declaracoes: int = 10
+    # Atribuições geradas no total, incluindo as de dentro de se/enquanto.
+    comandos: int = 100
+    # Operandos de cada expressão.
+    tamanho_expressao: int = 4
+    # Níveis de se/enquanto em volta de cada grupo de atribuições, alternando
+    # enquanto (níveis pares) e se (níveis ímpares). 0 gera um programa linear.
+    profundidade: int = 0
+    # Repetições de cada enquanto; com profundidade p, o corpo mais interno
+    # executa iteracoes ** ceil(p / 2) vezes.
+    iteracoes: int = 10
+    # Atribuições em cada grupo aninhado.
+    agrupamento: int = 4
+    semente: int = 0
+
+
+COEFICIENTE_MAXIMO = 9
+
+
+class GeradorPrograma:
+    def __init__(self, parametros: ParametrosPrograma) -> None:
+        self.parametros = parametros
+        self.aleatorio = random.Random(parametros.semente)
+        self.variaveis = [f"v{indice}" for indice in range(max(1, parametros.declaracoes))]
+        self.linhas: List[str] = []
+
+    def gerar(self) -> str:
+        p = self.parametros
+        self.linhas = [f"programa benchmark{p.comandos};", "var"]
+        for inicio in range(0, len(self.variaveis), 8):
+            nomes = ", ".join(self.variaveis[inicio : inicio + 8])
+            self.linhas.append(f"    {nomes}: inteiro;")
+        contadores = [f"k{nivel}" for nivel in range(0, p.profundidade, 2)]
+        if contadores:
+            self.linhas.append(f"    {', '.join(contadores)}: inteiro;")
+
+        self.linhas.append("início")
+        for indice, nome in enumerate(self.variaveis):
+            self.linhas.append(f"    {nome} := {indice % 10};")
+
+        restantes = p.comandos
+        agrupamento = max(1, p.agrupamento) if p.profundidade else restantes
+        while restantes > 0:
+            quantidade = min(agrupamento, restantes)
+            self._grupo(quantidade, 0, "    ")
+            restantes -= quantidade
+
+        amostra = self.variaveis[:: max(1, len(self.variaveis) // 4)]
+        partes = ', " ", '.join(amostra)
+        self.linhas.append(f"    escrever({partes});")
+        self.linhas.append("fim.")
+        return "\n".join(self.linhas) + "\n"
+
+    def _grupo(self, quantidade: int, nivel: int, recuo: str) -> None:
+        p = self.parametros
+        if nivel == p.profundidade:
+            for _ in range(quantidade):
+                self.linhas.append(f"{recuo}{self._atribuicao()};")
+            return
+
+        interno = recuo + "    "
+        if nivel % 2 == 0:
+            contador = f"k{nivel}"
+            self.linhas.append(f"{recuo}{contador} := 0;")
+            self.linhas.append(f"{recuo}enquanto {contador} < {p.iteracoes} faça")
+            self.linhas.append(f"{recuo}início")
+            self._grupo(quantidade, nivel + 1, interno)
+            self.linhas.append(f"{interno}{contador} := {contador} + 1;")
+            self.linhas.append(f"{recuo}fim;")
+        else:
+            esquerda, direita = self.aleatorio.sample(self.variaveis * 2, 2)
+            operador = self.aleatorio.choice(("<", "<=", ">", ">=", "=", "<>"))
+            self.linhas.append(f"{recuo}se {esquerda} {operador} {direita} então")
+            self.linhas.append(f"{recuo}início")
+            self._grupo(quantidade, nivel + 1, interno)
+            self.linhas.append(f"{recuo}fim")
+            self.linhas.append(f"{recuo}senão")
+            self.linhas.append(f"{interno}{self._atribuicao()};")
+
+    def _atribuicao(self) -> str:
+        aleatorio = self.aleatorio
+        operandos = max(1, self.parametros.tamanho_expressao)
+        termos = []
+        for indice in range(operandos):
+            if aleatorio.random() < 0.25:
+                termo = str(aleatorio.randint(1, COEFICIENTE_MAXIMO))
+            else:
+                termo = aleatorio.choice(self.variaveis)
+                if aleatorio.random() < 0.5:
+                    termo += f" * {aleatorio.randint(2, COEFICIENTE_MAXIMO)}"
+            if indice:
+                termo = f"{aleatorio.choice('+-')} {termo}"
+            termos.append(termo)
+        divisor = operandos * COEFICIENTE_MAXIMO + 1
+        destino = aleatorio.choice(self.variaveis)
+        return f"{destino} := ({' '.join(termos)}) / {divisor}"
+
+
+def gerar_programa(parametros: ParametrosPrograma) -> str:
+    return GeradorPrograma(parametros).gerar()
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    padrao = ParametrosPrograma()
+    for campo in ParametrosPrograma._fields:
+        parser.add_argument(
+            f"--{campo.replace('_', '-')}", type=int, default=getattr(padrao, campo)
+        )
+    args = parser.parse_args()
+    sys.stdout.write(gerar_programa(ParametrosPrograma(**vars(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compara a latência de uma edição no DocumentoIncremental com a análise
+léxica e sintática completa, para programas de tamanhos crescentes.
+
+Cada edição insere um trecho no começo de uma expressão e, na seguinte, remove
+o mesmo trecho, em posições espalhadas pelo programa. São medidos, em linhas
+separadas, o trecho `1 + ` e uma quebra de linha, que muda a linha de todos os
+tokens seguintes. A latência incremental deve crescer bem mais devagar que a
+análise completa com o tamanho do arquivo.
+
+Uso: python -m benchmarks.incremental [edicoes]
+"""
+
+import statistics
+import sys
+import time
+from typing import List
+
+from analisador_incremental import DocumentoIncremental
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico
+from benchmarks.gerador import ParametrosPrograma, gerar_programa
+
+
+TAMANHOS = (500, 2000, 8000, 32000)
+
+TRECHOS = (("1 + ", "expressão"), ("\n", "quebra"))
+
+
+def posicoes_de_edicao(codigo_fonte: str, quantidade: int) -> List[int]:
+    """Posições logo após `:= ` distribuídas uniformemente pelo texto."""
+    posicoes = []
+    for i in range(quantidade):
+        inicio = codigo_fonte.find(":= ", len(codigo_fonte) * i // quantidade)
+        if inicio >= 0:
+            posicoes.append(inicio + 3)
+    return posicoes
+
+
+def medir_completo(codigo_fonte: str, repeticoes: int = 3) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        AnalisadorSintatico(AnalisadorLexico(codigo_fonte).analisar()).analisar()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def medir_edicoes(codigo_fonte: str, edicoes: int, trecho: str) -> List[float]:
+    documento = DocumentoIncremental(codigo_fonte)
+    tempos = []
+    # Da última para a primeira, para que as posições calculadas no texto
+    # original continuem válidas depois de cada par de edições.
+    for posicao in reversed(posicoes_de_edicao(codigo_fonte, edicoes)):
+        for removidos, inseridos in ((0, trecho), (len(trecho), "")):
+            inicio = time.perf_counter()
+            documento.editar(posicao, removidos, inseridos)
+            tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main() -> None:
+    edicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    print(
+        f"{'comandos':>9} {'tokens':>9} {'completa ms':>12} {'edição':>10} "
+        f"{'edição mediana ms':>18} {'edição máx. ms':>15} {'razão':>8}"
+    )
+    for comandos in TAMANHOS:
+        codigo_fonte = gerar_programa(
+            ParametrosPrograma(declaracoes=20, comandos=comandos, profundidade=2)
+        )
+        tokens = len(AnalisadorLexico(codigo_fonte).analisar())
+        completo = medir_completo(codigo_fonte)
+        for trecho, nome in TRECHOS:
+            tempos = medir_edicoes(codigo_fonte, edicoes, trecho)
+            mediana = statistics.median(tempos)
+            print(
+                f"{comandos:>9} {tokens:>9} {completo * 1000:>12.2f} {nome:>10} "
+                f"{mediana * 1000:>18.3f} {max(tempos) * 1000:>15.3f} "
+                f"{completo / mediana:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
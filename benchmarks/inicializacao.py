@@ -0,0 +1,177 @@
+"""Mede o custo de inicialização de uma execução curta pela linha de comando:
+as importações (`python -X importtime`), o tempo até o primeiro token e o
+tempo até a primeira linha escrita pelo programa, a partir do momento em que
+o processo é criado.
+
+Antes de medir, o bytecode dos módulos é compilado (como numa instalação
+comum), para que a medição não dependa de PYTHONDONTWRITEBYTECODE.
+
+Uso:
+    python -m benchmarks.inicializacao [--repeticoes N] [--orcamento MS]
+
+Com `--orcamento`, termina com código 1 se a mediana do tempo até a primeira
+linha de saída passar de MS milissegundos.
+"""
+
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA = """programa inicio;
+var i, s: inteiro;
+início
+    escrever("início");
+    i := 0;
+    s := 0;
+    enquanto i < 100 faça
+    início
+        s := s + i;
+        i := i + 1
+    fim;
+    escrever(s)
+fim.
+"""
+
+# Importa o mesmo que a linha de comando e escreve uma linha ao obter o
+# primeiro token do arquivo.
+PRIMEIRO_TOKEN = """import sys
+import interpretador
+from analisador_lexico import AnalisadorLexico
+
+next(AnalisadorLexico.de_arquivo(sys.argv[1]).iter_tokens())
+sys.stdout.write("token\\n")
+sys.stdout.flush()
+"""
+
+
+def tempo_ate_primeira_linha(comando: List[str]) -> Tuple[float, float]:
+    """Tempo desde a criação do processo até a primeira linha em stdout e até
+    o fim do processo."""
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        comando,
+        cwd=RAIZ,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    processo.stdout.readline()
+    primeira_linha = time.perf_counter() - inicio
+    processo.stdout.read()
+    processo.wait()
+    return primeira_linha, time.perf_counter() - inicio
+
+
+def importacoes(repeticoes: int) -> Dict[str, Tuple[float, float]]:
+    """Menor tempo próprio e acumulado (ms) de cada módulo importado por
+    `interpretador`, em `repeticoes` execuções de `python -X importtime`."""
+    tempos: Dict[str, Tuple[float, float]] = {}
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import interpretador"],
+            cwd=RAIZ,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for linha in processo.stderr.splitlines():
+            if not linha.startswith("import time:") or "self [us]" in linha:
+                continue
+            proprio, acumulado, modulo = linha[len("import time:") :].split("|")
+            modulo = modulo.rstrip()
+            atual = (int(proprio) / 1000, int(acumulado) / 1000)
+            anterior = tempos.get(modulo)
+            tempos[modulo] = (
+                atual
+                if anterior is None
+                else (min(anterior[0], atual[0]), min(anterior[1], atual[1]))
+            )
+    return tempos
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Mede o custo de inicialização de execuções curtas."
+    )
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--modulos", type=int, default=15, help="Módulos listados")
+    parser.add_argument(
+        "--orcamento",
+        type=float,
+        metavar="MS",
+        help="Tempo máximo até a primeira linha de saída (mediana)",
+    )
+    args = parser.parse_args()
+    repeticoes = max(1, args.repeticoes)
+
+    compileall.compile_dir(RAIZ, quiet=1)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        programa = os.path.join(diretorio, "inicio.txt")
+        with open(programa, "w", encoding="utf-8") as arquivo:
+            arquivo.write(PROGRAMA)
+
+        comandos = {
+            "python (sem nada)": [sys.executable, "-c", "print()"],
+            "primeiro token": [sys.executable, "-c", PRIMEIRO_TOKEN, programa],
+            "primeira linha de saída": [
+                sys.executable,
+                "interpretador.py",
+                programa,
+                "--saida-linhas",
+                "1",
+            ],
+        }
+        medidas: Dict[str, List[Tuple[float, float]]] = {
+            nome: [] for nome in comandos
+        }
+        for comando in comandos.values():
+            tempo_ate_primeira_linha(comando)
+        # Intercaladas, para que variações da máquina afetem todas igualmente.
+        for _ in range(repeticoes):
+            for nome, comando in comandos.items():
+                medidas[nome].append(tempo_ate_primeira_linha(comando))
+
+    print(f"{'':<26} {'mediana ms':>11} {'mínimo ms':>10} {'até o fim ms':>13}")
+    for nome, tempos in medidas.items():
+        primeiras = [primeira for primeira, _ in tempos]
+        print(
+            f"{nome:<26} {statistics.median(primeiras) * 1000:>11.1f} "
+            f"{min(primeiras) * 1000:>10.1f} "
+            f"{statistics.median(total for _, total in tempos) * 1000:>13.1f}"
+        )
+
+    tempos_importacao = importacoes(min(repeticoes, 5))
+    print(f"\nImportações de `interpretador` (menor de {min(repeticoes, 5)}):")
+    print(f"  {'módulo':<32} {'próprio ms':>10} {'acumulado ms':>13}")
+    mais_lentos = sorted(
+        tempos_importacao.items(), key=lambda item: item[1][0], reverse=True
+    )
+    for modulo, (proprio, acumulado) in mais_lentos[: args.modulos]:
+        print(f"  {modulo.strip():<32} {proprio:>10.2f} {acumulado:>13.2f}")
+
+    if args.orcamento is not None:
+        mediana = statistics.median(
+            primeira for primeira, _ in medidas["primeira linha de saída"]
+        )
+        if mediana * 1000 > args.orcamento:
+            print(
+                f"\nPrimeira linha de saída em {mediana * 1000:.1f} ms, acima do "
+                f"orçamento de {args.orcamento:.1f} ms",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compara a varredura iterativa de `AnalisadorLexico.iter_tokens()` com a
+implementação recursiva anterior, que chamava `_proximo_token` de novo a cada
+espaço, quebra de linha ou comentário.
+
+Uso: python -m benchmarks.lexico [comandos] [repeticoes]
+"""
+
+import sys
+import time
+from typing import Callable, List, Optional
+
+from analisador_lexico import AnalisadorLexico, Token
+
+
+class AnalisadorLexicoRecursivo(AnalisadorLexico):
+    """Reproduz o laço de varredura anterior, com uma chamada recursiva por
+    trecho ignorado."""
+
+    def analisar(self) -> List[Token]:
+        tokens = []
+        while self.posicao < len(self.codigo_fonte):
+            token = self._proximo_token()
+            if token and token.tipo != "ESPAÇO" and token.tipo != "COMENTÁRIO":
+                tokens.append(token)
+        return tokens
+
+    def _proximo_token(self) -> Optional[Token]:
+        match = self.token_regex.match(self.codigo_fonte, self.posicao)
+        if not match:
+            return None
+
+        tipo = match.lastgroup
+        valor = match.group()
+        coluna_inicial = self.coluna
+
+        if tipo == "ESPAÇO":
+            self.posicao = match.end()
+            self.coluna += len(valor)
+            return self._proximo_token()
+
+        if tipo == "NOVA_LINHA":
+            self.posicao = match.end()
+            self.linha += 1
+            self.coluna = 1
+            return self._proximo_token()
+
+        if tipo == "COMENTÁRIO":
+            self.posicao = match.end()
+            num_novas_linhas = valor.count("\n")
+            if num_novas_linhas > 0:
+                self.linha += num_novas_linhas
+                self.coluna = len(valor) - valor.rfind("\n")
+            else:
+                self.coluna += len(valor)
+            return self._proximo_token()
+
+        if tipo == "ID" and valor.lower() in self.palavras_reservadas:
+            tipo = self.palavras_reservadas[valor.lower()]
+
+        if tipo == "ERRO":
+            raise ValueError(
+                f"Erro léxico: Caractere não reconhecido '{valor}' na linha {self.linha}, coluna {coluna_inicial}"
+            )
+
+        token = Token(tipo, valor, self.linha, coluna_inicial)
+        self.posicao = match.end()
+        self.coluna += len(valor)
+        return token
+
+
+def gerar_programa(comandos: int, linhas_em_branco: int = 0) -> str:
+    linhas = ["programa benchmarkLexico;", "var", "    i, soma: inteiro;", "início"]
+    for indice in range(comandos):
+        linhas.append(f"    /* passo {indice} */")
+        linhas.append(f"    soma := soma + i * {indice % 7} - (i / 3);")
+        linhas.append("    i := i + 1;")
+    linhas.extend([""] * linhas_em_branco)
+    linhas.append("    escrever(soma)")
+    linhas.append("fim.")
+    return "\n".join(linhas) + "\n"
+
+
+def medir(
+    criar: Callable[[str], AnalisadorLexico], codigo_fonte: str, repeticoes: int
+) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        criar(codigo_fonte).analisar()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    comandos = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    fontes = [
+        (f"{comandos} comandos comentados", gerar_programa(comandos)),
+        (
+            f"{comandos} comandos + {comandos} linhas em branco",
+            gerar_programa(comandos, linhas_em_branco=comandos),
+        ),
+    ]
+    cenarios = [
+        ("recursivo (anterior)", AnalisadorLexicoRecursivo),
+        ("iterativo (iter_tokens)", AnalisadorLexico),
+    ]
+
+    for descricao, codigo_fonte in fontes:
+        print(f"{descricao}: {len(codigo_fonte)} bytes, melhor de {repeticoes}")
+        referencia = None
+        for nome, criar in cenarios:
+            try:
+                tempo = medir(criar, codigo_fonte, repeticoes)
+            except RecursionError:
+                print(f"  {nome:<30} RecursionError")
+                continue
+            referencia = referencia or tempo
+            print(f"  {nome:<30} {tempo * 1000:10.2f} ms  ({tempo / referencia:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
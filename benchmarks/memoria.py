@@ -0,0 +1,87 @@
+"""Mede o custo em memória de cada token e de cada nó da AST em um programa
+gerado com muitos comandos.
+
+O crescimento da memória residente (RSS) do processo é medido depois de gerar a
+lista de tokens e depois de construir a AST a partir dela; a diferença é
+dividida pelo número de tokens e de nós (contados por `metricas.contar_nos`).
+
+Uso: python -m benchmarks.memoria [comandos]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico
+from metricas import contar_nos
+
+
+VARIAVEIS = 10
+
+
+def gerar_programa(comandos: int) -> str:
+    nomes = [f"v{indice}" for indice in range(VARIAVEIS)]
+    linhas = ["programa benchmarkMemoria;", "var", f"    {', '.join(nomes)}: inteiro;"]
+    linhas.append("início")
+    for indice in range(comandos):
+        destino = nomes[indice % VARIAVEIS]
+        origem = nomes[(indice * 7 + 3) % VARIAVEIS]
+        outro = nomes[(indice * 3 + 1) % VARIAVEIS]
+        linhas.append(f"    {destino} := {origem} + {indice % 97} * {outro};")
+    linhas.append(f"    escrever({nomes[0]})")
+    linhas.append("fim.")
+    return "\n".join(linhas) + "\n"
+
+
+def memoria_residente() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def main() -> None:
+    comandos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", suffix=".txt", delete=False
+    ) as arquivo:
+        arquivo.write(gerar_programa(comandos))
+        caminho = arquivo.name
+
+    try:
+        gc.collect()
+        inicio = memoria_residente()
+        tempo = time.perf_counter()
+        tokens = AnalisadorLexico.de_arquivo(caminho).analisar()
+        tempo_tokens = time.perf_counter() - tempo
+        gc.collect()
+        apos_tokens = memoria_residente()
+
+        tempo = time.perf_counter()
+        arvore = AnalisadorSintatico(tokens).analisar()
+        tempo_arvore = time.perf_counter() - tempo
+        gc.collect()
+        apos_arvore = memoria_residente()
+
+        total_tokens = len(tokens)
+        total_nos = contar_nos(arvore)
+        bytes_token = (apos_tokens - inicio) / total_tokens
+        bytes_no = (apos_arvore - apos_tokens) / total_nos
+
+        print(f"{comandos} comandos, {os.path.getsize(caminho) / 2**20:.1f} MiB")
+        print(
+            f"  tokens: {total_tokens:>10}  {bytes_token:7.1f} bytes/token  "
+            f"(sys.getsizeof(Token) = {sys.getsizeof(tokens[0])})  {tempo_tokens:.2f} s"
+        )
+        print(
+            f"  nós:    {total_nos:>10}  {bytes_no:7.1f} bytes/nó  "
+            f"(fora os tokens, já contados)  {tempo_arvore:.2f} s"
+        )
+    finally:
+        os.unlink(caminho)
+
+
+if __name__ == "__main__":
+    main()
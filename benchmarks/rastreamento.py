@@ -0,0 +1,93 @@
+"""Compara o tempo de interpretação com o rastreamento desligado, ligado e com o
+custo que o antigo `debug_print` impunha (formatar a mensagem de cada nó mesmo
+com DEBUG desligado).
+
+Uso: python -m benchmarks.rastreamento [iteracoes] [repeticoes]
+"""
+
+import sys
+import time
+from typing import Any, Callable, Optional
+
+from abstract_syntax_tree import ASTNode, ProgramaNode
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico
+from interpretador import Interpretador, InterpretadorRastreado
+from rastreamento import NIVEL_NOS, Rastreador, SaidaBufferCircular
+
+
+PROGRAMA = """programa benchmarkRastreamento;
+var
+    i, soma, fator: inteiro;
+início
+    i := 0;
+    soma := 0;
+    fator := 3;
+    enquanto i < {iteracoes} faça
+    início
+        soma := soma + i * fator - i / 2;
+        i := i + 1;
+    fim;
+fim."""
+
+
+class InterpretadorFormatacaoAnsiosa(Interpretador):
+    """Reproduz o custo do `debug_print` anterior: a mensagem de cada nó é
+    formatada e descartada, mesmo sem ninguém para lê-la."""
+
+    def interpretar(self, no: Optional[ASTNode]) -> Any:
+        if no is None:
+            return None
+        f"DEBUG: Interpretando {no}"
+        return super().interpretar(no)
+
+
+def preparar(iteracoes: int) -> ProgramaNode:
+    codigo_fonte = PROGRAMA.replace("{iteracoes}", str(iteracoes))
+    arvore = AnalisadorSintatico(AnalisadorLexico(codigo_fonte).analisar()).analisar()
+    AnalisadorSemantico().visitar(arvore)
+    return arvore
+
+
+def medir(
+    criar: Callable[[], Interpretador], arvore: ProgramaNode, repeticoes: int
+) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        interpretador = criar()
+        inicio = time.perf_counter()
+        interpretador.interpretar(arvore)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main() -> None:
+    iteracoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    arvore = preparar(iteracoes)
+
+    cenarios = [
+        ("rastreamento desligado", Interpretador),
+        (
+            "formatação ansiosa por nó (como o debug_print)",
+            InterpretadorFormatacaoAnsiosa,
+        ),
+        (
+            "rastreamento ligado (nós, buffer circular)",
+            lambda: InterpretadorRastreado(
+                Rastreador(NIVEL_NOS, [SaidaBufferCircular(1000)])
+            ),
+        ),
+    ]
+
+    print(f"{iteracoes} iterações, melhor de {repeticoes} execuções")
+    referencia = None
+    for nome, criar in cenarios:
+        tempo = medir(criar, arvore, repeticoes)
+        referencia = referencia or tempo
+        print(f"  {nome:<45} {tempo * 1000:10.2f} ms  ({tempo / referencia:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compara a latência de ponta a ponta de um programa pequeno executado a
+frio (`python interpretador.py`) com a do cliente leve (`python cliente.py`)
+falando com um servidor já aquecido, e com a de um pedido feito a partir de
+um processo que já está conectado (o custo do servidor em si).
+
+Uso: python -m benchmarks.servidor [repeticoes]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from benchmarks.gerador import ParametrosPrograma, gerar_programa
+from cliente import VARIAVEL_SOCKET, conectar, pedir
+
+
+def medir(executar: Callable[[], None], repeticoes: int) -> List[float]:
+    executar()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def esperar_servidor(caminho: str, limite: float = 30.0) -> None:
+    prazo = time.monotonic() + limite
+    while time.monotonic() < prazo:
+        conexao = conectar(caminho)
+        if conexao is not None:
+            conexao.close()
+            return
+        time.sleep(0.05)
+    raise TimeoutError(f"O servidor não respondeu em {caminho}")
+
+
+def main() -> None:
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        programa = os.path.join(diretorio, "pequeno.txt")
+        with open(programa, "w", encoding="utf-8") as arquivo:
+            arquivo.write(
+                gerar_programa(ParametrosPrograma(declaracoes=5, comandos=30))
+            )
+        caminho_socket = os.path.join(diretorio, "lpc.sock")
+        ambiente = {**os.environ, VARIAVEL_SOCKET: caminho_socket}
+
+        def processo(*argumentos: str) -> Callable[[], None]:
+            comando = [sys.executable, *argumentos, programa]
+            return lambda: subprocess.run(
+                comando,
+                cwd=raiz,
+                env=ambiente,
+                stdout=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                check=True,
+            )
+
+        def pedido_conectado() -> None:
+            conexao = conectar(caminho_socket)
+            with conexao:
+                pedir(
+                    conexao,
+                    {"operacao": "executar", "arquivo": programa, "entrada": ""},
+                )
+
+        resultados = [
+            ("python -c pass", medir(processo("-c", "pass"), repeticoes)),
+            ("interpretador.py (frio)", medir(processo("interpretador.py"), repeticoes)),
+        ]
+        servidor = subprocess.Popen(
+            [sys.executable, "servidor.py", "--socket", caminho_socket],
+            cwd=raiz,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            esperar_servidor(caminho_socket)
+            resultados.append(
+                ("cliente.py + servidor", medir(processo("cliente.py"), repeticoes))
+            )
+            with open(os.devnull, "w") as nulo:
+                stdout, sys.stdout = sys.stdout, nulo
+                try:
+                    tempos = medir(pedido_conectado, repeticoes)
+                finally:
+                    sys.stdout = stdout
+            resultados.append(("pedido de processo já aberto", tempos))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    for nome, tempos in resultados:
+        print(
+            f"  {nome:<30} mediana {statistics.median(tempos) * 1000:7.2f} ms  "
+            f"mínimo {min(tempos) * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
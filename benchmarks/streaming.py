@@ -0,0 +1,68 @@
+"""Compara o pico de memória da análise léxica e sintática de um arquivo grande
+lido inteiro (string + lista de tokens) com a leitura via mmap, em que os
+tokens passam do analisador léxico ao sintático por um lookahead limitado.
+
+Uso: python -m benchmarks.streaming [comandos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico
+from benchmarks.lexico import gerar_programa
+
+
+def ler_inteiro(caminho: str) -> None:
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        codigo_fonte = arquivo.read()
+    tokens = AnalisadorLexico(codigo_fonte).analisar()
+    AnalisadorSintatico(tokens).analisar()
+
+
+def ler_em_fluxo(caminho: str) -> None:
+    tokens = AnalisadorLexico.de_arquivo(caminho).iter_tokens()
+    AnalisadorSintatico(tokens).analisar()
+
+
+def medir(analisar: Callable[[str], None], caminho: str) -> Tuple[float, int]:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    analisar(caminho)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tempo, pico
+
+
+def main() -> None:
+    comandos = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", suffix=".txt", delete=False
+    ) as arquivo:
+        arquivo.write(gerar_programa(comandos))
+        caminho = arquivo.name
+
+    try:
+        tamanho = os.path.getsize(caminho)
+        print(f"{comandos} comandos, {tamanho / 2**20:.1f} MiB de código fonte")
+        for nome, analisar in [
+            ("arquivo inteiro + lista de tokens", ler_inteiro),
+            ("mmap + lookahead de 2 tokens", ler_em_fluxo),
+        ]:
+            tempo, pico = medir(analisar, caminho)
+            print(
+                f"  {nome:<35} pico {pico / 2**20:8.1f} MiB  "
+                f"({pico / tamanho:.1f}x o fonte)  {tempo:.2f} s"
+            )
+    finally:
+        os.unlink(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import mmap
+import os
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from abstract_syntax_tree import ProgramaNode
+
+
+# O interpretador importa este módulo em toda execução, mesmo sem cache;
+# hashlib, pickle, zlib, tempfile e threading só são importados quando o cache
+# é usado.
+
+# Incrementar ao mudar o formato das entradas. Mudanças no código dos módulos
+# abaixo já invalidam o cache sozinhas, pelo hash do código de cada um.
+VERSAO_FORMATO = 1
+
+MODULOS_COMPILADOR = (
+    "analisador_lexico",
+    "analisador_sintatico",
+    "analisador_semantico",
+    "abstract_syntax_tree",
+    "tabela_de_simbolos",
+    "otimizador",
+)
+
+MAGICO = b"LPC\x01"
+EXTENSAO = ".ast"
+TAMANHO_MAXIMO_PADRAO = 64 * 2**20
+PROGRAMAS_EM_MEMORIA_PADRAO = 256
+
+_versao_compilador: Optional[str] = None
+
+
+def versao_compilador() -> str:
+    """Identifica a versão do compilador pelo hash do código fonte dos módulos
+    que produzem a árvore armazenada, mais a versão do Python (do pickle)."""
+    global _versao_compilador
+    if _versao_compilador is None:
+        import hashlib
+        import importlib.util
+
+        resumo = hashlib.sha256(
+            f"{VERSAO_FORMATO}:{sys.version_info[0]}.{sys.version_info[1]}".encode()
+        )
+        for nome in MODULOS_COMPILADOR:
+            with open(importlib.util.find_spec(nome).origin, "rb") as arquivo:
+                resumo.update(arquivo.read())
+        _versao_compilador = resumo.hexdigest()[:16]
+    return _versao_compilador
+
+
+class CacheCompilacao:
+    """Cache em disco de programas já analisados (e otimizados), endereçado
+    pelo conteúdo do código fonte.
+
+    Cada entrada é um arquivo `<chave>.ast` gravado por renomeação atômica, de
+    modo que vários processos podem compartilhar o mesmo diretório. Entradas
+    ilegíveis são tratadas como ausentes e removidas.
+
+    Como carregar uma entrada executa o pickle gravado nela, o cache é de um
+    único usuário: o diretório é criado com modo 0700 e recusado se pertencer
+    a outro usuário ou se outros puderem escrever nele, e entradas de outro
+    dono são ignoradas. Quando o total passa de
+    `tamanho_maximo` bytes, as entradas usadas há mais tempo são descartadas
+    (a data de modificação é atualizada a cada acerto).
+    """
+
+    def __init__(
+        self, diretorio: str, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO
+    ) -> None:
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.remocoes = 0
+        os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        estado = os.stat(diretorio)
+        if estado.st_uid != os.getuid() or estado.st_mode & 0o022:
+            raise PermissionError(
+                f"Diretório de cache inseguro: '{diretorio}' deve pertencer ao "
+                "usuário atual e não pode ter escrita para o grupo ou outros"
+            )
+
+    def chave(self, codigo_fonte: bytes, otimizar: bool) -> str:
+        import hashlib
+
+        resumo = hashlib.sha256(f"{versao_compilador()}:{int(otimizar)}:".encode())
+        resumo.update(codigo_fonte)
+        return resumo.hexdigest()
+
+    def chave_arquivo(self, caminho: str, otimizar: bool) -> str:
+        with open(caminho, "rb") as arquivo:
+            if os.fstat(arquivo.fileno()).st_size == 0:
+                return self.chave(b"", otimizar)
+            with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                return self.chave(mapa, otimizar)
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave + EXTENSAO)
+
+    def carregar(self, chave: str) -> Optional[Tuple[ProgramaNode, List[str]]]:
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as arquivo:
+                if os.fstat(arquivo.fileno()).st_uid != os.getuid():
+                    self.falhas += 1
+                    return None
+                dados = arquivo.read()
+        except FileNotFoundError:
+            self.falhas += 1
+            return None
+
+        import pickle
+        import zlib
+
+        try:
+            if not dados.startswith(MAGICO):
+                raise ValueError("cabeçalho inválido")
+            chave_gravada, arvore, reescritas = pickle.loads(
+                zlib.decompress(dados[len(MAGICO) :])
+            )
+            if chave_gravada != chave:
+                raise ValueError("chave divergente")
+        except Exception:
+            self.falhas += 1
+            self._remover(caminho)
+            return None
+
+        self.acertos += 1
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return arvore, reescritas
+
+    def gravar(self, chave: str, arvore: ProgramaNode, reescritas: List[str]) -> bool:
+        import pickle
+        import tempfile
+        import zlib
+
+        try:
+            dados = MAGICO + zlib.compress(
+                pickle.dumps((chave, arvore, reescritas), pickle.HIGHEST_PROTOCOL)
+            )
+        except RecursionError:
+            # Árvores muito profundas não são serializáveis pelo pickle; o
+            # programa só deixa de ser armazenado.
+            return False
+
+        descritor, temporario = tempfile.mkstemp(
+            dir=self.diretorio, prefix=".tmp-", suffix=EXTENSAO
+        )
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, self._caminho(chave))
+        except OSError:
+            self._remover(temporario)
+            return False
+
+        self.gravacoes += 1
+        self._limitar_tamanho()
+        return True
+
+    def _limitar_tamanho(self) -> None:
+        entradas = []
+        total = 0
+        with os.scandir(self.diretorio) as iterador:
+            for entrada in iterador:
+                if not entrada.name.endswith(EXTENSAO) or entrada.name.startswith("."):
+                    continue
+                try:
+                    estado = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+                total += estado.st_size
+
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.tamanho_maximo:
+                break
+            if self._remover(caminho):
+                self.remocoes += 1
+            total -= tamanho
+
+    @staticmethod
+    def _remover(caminho: str) -> bool:
+        try:
+            os.remove(caminho)
+            return True
+        except OSError:
+            return False
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "gravacoes": self.gravacoes,
+            "remocoes": self.remocoes,
+        }
+
+
+class CacheMemoria(CacheCompilacao):
+    """Cache em memória, para processos de vida longa como o servidor.
+
+    Guarda a própria árvore, sem serializá-la: `carregar` devolve o mesmo
+    objeto a todos, o que é seguro porque a árvore não é modificada depois da
+    compilação (a otimização acontece antes de `gravar`). Pode ser usado por
+    várias threads; quando passa de `maximo_programas` entradas, descarta as
+    usadas há mais tempo.
+    """
+
+    def __init__(self, maximo_programas: int = PROGRAMAS_EM_MEMORIA_PADRAO) -> None:
+        import threading
+
+        self.maximo_programas = maximo_programas
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.remocoes = 0
+        self.programas: "OrderedDict[str, Tuple[ProgramaNode, List[str]]]" = (
+            OrderedDict()
+        )
+        self.trava = threading.Lock()
+
+    def carregar(self, chave: str) -> Optional[Tuple[ProgramaNode, List[str]]]:
+        with self.trava:
+            programa = self.programas.get(chave)
+            if programa is None:
+                self.falhas += 1
+                return None
+            self.programas.move_to_end(chave)
+            self.acertos += 1
+            return programa
+
+    def gravar(self, chave: str, arvore: ProgramaNode, reescritas: List[str]) -> bool:
+        with self.trava:
+            self.programas[chave] = (arvore, reescritas)
+            self.programas.move_to_end(chave)
+            self.gravacoes += 1
+            while len(self.programas) > self.maximo_programas:
+                self.programas.popitem(last=False)
+                self.remocoes += 1
+        return True
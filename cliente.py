@@ -0,0 +1,212 @@
+"""Ponto de entrada leve: executa um programa pelo servidor de compilação
+(`servidor.py`) quando ele está no ar.
+
+Aceita as mesmas opções de `interpretador.py`. Sem servidor, ou com opções
+que só fazem sentido neste processo (rastreamento, perfil, cache em disco),
+executa o interpretador localmente, como antes. Para que o caminho até o
+servidor seja rápido, este módulo só importa módulos leves da biblioteca
+padrão; o compilador só é importado na execução local.
+
+Protocolo: cada mensagem é um objeto JSON em uma linha UTF-8. O cliente
+envia um pedido (`operacao` = `executar`, `compilar`, `verificar` ou
+`estado`); durante `executar` o servidor envia `{"saida": texto}` com o que
+o programa escreveu e `{"ler": true}` quando precisa de mais entrada, ao que
+o cliente responde `{"entrada": texto}` (texto vazio indica o fim da
+entrada). A resposta final traz `"fim": true`. Uma conexão pode enviar
+vários pedidos, um de cada vez.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+from typing import Any, BinaryIO, Dict, List, Optional
+
+
+VARIAVEL_SOCKET = "LPC_SOCKET"
+
+TAMANHO_BLOCO_ENTRADA = 64 * 1024
+
+
+def caminho_socket_padrao() -> str:
+    diretorio = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.environ.get(VARIAVEL_SOCKET) or os.path.join(
+        diretorio, f"lpc-{os.getuid()}.sock"
+    )
+
+
+def enviar(arquivo: BinaryIO, mensagem: Dict[str, Any]) -> None:
+    arquivo.write(json.dumps(mensagem, ensure_ascii=False).encode("utf-8") + b"\n")
+    arquivo.flush()
+
+
+def receber(arquivo: BinaryIO) -> Optional[Dict[str, Any]]:
+    linha = arquivo.readline()
+    return json.loads(linha) if linha else None
+
+
+def conectar(caminho: str) -> Optional[socket.socket]:
+    """Conecta ao servidor; devolve None se não houver servidor em `caminho`."""
+    conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conexao.connect(caminho)
+    except OSError:
+        conexao.close()
+        return None
+    return conexao
+
+
+def pedir(conexao: socket.socket, pedido: Dict[str, Any]) -> Dict[str, Any]:
+    """Envia um pedido e devolve a resposta final, repassando a saída do
+    programa para `sys.stdout` e a entrada padrão para o servidor."""
+    with conexao.makefile("rwb") as arquivo:
+        enviar(arquivo, pedido)
+        while True:
+            mensagem = receber(arquivo)
+            if mensagem is None:
+                raise ConnectionError("O servidor encerrou a conexão")
+            if "saida" in mensagem:
+                sys.stdout.write(mensagem["saida"])
+            elif "ler" in mensagem:
+                sys.stdout.flush()
+                enviar(arquivo, {"entrada": _ler_bloco()})
+            else:
+                return mensagem
+
+
+def _ler_bloco() -> str:
+    # Como a EntradaPadrao: blocos grandes só de arquivos regulares; em
+    # terminais e pipes, uma linha por vez, para não esperar por uma entrada
+    # que só viria depois do próximo prompt.
+    try:
+        regular = stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        regular = True
+    if regular:
+        return sys.stdin.read(TAMANHO_BLOCO_ENTRADA)
+    return sys.stdin.readline()
+
+
+# Opções atendidas pelo servidor e o nome de cada uma no dicionário de opções.
+OPCOES_REMOTAS = {
+    "--backend": "backend",
+    "--saida-buffer": "saida_buffer",
+    "--saida-linhas": "saida_linhas",
+    "--entrada": "entrada",
+    "--metricas": "metricas",
+    "--metricas-arquivo": "metricas_arquivo",
+    "--servidor": "servidor",
+}
+
+
+def _analisar_argumentos(argumentos: List[str]) -> Optional[Dict[str, Any]]:
+    """Opções que o servidor atende; None se houver alguma outra ou algum
+    valor inválido, para que o interpretador local as trate (e relate os
+    erros) com o argparse, que não é importado aqui por ser lento."""
+    opcoes: Dict[str, Any] = {
+        "arquivo": None,
+        "backend": "arvore",
+        "otimizar": False,
+        "saida_buffer": None,
+        "saida_linhas": None,
+        "entrada": None,
+        "metricas": None,
+        "metricas_arquivo": None,
+        "servidor": caminho_socket_padrao(),
+    }
+    argumentos_iter = iter(argumentos)
+    for argumento in argumentos_iter:
+        nome, igual, valor = argumento.partition("=")
+        if argumento == "-O":
+            opcoes["otimizar"] = True
+        elif nome in OPCOES_REMOTAS:
+            if not igual:
+                valor = next(argumentos_iter, None)
+                if valor is None:
+                    return None
+            opcoes[OPCOES_REMOTAS[nome]] = valor
+        elif argumento.startswith("-") or opcoes["arquivo"] is not None:
+            return None
+        else:
+            opcoes["arquivo"] = argumento
+
+    if not opcoes["arquivo"] or opcoes["metricas"] not in (None, "json", "prometheus"):
+        return None
+    try:
+        for nome in ("saida_buffer", "saida_linhas"):
+            if opcoes[nome] is not None:
+                opcoes[nome] = int(opcoes[nome])
+    except ValueError:
+        return None
+    return opcoes
+
+
+def _sem_opcao_servidor(argumentos: List[str]) -> List[str]:
+    restantes = []
+    argumentos_iter = iter(argumentos)
+    for argumento in argumentos_iter:
+        if argumento == "--servidor":
+            next(argumentos_iter, None)
+        elif not argumento.startswith("--servidor="):
+            restantes.append(argumento)
+    return restantes
+
+
+def executar_remoto(conexao: socket.socket, opcoes: Dict[str, Any]) -> None:
+    pedido: Dict[str, Any] = {
+        "operacao": "executar",
+        "arquivo": os.path.abspath(opcoes["arquivo"]),
+        "backend": opcoes["backend"],
+        "otimizar": opcoes["otimizar"],
+        "metricas": opcoes["metricas"],
+    }
+    if opcoes["saida_buffer"] is not None:
+        pedido["saida_buffer"] = opcoes["saida_buffer"]
+    limite_linhas = opcoes["saida_linhas"]
+    if limite_linhas is None and sys.stdout.isatty():
+        limite_linhas = 1
+    if limite_linhas is not None:
+        pedido["saida_linhas"] = limite_linhas
+    if opcoes["entrada"]:
+        pedido["entrada_arquivo"] = os.path.abspath(opcoes["entrada"])
+
+    with conexao:
+        resposta = pedir(conexao, pedido)
+    sys.stdout.flush()
+
+    if not resposta["sucesso"]:
+        if "rastro" in resposta:
+            # Erro durante a interpretação, relatado como pelo executor local.
+            print("\n=== ERRO DURANTE INTERPRETAÇÃO ===")
+            print(f"Erro: {resposta['erro']}")
+            sys.stdout.flush()
+            sys.stderr.write(resposta["rastro"])
+        else:
+            print(f"Erro: {resposta['erro']}")
+    if resposta.get("metricas"):
+        if opcoes["metricas_arquivo"]:
+            with open(opcoes["metricas_arquivo"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(resposta["metricas"])
+        else:
+            sys.stderr.write(resposta["metricas"])
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    if argumentos is None:
+        argumentos = sys.argv[1:]
+    opcoes = _analisar_argumentos(argumentos)
+    conexao = conectar(opcoes["servidor"]) if opcoes else None
+    if conexao is None:
+        from interpretador import main as executar_local
+
+        executar_local(_sem_opcao_servidor(argumentos))
+        return
+    try:
+        executar_remoto(conexao, opcoes)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import operator
+from typing import Any, Callable, List
+from abstract_syntax_tree import *
+from interpretador import Interpretador, InterpretadorError
+
+
+Closure = Callable[[], Any]
+
+OPERADORES_LOGICOS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _dividir(dividendo: Any, divisor: Any) -> Any:
+    if divisor == 0:
+        raise InterpretadorError("Divisão por zero")
+    return dividendo // divisor
+
+
+OPERADORES_ARITMETICOS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _dividir,
+}
+
+
+class CompiladorClosures:
+    """Compila a AST uma única vez em closures Python especializadas.
+
+    As closures leem e escrevem diretamente nos slots de `interpretador.memoria`,
+    de modo que o estado final fica disponível da mesma forma que no modo
+    tree-walking.
+    """
+
+    def __init__(self, interpretador: Interpretador) -> None:
+        self.interpretador = interpretador
+        self.memoria = interpretador.memoria
+
+    def compilar(self, no: ASTNode) -> Closure:
+        nome_metodo = f"compilar_{type(no).__name__}"
+        compilador = getattr(self, nome_metodo, self.compilador_generico)
+        return compilador(no)
+
+    def compilador_generico(self, no: ASTNode) -> Closure:
+        raise InterpretadorError(f"Nenhum método compilar_{type(no).__name__} definido")
+
+    def compilar_ProgramaNode(self, no: ProgramaNode) -> Closure:
+        declarar = self.interpretador.declarar
+        bloco = self.compilar(no.bloco)
+
+        def executar_programa() -> None:
+            declarar(no)
+            bloco()
+
+        return executar_programa
+
+    def compilar_BlocoNode(self, no: BlocoNode) -> Closure:
+        return self._compilar_sequencia(no.lista_comandos)
+
+    def compilar_ListaComandosNode(self, no: ListaComandosNode) -> Closure:
+        return self._compilar_sequencia(no.comandos)
+
+    def _compilar_sequencia(self, comandos: List[ComandoNode]) -> Closure:
+        closures = tuple(self.compilar(comando) for comando in comandos if comando)
+        if len(closures) == 1:
+            return closures[0]
+
+        def executar_sequencia() -> None:
+            for closure in closures:
+                closure()
+
+        return executar_sequencia
+
+    def compilar_AtribuicaoNode(self, no: AtribuicaoNode) -> Closure:
+        memoria = self.memoria
+        slot = no.esquerda.slot
+        direita = self.compilar(no.direita)
+
+        def atribuir() -> None:
+            memoria[slot] = direita()
+
+        return atribuir
+
+    def compilar_LerNode(self, no: LerNode) -> Closure:
+        interpretar_ler = self.interpretador.interpretar_LerNode
+        return lambda: interpretar_ler(no)
+
+    def compilar_EscreverNode(self, no: EscreverNode) -> Closure:
+        partes = tuple(self.compilar(expr) for expr in no.expressoes)
+        escrever_linha = self.interpretador.saida.escrever
+
+        def escrever() -> None:
+            escrever_linha("".join([str(parte()) for parte in partes]))
+
+        return escrever
+
+    def compilar_StringVarNode(self, no: StringVarNode) -> Closure:
+        if no.tipo == "string":
+            valor = no.valor
+            return lambda: valor
+        expr = self.compilar(no.expr)
+        return lambda: str(expr())
+
+    def compilar_SeNode(self, no: SeNode) -> Closure:
+        condicao = self.compilar(no.condicao)
+        entao = self.compilar(no.ramo_entao) if no.ramo_entao else lambda: None
+        if not no.ramo_senao:
+
+            def se() -> None:
+                if condicao():
+                    entao()
+
+            return se
+
+        senao = self.compilar(no.ramo_senao)
+
+        def se_senao() -> None:
+            if condicao():
+                entao()
+            else:
+                senao()
+
+        return se_senao
+
+    def compilar_EnquantoNode(self, no: EnquantoNode) -> Closure:
+        condicao = self.compilar(no.condicao)
+        corpo = self.compilar(no.corpo)
+
+        def enquanto() -> None:
+            while condicao():
+                corpo()
+
+        return enquanto
+
+    def compilar_ExprLogicoNode(self, no: ExprLogicoNode) -> Closure:
+        operador_valor = no.operador.valor
+        if operador_valor not in OPERADORES_LOGICOS:
+            raise InterpretadorError(f"Operador lógico desconhecido: {operador_valor}")
+        comparar = OPERADORES_LOGICOS[operador_valor]
+        esquerda = self.compilar(no.esquerda)
+        direita = self.compilar(no.direita)
+        return lambda: comparar(esquerda(), direita())
+
+    def compilar_ExprLogicoSimpleNode(self, no: ExprLogicoSimpleNode) -> Closure:
+        valor = self.compilar(no.id_node)
+        return lambda: bool(valor())
+
+    def compilar_OpEncadeadaNode(self, no: OpEncadeadaNode) -> Closure:
+        primeiro = self.compilar(no.primeiro)
+        operacoes = []
+        for operador, operando in no.operacoes:
+            if operador.valor not in OPERADORES_ARITMETICOS:
+                raise InterpretadorError(f"Operador desconhecido: {operador.valor}")
+            operacoes.append(
+                (OPERADORES_ARITMETICOS[operador.valor], self.compilar(operando))
+            )
+        if len(operacoes) == 1:
+            aplicar, segundo = operacoes[0]
+            return lambda: aplicar(primeiro(), segundo())
+
+        # Um único laço em vez de closures aninhadas: a profundidade da pilha
+        # Python não cresce com o tamanho da expressão.
+        operacoes_tupla = tuple(operacoes)
+
+        def avaliar_cadeia() -> Any:
+            valor = primeiro()
+            for aplicar, operando in operacoes_tupla:
+                valor = aplicar(valor, operando())
+            return valor
+
+        return avaliar_cadeia
+
+    def compilar_OpUnariaNode(self, no: OpUnariaNode) -> Closure:
+        expr = self.compilar(no.expr)
+        return lambda: -expr()
+
+    def compilar_IdNode(self, no: IdNode) -> Closure:
+        return self._ler_variavel(no.slot)
+
+    def compilar_VariavelNode(self, no: VariavelNode) -> Closure:
+        if no.slot is None:
+            nome_var = no.valor
+
+            def variavel_nao_declarada() -> Any:
+                raise InterpretadorError(f"Variável '{nome_var}' não foi declarada")
+
+            return variavel_nao_declarada
+        return self._ler_variavel(no.slot)
+
+    def compilar_NumeroNode(self, no: NumeroNode) -> Closure:
+        valor = no.valor
+        return lambda: valor
+
+    def _ler_variavel(self, slot: int) -> Closure:
+        memoria = self.memoria
+        return lambda: memoria[slot]
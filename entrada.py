@@ -0,0 +1,131 @@
+import mmap
+import os
+import re
+import stat
+import sys
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
+
+
+TAMANHO_BLOCO = 64 * 1024
+
+_VALOR_BYTES = re.compile(rb"\S+")
+
+
+def eh_arquivo_regular(stream: Any) -> bool:
+    """Indica se `stream` pode ser lido em blocos grandes: arquivos regulares
+    e streams sem descritor (como StringIO). Em pipes e terminais, `read(n)`
+    espera até juntar `n` caracteres, e quem responde aos prompts ficaria
+    esperando a saída que nunca vem."""
+    try:
+        return stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return True
+
+
+def _valores_em_blocos(blocos: Iterable[str]) -> Iterator[str]:
+    """Separa os valores por espaços e quebras de linha, mesmo quando um valor
+    fica dividido entre dois blocos."""
+    resto = ""
+    for bloco in blocos:
+        if not bloco:
+            continue
+        valores = (resto + bloco).split()
+        # Se o bloco não termina em espaço, o último valor pode continuar no
+        # próximo bloco.
+        resto = valores.pop() if valores and not bloco[-1].isspace() else ""
+        yield from valores
+    if resto:
+        yield resto
+
+
+class EntradaPrograma:
+    """Fonte dos valores lidos por `ler`, um valor por variável.
+
+    Os valores são separados por qualquer sequência de espaços ou quebras de
+    linha. Ao fim da entrada, `proximo` lança EOFError, como `input()`.
+    """
+
+    def __init__(self, valores: Iterator[str]) -> None:
+        self.valores = valores
+
+    def proximo(self) -> str:
+        for valor in self.valores:
+            return valor
+        raise EOFError("EOF when reading a line")
+
+
+class EntradaIteravel(EntradaPrograma):
+    """Valores fornecidos pelo próprio programa Python; cada item é convertido
+    com `str` e pode conter vários valores separados por espaços."""
+
+    def __init__(self, itens: Iterable[Any]) -> None:
+        super().__init__(
+            valor for item in itens for valor in str(item).split()
+        )
+
+
+class EntradaBlocos(EntradaPrograma):
+    """Valores de uma sequência de blocos de texto obtidos sob demanda; um
+    valor pode ficar dividido entre dois blocos."""
+
+    def __init__(self, blocos: Iterable[str]) -> None:
+        super().__init__(_valores_em_blocos(blocos))
+
+
+class EntradaArquivo(EntradaPrograma):
+    """Lê um arquivo de texto (caminho ou objeto já aberto) em blocos."""
+
+    def __init__(
+        self, arquivo: Union[str, TextIO], tamanho_bloco: int = TAMANHO_BLOCO
+    ) -> None:
+        super().__init__(_valores_em_blocos(self._blocos(arquivo, tamanho_bloco)))
+
+    @staticmethod
+    def _blocos(arquivo: Union[str, TextIO], tamanho_bloco: int) -> Iterator[str]:
+        if isinstance(arquivo, str):
+            with open(arquivo, "r", encoding="utf-8") as aberto:
+                yield from iter(lambda: aberto.read(tamanho_bloco), "")
+        else:
+            yield from iter(lambda: arquivo.read(tamanho_bloco), "")
+
+
+class EntradaMapeada(EntradaPrograma):
+    """Percorre um `mmap` (ou arquivo mapeado a partir do caminho) sem copiá-lo
+    para uma string."""
+
+    def __init__(self, origem: Union[str, mmap.mmap]) -> None:
+        super().__init__(self._valores(origem))
+
+    @staticmethod
+    def _valores(origem: Union[str, mmap.mmap]) -> Iterator[str]:
+        if isinstance(origem, str):
+            with open(origem, "rb") as arquivo:
+                if arquivo.seek(0, 2) == 0:
+                    return
+                with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                    yield from EntradaMapeada._valores(mapa)
+            return
+        for match in _VALOR_BYTES.finditer(origem):
+            yield match.group().decode("utf-8")
+
+
+class EntradaPadrao(EntradaPrograma):
+    """Lê de `sys.stdin` (o vigente no momento da leitura, como `input()`).
+
+    De arquivos regulares lê em blocos grandes; de terminais e pipes, uma
+    linha por vez, só quando precisa de mais valores.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, tamanho_bloco: int = TAMANHO_BLOCO
+    ) -> None:
+        self.stream = stream
+        self.tamanho_bloco = tamanho_bloco
+        super().__init__(_valores_em_blocos(self._blocos()))
+
+    def _blocos(self) -> Iterator[str]:
+        stream = self.stream or sys.stdin
+        if eh_arquivo_regular(stream):
+            yield from iter(lambda: stream.read(self.tamanho_bloco), "")
+        else:
+            yield from iter(stream.readline, "")
@@ -0,0 +1,244 @@
+import operator
+from typing import Any, Callable, Dict, List
+from abstract_syntax_tree import *
+from interpretador import Interpretador, InterpretadorError
+
+
+OPERADORES_LOGICOS = {
+    "=": "==",
+    "<>": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">=",
+}
+
+INDENTACAO = "    "
+
+# Acima deste número de operações uma cadeia é avaliada por `avaliar_cadeia`:
+# o compilador do CPython é recursivo na profundidade de operadores binários
+# aninhados e falha com RecursionError em expressões muito longas.
+LIMITE_CADEIA = 200
+
+
+def divisao_por_zero() -> Any:
+    raise InterpretadorError("Divisão por zero")
+
+
+def _dividir(dividendo: Any, divisor: Any) -> Any:
+    return dividendo // (divisor or divisao_por_zero())
+
+
+OPERADORES_ARITMETICOS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": _dividir,
+}
+
+
+def avaliar_cadeia(valor: Any, *operacoes: Any) -> Any:
+    for operador, operando in operacoes:
+        valor = OPERADORES_ARITMETICOS[operador](valor, operando)
+    return valor
+
+
+class GeradorPython:
+    """Gera o código fonte de uma única função Python a partir de uma AST já
+    validada pelo AnalisadorSemantico.
+
+    Cada slot de variável vira uma variável local da função gerada; o estado é
+    carregado de `memoria` na entrada e devolvido a ela na saída, mesmo em caso
+    de erro.
+    """
+
+    def __init__(self) -> None:
+        self.linhas: List[str] = []
+        self.nivel = 0
+        self.nomes_locais: Dict[int, str] = {}
+
+    def gerar(self, no: ProgramaNode) -> str:
+        self.linhas = []
+        self.nivel = 0
+        self.nomes_locais = {}
+
+        if no.declaracoes:
+            for declaracao in no.declaracoes.declaracoes:
+                for var_node in declaracao.var_nodes:
+                    self.nomes_locais[var_node.slot] = f"v{var_node.slot}"
+
+        self._emitir(f"# programa {no.nome}")
+        self._emitir(
+            "def programa(memoria, ler_valor, tipos, escrever, divisao_por_zero, "
+            "avaliar_cadeia):"
+        )
+        self.nivel += 1
+        if not self.nomes_locais:
+            self.gerar_comando(no.bloco)
+            self.nivel -= 1
+            return "\n".join(self.linhas) + "\n"
+
+        for slot, nome_local in self.nomes_locais.items():
+            self._emitir(f"{nome_local} = memoria[{slot}]")
+        self._emitir("try:")
+        self._gerar_corpo(no.bloco)
+        self._emitir("finally:")
+        self.nivel += 1
+        for slot, nome_local in self.nomes_locais.items():
+            self._emitir(f"memoria[{slot}] = {nome_local}")
+        self.nivel -= 2
+        return "\n".join(self.linhas) + "\n"
+
+    def compilar(self, no: ProgramaNode) -> Callable[..., None]:
+        codigo = self.gerar(no)
+        namespace: Dict[str, Any] = {}
+        exec(compile(codigo, f"<programa {no.nome}>", "exec"), namespace)
+        return namespace["programa"]
+
+    def _emitir(self, linha: str) -> None:
+        self.linhas.append(INDENTACAO * self.nivel + linha)
+
+    def gerar_comando(self, no: ASTNode) -> None:
+        nome_metodo = f"gerar_{type(no).__name__}"
+        gerador = getattr(self, nome_metodo, self.gerador_generico)
+        gerador(no)
+
+    def gerador_generico(self, no: ASTNode) -> None:
+        raise InterpretadorError(f"Nenhum método gerar_{type(no).__name__} definido")
+
+    def gerar_BlocoNode(self, no: BlocoNode) -> None:
+        for comando in no.lista_comandos:
+            if comando:
+                self.gerar_comando(comando)
+
+    def gerar_ListaComandosNode(self, no: ListaComandosNode) -> None:
+        for comando in no.comandos:
+            self.gerar_comando(comando)
+
+    def gerar_AtribuicaoNode(self, no: AtribuicaoNode) -> None:
+        destino = self.nomes_locais[no.esquerda.slot]
+        self._emitir(f"{destino} = {self.expressao(no.direita)}")
+
+    def gerar_LerNode(self, no: LerNode) -> None:
+        for variavel in no.variaveis:
+            destino = self.nomes_locais[variavel.slot]
+            self._emitir(
+                f"{destino} = ler_valor({variavel.valor!r}, tipos[{variavel.valor!r}])"
+            )
+
+    def gerar_EscreverNode(self, no: EscreverNode) -> None:
+        partes = []
+        for expr in no.expressoes:
+            if expr.tipo == "string":
+                partes.append(repr(expr.valor))
+            else:
+                partes.append(f"str({self.expressao(expr.expr)})")
+        if len(partes) == 1:
+            self._emitir(f"escrever({partes[0]})")
+        else:
+            self._emitir(f"escrever(''.join(({', '.join(partes)})))")
+
+    def gerar_SeNode(self, no: SeNode) -> None:
+        self._emitir(f"if {self.condicao(no.condicao)}:")
+        self._gerar_corpo(no.ramo_entao)
+        if no.ramo_senao:
+            self._emitir("else:")
+            self._gerar_corpo(no.ramo_senao)
+
+    def gerar_EnquantoNode(self, no: EnquantoNode) -> None:
+        self._emitir(f"while {self.condicao(no.condicao)}:")
+        self._gerar_corpo(no.corpo)
+
+    def _gerar_corpo(self, no: Optional[ASTNode]) -> None:
+        self.nivel += 1
+        tamanho_anterior = len(self.linhas)
+        if no:
+            self.gerar_comando(no)
+        if len(self.linhas) == tamanho_anterior:
+            self._emitir("pass")
+        self.nivel -= 1
+
+    def condicao(self, no: ASTNode) -> str:
+        if isinstance(no, ExprLogicoSimpleNode):
+            return self.nomes_locais[no.id_node.slot]
+        operador_valor = no.operador.valor
+        if operador_valor not in OPERADORES_LOGICOS:
+            raise InterpretadorError(f"Operador lógico desconhecido: {operador_valor}")
+        return (
+            f"{self.expressao(no.esquerda)} {OPERADORES_LOGICOS[operador_valor]} "
+            f"{self.expressao(no.direita)}"
+        )
+
+    def expressao(self, no: ASTNode) -> str:
+        nome_metodo = f"expressao_{type(no).__name__}"
+        gerador = getattr(self, nome_metodo, self.gerador_generico)
+        return gerador(no)
+
+    def expressao_OpEncadeadaNode(self, no: OpEncadeadaNode) -> str:
+        if len(no.operacoes) > LIMITE_CADEIA:
+            return self._cadeia_longa(no)
+        partes = [self._operando(no.primeiro)]
+        for operador, operando in no.operacoes:
+            texto = self._operando(operando)
+            if operador.valor in ("+", "-", "*"):
+                partes.append(f"{operador.valor} {texto}")
+            elif operador.valor == "/":
+                if isinstance(operando, NumeroNode) and operando.valor != 0:
+                    partes.append(f"// {texto}")
+                else:
+                    partes.append(f"// ({texto} or divisao_por_zero())")
+            else:
+                raise InterpretadorError(f"Operador desconhecido: {operador.valor}")
+        return " ".join(partes)
+
+    def _cadeia_longa(self, no: OpEncadeadaNode) -> str:
+        partes = [self.expressao(no.primeiro)]
+        for operador, operando in no.operacoes:
+            if operador.valor not in OPERADORES_ARITMETICOS:
+                raise InterpretadorError(f"Operador desconhecido: {operador.valor}")
+            partes.append(f"({operador.valor!r}, {self.expressao(operando)})")
+        return f"avaliar_cadeia({', '.join(partes)})"
+
+    def expressao_OpUnariaNode(self, no: OpUnariaNode) -> str:
+        return f"-{self._operando(no.expr)}"
+
+    def expressao_VariavelNode(self, no: VariavelNode) -> str:
+        return self.nomes_locais[no.slot]
+
+    def expressao_NumeroNode(self, no: NumeroNode) -> str:
+        return str(no.valor)
+
+    def _operando(self, no: ASTNode) -> str:
+        # Cadeias aninhadas vieram de parênteses no fonte e continuam agrupadas.
+        if isinstance(no, OpEncadeadaNode):
+            return f"({self.expressao(no)})"
+        return self.expressao(no)
+
+
+def executar_programa(interpretador: Interpretador, arvore: ProgramaNode) -> None:
+    interpretador.declarar(arvore)
+    programa = GeradorPython().compilar(arvore)
+    programa(
+        interpretador.memoria,
+        interpretador.ler_valor,
+        interpretador.tipos,
+        interpretador.saida.escrever,
+        divisao_por_zero,
+        avaliar_cadeia,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    from analisador_lexico import AnalisadorLexico
+    from analisador_sintatico import AnalisadorSintatico
+    from analisador_semantico import AnalisadorSemantico
+
+    if len(sys.argv) < 2:
+        print("Uso: python gerador_python.py <arquivo>")
+        sys.exit(1)
+
+    tokens = AnalisadorLexico.de_arquivo(sys.argv[1]).iter_tokens()
+    arvore_sintatica = AnalisadorSintatico(tokens).analisar()
+    AnalisadorSemantico().visitar(arvore_sintatica)
+    print(GeradorPython().gerar(arvore_sintatica), end="")
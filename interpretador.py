@@ -1,18 +1,33 @@
 import sys
-from typing import Dict, Any, Optional, Union
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional, Tuple, Union
 from abstract_syntax_tree import *
 from analisador_lexico import AnalisadorLexico
 from analisador_sintatico import AnalisadorSintatico
 from analisador_semantico import AnalisadorSemantico
-import traceback
-import sys
-
-DEBUG = False
-
-
-def debug_print(*args, **kwargs) -> None:
-    if DEBUG:
-        print(*args, **kwargs)
+from cache_compilacao import TAMANHO_MAXIMO_PADRAO, CacheCompilacao
+from entrada import EntradaMapeada, EntradaPadrao, EntradaPrograma
+from metricas import ResultadoExecucao, contar_nos
+from saida import (
+    LIMITE_BUFFER_PADRAO,
+    SaidaBufferizada,
+    SaidaContada,
+    SaidaPrograma,
+    SaidaTexto,
+)
+from rastreamento import (
+    NIVEIS,
+    NIVEL_COMANDOS,
+    NIVEL_DESATIVADO,
+    NIVEL_FASES,
+    NIVEL_NOS,
+    RASTREADOR_DESATIVADO,
+    Rastreador,
+    SaidaArquivo,
+    SaidaStream,
+)
+from tabela_de_simbolos import eh_temporaria
+from visitante import Visitante
 
 
 class InterpretadorError(Exception):
@@ -22,20 +37,50 @@ class InterpretadorError(Exception):
         super().__init__(self.mensagem)
 
 
-class Interpretador:
-    def __init__(self) -> None:
-        self.variaveis: Dict[str, Any] = {}
+class Interpretador(Visitante):
+    """Interpretador tree-walking de referência.
+
+    Os valores das variáveis ficam em `memoria`, indexada pelo slot que o
+    AnalisadorSemantico atribuiu a cada variável declarada; `variaveis` é uma
+    visão por nome, usada apenas fora do caminho quente, que omite as
+    temporárias criadas pelo otimizador.
+    """
+
+    PREFIXO_METODO = "interpretar_"
+    METODO_GENERICO = "interpretador_generico"
+
+    def __init__(
+        self,
+        saida: Optional[SaidaPrograma] = None,
+        entrada: Optional[EntradaPrograma] = None,
+    ) -> None:
+        self.memoria: List[Any] = []
+        self.nomes: List[str] = []
         self.tipos: Dict[str, str] = {}
+        self.saida = saida or SaidaTexto()
+        self.entrada = entrada or EntradaPadrao()
+
+    @property
+    def variaveis(self) -> Dict[str, Any]:
+        return {
+            nome: valor
+            for nome, valor in zip(self.nomes, self.memoria)
+            if not eh_temporaria(nome)
+        }
+
+    def declarar(self, programa: ProgramaNode) -> None:
+        # A lista é reaproveitada para que backends que já capturaram
+        # `memoria` continuem enxergando o mesmo quadro.
+        self.memoria[:] = [None] * programa.total_slots
+        self.nomes[:] = [""] * programa.total_slots
+        if programa.declaracoes:
+            self.interpretar(programa.declaracoes)
 
     def interpretar(self, no: Optional[ASTNode]) -> Any:
         if no is None:
-            debug_print("DEBUG: Nó é None, retornando None")
             return None
 
-        nome_metodo = f"interpretar_{type(no).__name__}"
-        debug_print(f"DEBUG: Interpretando {no}")
-        interpretador = getattr(self, nome_metodo, self.interpretador_generico)
-        return interpretador(no)
+        return self.despacho[type(no)](self, no)
 
     def interpretador_generico(self, no: ASTNode) -> None:
         raise InterpretadorError(
@@ -43,149 +88,97 @@ class Interpretador:
         )
 
     def interpretar_ProgramaNode(self, no):
-        debug_print(f"=== EXECUTANDO PROGRAMA: {no.nome} ===")
-
-        if hasattr(no, "declaracoes") and no.declaracoes:
-            debug_print("Processando declarações (DeclaracoesNode)")
-            self.interpretar(no.declaracoes)
-
-        debug_print("Executando bloco principal")
+        self.declarar(no)
         self.interpretar(no.bloco)
 
-        debug_print("=== PROGRAMA FINALIZADO ===")
-
     def interpretar_DeclaracoesNode(self, no):
-        debug_print(f"Processando {len(no.declaracoes)} grupos de declarações")
         for declaracao in no.declaracoes:
             self.interpretar(declaracao)
 
     def interpretar_DeclaracaoVarNode(self, no):
         tipo = no.tipo_node.valor
-        debug_print(f"Declarando variáveis do tipo: {tipo}")
-
         for var_node in no.var_nodes:
             nome_var = var_node.valor
             if tipo == "inteiro":
-                self.variaveis[nome_var] = 0
+                self.memoria[var_node.slot] = 0
             elif tipo == "lógico":
-                self.variaveis[nome_var] = False
+                self.memoria[var_node.slot] = False
+            self.nomes[var_node.slot] = nome_var
             self.tipos[nome_var] = tipo
-            debug_print(
-                f"  Variável '{nome_var}' declarada como {tipo} = {self.variaveis[nome_var]}"
-            )
 
     def interpretar_BlocoNode(self, no):
-        debug_print(f"Executando bloco com {len(no.lista_comandos)} comandos")
-        for i, comando in enumerate(no.lista_comandos):
+        for comando in no.lista_comandos:
             if comando:
-                debug_print(f"  Comando {i+1}: {type(comando).__name__}")
                 self.interpretar(comando)
 
     def interpretar_ListaComandosNode(self, no):
-        debug_print(f"Executando lista com {len(no.comandos)} comandos")
-        for i, comando in enumerate(no.comandos):
-            debug_print(f"  Comando {i+1}: {type(comando).__name__}")
+        for comando in no.comandos:
             self.interpretar(comando)
 
     def interpretar_AtribuicaoNode(self, no):
-        nome_var = no.esquerda.valor
-        debug_print(f"ATRIBUIÇÃO: {nome_var} := ?")
-        valor_antigo = self.variaveis[nome_var]
         valor = self.interpretar(no.direita)
-        self.variaveis[nome_var] = valor
-        debug_print(f"  {nome_var}: {valor_antigo} → {valor}")
+        self.memoria[no.esquerda.slot] = valor
 
     def interpretar_LerNode(self, no):
-        debug_print(f"LEITURA de {len(no.variaveis)} variáveis")
         for variavel in no.variaveis:
-            if variavel and hasattr(variavel, "valor"):
-                nome_var = variavel.valor
-                try:
-                    tipo_var = self.tipos[nome_var]
-                    debug_print(f"  Lendo {nome_var} ({tipo_var})")
-
-                    if tipo_var == "inteiro":
-                        valor = int(input(""))
-                    elif tipo_var == "lógico":
-                        entrada = input("").lower()
-                        valor = entrada == "1"
-                    else:
-                        raise InterpretadorError(
-                            f"Tipo de variável '{tipo_var}' não suportado"
-                        )
-
-                    valor_antigo = self.variaveis[nome_var]
-                    self.variaveis[nome_var] = valor
-                    debug_print(f"    {nome_var}: {valor_antigo} → {valor}")
-
-                except ValueError:
-                    raise InterpretadorError(
-                        f"Valor inválido para variável '{nome_var}' do tipo {tipo_var}"
-                    )
+            valor = self.ler_valor(variavel.valor, variavel.tipo_resolvido)
+            self.memoria[variavel.slot] = valor
+
+    def ler_valor(self, nome_var: str, tipo_var: str) -> Any:
+        # O texto já escrito precisa aparecer antes de o programa esperar a entrada.
+        self.saida.descarregar()
+        try:
+            if tipo_var == "inteiro":
+                return int(self.entrada.proximo())
+            elif tipo_var == "lógico":
+                return self.entrada.proximo().lower() == "1"
+            else:
+                raise InterpretadorError(f"Tipo de variável '{tipo_var}' não suportado")
+
+        except ValueError:
+            raise InterpretadorError(
+                f"Valor inválido para variável '{nome_var}' do tipo {tipo_var}"
+            )
 
     def interpretar_EscreverNode(self, no):
-        debug_print(f"ESCRITA de {len(no.expressoes)} expressões")
         saida = []
-        for i, expr in enumerate(no.expressoes):
-            debug_print(f"  Expressão {i+1}: {type(expr).__name__}")
+        for expr in no.expressoes:
             valor = self.interpretar(expr)
-            debug_print(f"    Resultado: {valor}")
             saida.append(str(valor))
         resultado = "".join(saida)
-        debug_print(f"SAÍDA: {resultado}")
-        print(resultado)
+        self.saida.escrever(resultado)
 
     def interpretar_StringVarNode(self, no):
         if no.tipo == "string":
             valor = no.valor
-            debug_print(f"STRING LITERAL: '{valor}'")
             return valor
         elif no.tipo == "expr":
-            debug_print("STRING EXPRESSÃO")
             valor = self.interpretar(no.expr)
-            debug_print(f"  Valor da expressão: {valor}")
             return str(valor)
 
     def interpretar_SeNode(self, no):
-        debug_print("ESTRUTURA CONDICIONAL (SE)")
-        debug_print("  Avaliando condição...")
         condicao_resultado = self.interpretar(no.condicao)
-        debug_print(f"  Condição: {condicao_resultado}")
         if condicao_resultado:
-            debug_print("  Executando ramo ENTÃO")
             if no.ramo_entao:
                 self.interpretar(no.ramo_entao)
         else:
-            debug_print("  Executando ramo SENÃO")
-            if hasattr(no, "ramo_senao") and no.ramo_senao:
+            if no.ramo_senao:
                 self.interpretar(no.ramo_senao)
 
     def interpretar_EnquantoNode(self, no):
-        debug_print("LOOP ENQUANTO")
         if no.condicao and no.corpo:
-            iteracao = 0
             while True:
-                iteracao += 1
-                debug_print(f"  Iteração {iteracao}")
-                debug_print("    Avaliando condição...")
                 condicao_resultado = self.interpretar(no.condicao)
-                debug_print(f"    Condição: {condicao_resultado}")
 
                 if not condicao_resultado:
-                    debug_print("  Loop finalizado")
                     break
 
-                debug_print("    Executando corpo do loop")
                 self.interpretar(no.corpo)
 
     def interpretar_ExprLogicoNode(self, no):
-        debug_print("EXPRESSÃO LÓGICA")
         operador_valor = no.operador.valor
-        debug_print(f"  Operador: {operador_valor}")
         esquerda = self.interpretar(no.esquerda)
-        debug_print(f"  Operando esquerdo: {esquerda}")
         direita = self.interpretar(no.direita)
-        debug_print(f"  Operando direito: {direita}")
         if operador_valor == "=":
             resultado = esquerda == direita
         elif operador_valor == "<>":
@@ -200,203 +193,485 @@ class Interpretador:
             resultado = esquerda >= direita
         else:
             raise InterpretadorError(f"Operador lógico desconhecido: {operador_valor}")
-        debug_print(f"  Resultado: {esquerda} {operador_valor} {direita} = {resultado}")
         return resultado
 
     def interpretar_ExprLogicoSimpleNode(self, no):
-        debug_print("EXPRESSÃO LÓGICA SIMPLES")
         valor = self.interpretar(no.id_node)
-        debug_print(f"  Valor: {valor}")
         resultado = bool(valor)
-        debug_print(f"  Resultado lógico: {resultado}")
         return resultado
 
-    def interpretar_ExprNode(self, no):
-        debug_print("EXPRESSÃO ARITMÉTICA")
-        termo_valor = self.interpretar(no.termo)
-        debug_print(f"  Resultado do termo: {termo_valor}")
-        if hasattr(no, "expr2") and no.expr2:
-            debug_print(f"  Interpretando expr2...")
-            expr2_resultado = self.interpretar_expr2_com_valor(no.expr2, termo_valor)
-            debug_print(f"  Resultado final da expressão: {expr2_resultado}")
-            return expr2_resultado
-
-        return termo_valor
-
-    def interpretar_TermoNode(self, no):
-        debug_print("TERMO")
-        fator_valor = self.interpretar(no.fator)
-        debug_print(f"  Resultado do fator: {fator_valor}")
-        if hasattr(no, "termo2") and no.termo2:
-            debug_print(f"  Interpretando termo2...")
-            termo2_resultado = self.interpretar_termo2_com_valor(no.termo2, fator_valor)
-            debug_print(f"  Resultado final do termo: {termo2_resultado}")
-            return termo2_resultado
-
-        return fator_valor
-
-    def interpretar_FatorNode(self, no):
-        debug_print(f"FATOR ({no.tipo})")
-        if no.tipo == "parenteses":
-            debug_print("  Avaliando expressão entre parênteses")
-            return self.interpretar(no.expr)
-        elif no.tipo == "negativo":
-            debug_print("  Aplicando negação")
-            valor = self.interpretar(no.fator)
-            resultado = -valor
-            debug_print(f"  -{valor} = {resultado}")
-            return resultado
-        elif no.tipo == "id":
-            nome_var = no.valor
-            valor = self.variaveis[nome_var]
-            debug_print(f"  Variável {nome_var} = {valor}")
-            return valor
-        elif no.tipo == "num":
-            debug_print(f"  Número: {no.valor}")
-            return no.valor
-
-    def interpretar_expr2_com_valor(self, expr2_no, valor_acumulado):
-        if hasattr(expr2_no, "operador") and expr2_no.operador:
-            termo_valor = self.interpretar(expr2_no.termo)
-            debug_print(f"  Valor do termo: {termo_valor}")
-            operador = expr2_no.operador.valor
-            debug_print(f"  Operador: {operador}")
-            if operador == "+":
-                resultado_parcial = valor_acumulado + termo_valor
-            elif operador == "-":
-                resultado_parcial = valor_acumulado - termo_valor
-            else:
-                raise InterpretadorError(f"Operador desconhecido em Expr2: {operador}")
-            debug_print(
-                f"  Operação: {valor_acumulado} {operador} {termo_valor} = {resultado_parcial}"
-            )
-            if hasattr(expr2_no, "expr2") and expr2_no.expr2:
-                resultado_final = self.interpretar_expr2_com_valor(
-                    expr2_no.expr2, resultado_parcial
-                )
-                return resultado_final
-            else:
-                return resultado_parcial
-        else:
-            return valor_acumulado
-
-    def interpretar_termo2_com_valor(self, termo2_no, valor_acumulado):
-        if hasattr(termo2_no, "operador") and termo2_no.operador:
-            fator_valor = self.interpretar(termo2_no.fator)
-            debug_print(f"  Valor do fator: {fator_valor}")
-            operador = termo2_no.operador.valor
-            debug_print(f"  Operador: {operador}")
-            if operador == "*":
-                resultado_parcial = valor_acumulado * fator_valor
-            elif operador == "/":
-                if fator_valor == 0:
+    def interpretar_OpEncadeadaNode(self, no):
+        valor_acumulado = self.interpretar(no.primeiro)
+        for operador, operando in no.operacoes:
+            valor = self.interpretar(operando)
+            if operador.valor == "+":
+                valor_acumulado = valor_acumulado + valor
+            elif operador.valor == "-":
+                valor_acumulado = valor_acumulado - valor
+            elif operador.valor == "*":
+                valor_acumulado = valor_acumulado * valor
+            elif operador.valor == "/":
+                if valor == 0:
                     raise InterpretadorError("Divisão por zero")
-                resultado_parcial = valor_acumulado // fator_valor
+                valor_acumulado = valor_acumulado // valor
             else:
-                raise InterpretadorError(f"Operador desconhecido em Termo2: {operador}")
-
-            debug_print(
-                f"  Operação: {valor_acumulado} {operador} {fator_valor} = {resultado_parcial}"
-            )
+                raise InterpretadorError(f"Operador desconhecido: {operador.valor}")
+        return valor_acumulado
 
-            if hasattr(termo2_no, "termo2") and termo2_no.termo2:
-                resultado_final = self.interpretar_termo2_com_valor(
-                    termo2_no.termo2, resultado_parcial
-                )
-                return resultado_final
-            else:
-                return resultado_parcial
-        else:
-            return valor_acumulado
+    def interpretar_OpUnariaNode(self, no):
+        valor = self.interpretar(no.expr)
+        return -valor
 
     def interpretar_IdNode(self, no):
-        nome_var = no.valor
-        valor = self.variaveis[nome_var]
-        debug_print(f"ID: {nome_var} = {valor}")
-        return valor
+        return self.memoria[no.slot]
 
     def interpretar_OpLogicoNode(self, no):
         return no.valor
 
     def interpretar_VariavelNode(self, no):
-        if hasattr(no, "valor") and no.valor:
-            nome_var = no.valor
+        if no.slot is None:
+            raise InterpretadorError(f"Variável '{no.valor}' não foi declarada")
+        return self.memoria[no.slot]
 
-            if nome_var not in self.variaveis:
-                raise InterpretadorError(f"Variável '{nome_var}' não foi declarada")
+    def interpretar_NumeroNode(self, no):
+        return no.valor
 
-            valor = self.variaveis[nome_var]
-            debug_print(f"VARIÁVEL: {nome_var} = {valor}")
-            return valor
 
-        return 0
+class InterpretadorRastreado(Interpretador):
+    """Interpretador que emite um evento de rastreamento a cada nó visitado.
 
-    def interpretar_NumeroNode(self, no):
-        debug_print(f"NÚMERO: {no.valor}")
-        return no.valor
+    Só é usado quando o rastreamento está habilitado; com ele desativado o
+    ExecutorInterpretador usa o Interpretador comum, sem nenhum custo extra.
+    """
+
+    def __init__(
+        self,
+        rastreador: Rastreador,
+        saida: Optional[SaidaPrograma] = None,
+        entrada: Optional[EntradaPrograma] = None,
+    ) -> None:
+        super().__init__(saida, entrada)
+        self.rastreador = rastreador
+        self.profundidade = 0
+
+    def interpretar(self, no: Optional[ASTNode]) -> Any:
+        if no is None:
+            return None
+
+        nivel = NIVEL_COMANDOS if isinstance(no, ComandoNode) else NIVEL_NOS
+        recuo = "  " * self.profundidade
+        self.rastreador.emitir(nivel, "{}Interpretando {}", recuo, no)
+        self.profundidade += 1
+        try:
+            resultado = super().interpretar(no)
+        finally:
+            self.profundidade -= 1
+        if resultado is not None:
+            self.rastreador.emitir(
+                nivel, "{}{} → {!r}", recuo, type(no).__name__, resultado
+            )
+        return resultado
+
+
+class InterpretadorMedido(Interpretador):
+    """Interpretador que conta nós avaliados, iterações de laço, leituras e
+    linhas escritas, para o ResultadoExecucao.
+
+    Leituras e escritas são contadas em qualquer backend; nós e iterações,
+    apenas quando a própria árvore é interpretada.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.saida = SaidaContada(self.saida)
+        self.avaliacoes = 0
+        self.iteracoes = 0
+        self.leituras = 0
+
+    def interpretar(self, no: Optional[ASTNode]) -> Any:
+        self.avaliacoes += 1
+        return super().interpretar(no)
+
+    def interpretar_EnquantoNode(self, no):
+        if no.condicao and no.corpo:
+            while self.interpretar(no.condicao):
+                self.iteracoes += 1
+                self.interpretar(no.corpo)
+
+    def ler_valor(self, nome_var: str, tipo_var: str) -> Any:
+        self.leituras += 1
+        return super().ler_valor(nome_var, tipo_var)
+
+
+class InterpretadorRastreadoMedido(InterpretadorMedido, InterpretadorRastreado):
+    pass
+
+
+BACKENDS = ("arvore", "closures", "python", "vm")
 
 
 class ExecutorInterpretador:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        backend: str = "arvore",
+        rastreador: Optional[Rastreador] = None,
+        otimizar: bool = False,
+        cache: Optional[CacheCompilacao] = None,
+        saida: Optional[SaidaPrograma] = None,
+        entrada: Optional[EntradaPrograma] = None,
+        metricas: bool = False,
+        perfilar: bool = False,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Backend '{backend}' desconhecido. Opções: {', '.join(BACKENDS)}"
+            )
+        if perfilar and backend != "arvore":
+            raise ValueError("O perfil por linha só está disponível no backend 'arvore'")
+        self.rastreador = rastreador or RASTREADOR_DESATIVADO
+        # O InterpretadorPerfilado não conta avaliações, leituras e escritas
+        # nem emite os eventos de comando.
+        if perfilar and metricas:
+            raise ValueError("O perfil por linha não pode ser combinado com métricas")
+        if perfilar and self.rastreador.habilitado(NIVEL_COMANDOS):
+            raise ValueError(
+                "O perfil por linha não pode ser combinado com o rastreamento "
+                "de comandos"
+            )
+        self.backend = backend
+        self.otimizar = otimizar
+        self.cache = cache
+        self.saida = saida or SaidaBufferizada(SaidaTexto())
+        self.entrada = entrada or EntradaPadrao()
+        self.metricas = metricas
+        self.perfilar = perfilar
+        self.resultado = ResultadoExecucao(backend)
+        self.reescritas: List[str] = []
         self.analisador_lexico: Optional[AnalisadorLexico] = None
         self.analisador_sintatico: Optional[AnalisadorSintatico] = None
         self.analisador_semantico = AnalisadorSemantico()
         self.interpretador: Optional[Interpretador] = None
 
-    def interpretar_codigo(self, codigo_fonte: str) -> bool:
-        try:
-            debug_print("=== INICIANDO ANÁLISE LÉXICA ===")
-            self.analisador_lexico = AnalisadorLexico(codigo_fonte)
-            tokens = self.analisador_lexico.analisar()
-            debug_print(f"Tokens gerados: {len(tokens)}")
+    def executar(self, arvore_sintatica: ProgramaNode) -> None:
+        if self.perfilar:
+            from perfilador import InterpretadorPerfilado
 
-            debug_print("\n=== INICIANDO ANÁLISE SINTÁTICA ===")
+            self.interpretador = InterpretadorPerfilado(self.saida, self.entrada)
+        elif self.rastreador.habilitado(NIVEL_COMANDOS):
+            classe = (
+                InterpretadorRastreadoMedido if self.metricas else InterpretadorRastreado
+            )
+            self.interpretador = classe(self.rastreador, self.saida, self.entrada)
+        else:
+            classe = InterpretadorMedido if self.metricas else Interpretador
+            self.interpretador = classe(self.saida, self.entrada)
+
+        if self.backend == "arvore":
+            self.interpretador.interpretar(arvore_sintatica)
+        elif self.backend == "closures":
+            from compilador_closures import CompiladorClosures
+
+            programa = CompiladorClosures(self.interpretador).compilar(
+                arvore_sintatica
+            )
+            programa()
+        elif self.backend == "python":
+            from gerador_python import executar_programa
+
+            executar_programa(self.interpretador, arvore_sintatica)
+        elif self.backend == "vm":
+            from maquina_virtual import executar_programa
+
+            executar_programa(self.interpretador, arvore_sintatica)
+
+    def interpretar_codigo(self, codigo_fonte: str) -> ResultadoExecucao:
+        chave = None
+        if self.cache:
+            chave = self.cache.chave(codigo_fonte.encode("utf-8"), self.otimizar)
+        return self.interpretar_fonte(AnalisadorLexico(codigo_fonte), chave)
+
+    def interpretar_arquivo(self, caminho: str) -> ResultadoExecucao:
+        chave = self.cache.chave_arquivo(caminho, self.otimizar) if self.cache else None
+        return self.interpretar_fonte(AnalisadorLexico.de_arquivo(caminho), chave)
+
+    def _fase(self, nome: str, descontar: Tuple[str, ...] = ()):
+        # Sem métricas, nem o relógio é consultado.
+        if not self.metricas:
+            return nullcontext()
+        return self.resultado.medir(nome, descontar)
+
+    def compilar(self, analisador_lexico: AnalisadorLexico) -> ProgramaNode:
+        rastreador = self.rastreador
+        rastreador.emitir(NIVEL_FASES, "=== INICIANDO ANÁLISE LÉXICA E SINTÁTICA ===")
+        self.analisador_lexico = analisador_lexico
+        # Os tokens são gerados sob demanda pelo analisador sintático, sem uma
+        # lista intermediária; com métricas, o tempo do analisador léxico é
+        # medido a cada token pedido e descontado da fase sintática.
+        tokens = analisador_lexico.iter_tokens()
+        if self.metricas:
+            tokens = self.resultado.medir_fluxo("lexico", tokens)
+        with self._fase("sintatico", descontar=("lexico",)):
             self.analisador_sintatico = AnalisadorSintatico(tokens)
             arvore_sintatica = self.analisador_sintatico.analisar()
+        rastreador.emitir(
+            NIVEL_FASES, "Tokens consumidos: {}", self.analisador_sintatico.posicao
+        )
 
-            if arvore_sintatica is None:
-                raise Exception("Análise sintática falhou - árvore sintática é None")
+        if arvore_sintatica is None:
+            raise Exception("Análise sintática falhou - árvore sintática é None")
 
-            debug_print(f"AST raiz: {type(arvore_sintatica).__name__}")
+        rastreador.emitir(NIVEL_FASES, "AST raiz: {}", arvore_sintatica)
+        if self.metricas:
+            self.resultado.nos = contar_nos(arvore_sintatica)
 
-            debug_print("\n=== INICIANDO ANÁLISE SEMÂNTICA ===")
+        rastreador.emitir(NIVEL_FASES, "\n=== INICIANDO ANÁLISE SEMÂNTICA ===")
+        with self._fase("semantico"):
             self.analisador_semantico.visitar(arvore_sintatica)
-            debug_print("Análise semântica concluída")
-
-            debug_print("\n=== INICIANDO INTERPRETAÇÃO ===")
-            self.interpretador = Interpretador()
-            self.interpretador.interpretar(arvore_sintatica)
-
-            debug_print("\n=== ESTADO FINAL DAS VARIÁVEIS ===")
-            for var, valor in self.interpretador.variaveis.items():
-                tipo = self.interpretador.tipos.get(var, "desconhecido")
-                debug_print(f"  {var} ({tipo}): {valor}")
-
-            return True
+        rastreador.emitir(NIVEL_FASES, "Análise semântica concluída")
+
+        if self.otimizar:
+            from otimizador import otimizar
+
+            rastreador.emitir(NIVEL_FASES, "\n=== OTIMIZANDO ===")
+            with self._fase("otimizacao"):
+                self.reescritas = otimizar(arvore_sintatica)
+            for reescrita in self.reescritas:
+                rastreador.emitir(NIVEL_FASES, "  {}", reescrita)
+            if self.metricas:
+                self.resultado.nos_otimizados = contar_nos(arvore_sintatica)
+        return arvore_sintatica
+
+    def interpretar_fonte(
+        self, analisador_lexico: AnalisadorLexico, chave_cache: Optional[str] = None
+    ) -> ResultadoExecucao:
+        """Compila (ou carrega do cache) e executa o programa. O resultado é
+        verdadeiro se não houve erro; com `metricas=True` traz também os
+        tempos de cada fase e os contadores da execução."""
+        rastreador = self.rastreador
+        resultado = self.resultado = ResultadoExecucao(self.backend)
+        try:
+            carregado = None
+            if chave_cache:
+                with self._fase("cache"):
+                    carregado = self.cache.carregar(chave_cache)
+                resultado.cache = carregado is not None
+            if carregado:
+                arvore_sintatica, self.reescritas = carregado
+                rastreador.emitir(
+                    NIVEL_FASES, "=== PROGRAMA CARREGADO DO CACHE ({}) ===", chave_cache
+                )
+            else:
+                arvore_sintatica = self.compilar(analisador_lexico)
+                if chave_cache:
+                    self.cache.gravar(chave_cache, arvore_sintatica, self.reescritas)
+
+            rastreador.emitir(
+                NIVEL_FASES,
+                "\n=== INICIANDO INTERPRETAÇÃO (backend: {}) ===",
+                self.backend,
+            )
+            try:
+                with self._fase("execucao"):
+                    self.executar(arvore_sintatica)
+            finally:
+                # Também em caso de erro, para que a saída do programa apareça
+                # antes da mensagem de erro.
+                self.saida.descarregar()
+                if self.metricas:
+                    self._coletar_contadores()
+
+            if rastreador.habilitado(NIVEL_FASES):
+                rastreador.emitir(NIVEL_FASES, "\n=== ESTADO FINAL DAS VARIÁVEIS ===")
+                for var, valor in self.interpretador.variaveis.items():
+                    tipo = self.interpretador.tipos.get(var, "desconhecido")
+                    rastreador.emitir(NIVEL_FASES, "  {} ({}): {}", var, tipo, valor)
+
+            resultado.sucesso = True
 
         except Exception as e:
-            print(f"\n=== ERRO DURANTE INTERPRETAÇÃO ===")
-            print(f"Erro: {e}")
-            traceback.print_exc()
-            return False
+            resultado.tipo_erro = type(e).__name__
+            resultado.erro = str(e)
+            self.relatar_erro(e)
+        return resultado
 
+    def relatar_erro(self, erro: Exception) -> None:
+        """Chamado dentro do `except` de `interpretar_fonte`."""
+        # Importado só aqui: execuções sem erro não pagam pelo traceback.
+        import traceback
+
+        print(f"\n=== ERRO DURANTE INTERPRETAÇÃO ===")
+        print(f"Erro: {erro}")
+        traceback.print_exc()
+
+    def _coletar_contadores(self) -> None:
+        interpretador = self.interpretador
+        if not isinstance(interpretador, InterpretadorMedido):
+            return
+        self.resultado.leituras = interpretador.leituras
+        self.resultado.escritas = interpretador.saida.linhas
+        if self.backend == "arvore":
+            self.resultado.avaliacoes = interpretador.avaliacoes
+            self.resultado.iteracoes = interpretador.iteracoes
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Interpretador da linguagem.")
+    parser.add_argument("arquivo", nargs="?", help="Arquivo com o código fonte")
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="arvore",
+        help="Modo de execução (padrão: arvore, o interpretador de referência)",
+    )
+    parser.add_argument(
+        "-O",
+        dest="otimizar",
+        action="store_true",
+        help="Aplica dobramento de constantes e simplificações algébricas, remove "
+        "código morto, retira do `enquanto` o que não muda entre iterações e "
+        "reaproveita subexpressões repetidas",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIRETORIO",
+        help="Reutiliza programas já analisados, armazenados neste diretório",
+    )
+    parser.add_argument(
+        "--cache-tamanho",
+        type=int,
+        default=TAMANHO_MAXIMO_PADRAO // 2**20,
+        metavar="MIB",
+        help="Tamanho máximo do cache em MiB (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--saida-buffer",
+        type=int,
+        default=LIMITE_BUFFER_PADRAO,
+        metavar="CARACTERES",
+        help="Descarrega a saída de escrever a cada N caracteres (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--saida-linhas",
+        type=int,
+        default=None,
+        metavar="LINHAS",
+        help="Descarrega também a cada N linhas (padrão: 1 em terminais, sem limite caso contrário)",
+    )
+    parser.add_argument(
+        "--entrada",
+        metavar="ARQUIVO",
+        help="Lê os valores de ler deste arquivo em vez da entrada padrão",
+    )
+    parser.add_argument(
+        "--rastrear",
+        choices=list(NIVEIS),
+        default="desativado",
+        help="Nível de rastreamento (padrão: desativado)",
+    )
+    parser.add_argument(
+        "--rastrear-arquivo",
+        help="Grava o rastreamento neste arquivo em vez de stderr",
+    )
+    parser.add_argument(
+        "--perfil",
+        metavar="ARQUIVO",
+        help="Grava o código fonte anotado com execuções e tempo de cada linha",
+    )
+    parser.add_argument(
+        "--perfil-pilhas",
+        metavar="ARQUIVO",
+        help="Grava as pilhas de comandos no formato colapsado dos flame graphs",
+    )
+    parser.add_argument(
+        "--metricas",
+        choices=("json", "prometheus"),
+        help="Mede tempos por fase e contadores da execução e os exporta neste formato",
+    )
+    parser.add_argument(
+        "--metricas-arquivo",
+        help="Grava as métricas neste arquivo em vez de stderr",
+    )
+    args = parser.parse_args(argumentos)
+
+    rastreador = RASTREADOR_DESATIVADO
+    if NIVEIS[args.rastrear] != NIVEL_DESATIVADO:
+        saida = (
+            SaidaArquivo(args.rastrear_arquivo)
+            if args.rastrear_arquivo
+            else SaidaStream()
+        )
+        rastreador = Rastreador(NIVEIS[args.rastrear], [saida])
 
-if __name__ == "__main__":
     try:
-        if len(sys.argv) > 1:
-            file_path = sys.argv[1]
-            with open(file_path, "r", encoding="utf-8") as file:
-                codigo_fonte = file.read()
-        else:
+        if not args.arquivo:
             raise Exception("No file path provided as argument.")
 
-        executor = ExecutorInterpretador()
-        sucesso = executor.interpretar_codigo(codigo_fonte)
+        cache = None
+        if args.cache:
+            cache = CacheCompilacao(args.cache, args.cache_tamanho * 2**20)
+
+        limite_linhas = args.saida_linhas
+        if limite_linhas is None and sys.stdout.isatty():
+            limite_linhas = 1
+        saida = SaidaBufferizada(SaidaTexto(), args.saida_buffer, limite_linhas)
+
+        executor = ExecutorInterpretador(
+            backend=args.backend,
+            rastreador=rastreador,
+            otimizar=args.otimizar,
+            cache=cache,
+            saida=saida,
+            entrada=EntradaMapeada(args.entrada) if args.entrada else None,
+            metricas=bool(args.metricas),
+            perfilar=bool(args.perfil or args.perfil_pilhas),
+        )
+        sucesso = executor.interpretar_arquivo(args.arquivo)
+
+        if executor.perfilar and executor.interpretador:
+            if args.perfil:
+                with open(args.arquivo, "r", encoding="utf-8") as arquivo:
+                    codigo_fonte = arquivo.read()
+                with open(args.perfil, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(executor.interpretador.listagem_anotada(codigo_fonte))
+            if args.perfil_pilhas:
+                with open(args.perfil_pilhas, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(executor.interpretador.pilhas_colapsadas())
+
+        if args.metricas:
+            if args.metricas == "json":
+                texto = sucesso.para_json(indent=2) + "\n"
+            else:
+                texto = sucesso.para_prometheus()
+            if args.metricas_arquivo:
+                with open(args.metricas_arquivo, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(texto)
+            else:
+                sys.stderr.write(texto)
+
+        if cache:
+            rastreador.emitir(
+                NIVEL_FASES,
+                "\nCache: {} acertos, {} falhas, {} gravações, {} remoções",
+                cache.acertos,
+                cache.falhas,
+                cache.gravacoes,
+                cache.remocoes,
+            )
 
         if sucesso:
-            debug_print("\n=== INTERPRETAÇÃO CONCLUÍDA COM SUCESSO ===")
+            rastreador.emitir(
+                NIVEL_FASES, "\n=== INTERPRETAÇÃO CONCLUÍDA COM SUCESSO ==="
+            )
         else:
-            debug_print("\n=== FALHA NA INTERPRETAÇÃO ===")
+            rastreador.emitir(NIVEL_FASES, "\n=== FALHA NA INTERPRETAÇÃO ===")
 
     except Exception as e:
         print(f"Erro: {e}")
+    finally:
+        rastreador.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+from array import array
+from typing import Any, Dict, List
+from abstract_syntax_tree import *
+from interpretador import Interpretador, InterpretadorError
+
+
+# Cada instrução ocupa duas posições do array: (código de operação, argumento).
+CONST = 0
+CARREGAR = 1
+ARMAZENAR = 2
+SOMAR = 3
+SUBTRAIR = 4
+MULTIPLICAR = 5
+DIVIDIR = 6
+NEGAR = 7
+IGUAL = 8
+DIFERENTE = 9
+MENOR = 10
+MENOR_IGUAL = 11
+MAIOR = 12
+MAIOR_IGUAL = 13
+SALTAR = 14
+SALTAR_SE_FALSO = 15
+LER = 16
+ESCREVER = 17
+
+NOMES_OPERACOES = {
+    CONST: "CONST",
+    CARREGAR: "CARREGAR",
+    ARMAZENAR: "ARMAZENAR",
+    SOMAR: "SOMAR",
+    SUBTRAIR: "SUBTRAIR",
+    MULTIPLICAR: "MULTIPLICAR",
+    DIVIDIR: "DIVIDIR",
+    NEGAR: "NEGAR",
+    IGUAL: "IGUAL",
+    DIFERENTE: "DIFERENTE",
+    MENOR: "MENOR",
+    MENOR_IGUAL: "MENOR_IGUAL",
+    MAIOR: "MAIOR",
+    MAIOR_IGUAL: "MAIOR_IGUAL",
+    SALTAR: "SALTAR",
+    SALTAR_SE_FALSO: "SALTAR_SE_FALSO",
+    LER: "LER",
+    ESCREVER: "ESCREVER",
+}
+
+OPERADORES_LOGICOS = {
+    "=": IGUAL,
+    "<>": DIFERENTE,
+    "<": MENOR,
+    "<=": MENOR_IGUAL,
+    ">": MAIOR,
+    ">=": MAIOR_IGUAL,
+}
+
+OPERADORES_ARITMETICOS = {
+    "+": SOMAR,
+    "-": SUBTRAIR,
+    "*": MULTIPLICAR,
+    "/": DIVIDIR,
+}
+
+
+class ProgramaBytecode:
+    def __init__(
+        self, nome: str, codigo: array, constantes: List[Any], nomes: List[str]
+    ) -> None:
+        self.nome = nome
+        self.codigo = codigo
+        self.constantes = constantes
+        self.nomes = nomes
+
+    def tamanho_bytes(self) -> int:
+        return self.codigo.itemsize * len(self.codigo)
+
+    def desmontar(self) -> str:
+        linhas = [f"; programa {self.nome}"]
+        for pc in range(0, len(self.codigo), 2):
+            operacao, argumento = self.codigo[pc], self.codigo[pc + 1]
+            nome_operacao = NOMES_OPERACOES[operacao]
+            if operacao == CONST:
+                detalhe = f"{argumento} ({self.constantes[argumento]!r})"
+            elif operacao in (CARREGAR, ARMAZENAR, LER):
+                detalhe = f"{argumento} ({self.nomes[argumento]})"
+            elif operacao in (SALTAR, SALTAR_SE_FALSO, ESCREVER):
+                detalhe = str(argumento)
+            else:
+                detalhe = ""
+            linhas.append(f"{pc:6d} {nome_operacao:<16} {detalhe}".rstrip())
+        return "\n".join(linhas) + "\n"
+
+    def __str__(self) -> str:
+        return f"ProgramaBytecode(nome='{self.nome}', instrucoes={len(self.codigo) // 2})"
+
+
+class CompiladorBytecode:
+    """Converte a AST em um fluxo linear de instruções para a MaquinaVirtual."""
+
+    def __init__(self) -> None:
+        self.codigo = array("i")
+        self.constantes: List[Any] = []
+        self.indices_constantes: Dict[Any, int] = {}
+        self.nomes: List[str] = []
+
+    def compilar(self, no: ProgramaNode) -> ProgramaBytecode:
+        self.nomes = [""] * no.total_slots
+        if no.declaracoes:
+            for declaracao in no.declaracoes.declaracoes:
+                for var_node in declaracao.var_nodes:
+                    self.nomes[var_node.slot] = var_node.valor
+        self.compilar_comando(no.bloco)
+        return ProgramaBytecode(no.nome, self.codigo, self.constantes, self.nomes)
+
+    def _emitir(self, operacao: int, argumento: int = 0) -> int:
+        posicao = len(self.codigo)
+        self.codigo.append(operacao)
+        self.codigo.append(argumento)
+        return posicao
+
+    def _corrigir_salto(self, posicao: int) -> None:
+        self.codigo[posicao + 1] = len(self.codigo)
+
+    def _constante(self, valor: Any) -> int:
+        # A chave inclui o tipo para que True e 1 não compartilhem a mesma entrada.
+        chave = (type(valor), valor)
+        if chave not in self.indices_constantes:
+            self.indices_constantes[chave] = len(self.constantes)
+            self.constantes.append(valor)
+        return self.indices_constantes[chave]
+
+    def compilar_comando(self, no: ASTNode) -> None:
+        nome_metodo = f"compilar_{type(no).__name__}"
+        compilador = getattr(self, nome_metodo, self.compilador_generico)
+        compilador(no)
+
+    def compilador_generico(self, no: ASTNode) -> None:
+        raise InterpretadorError(f"Nenhum método compilar_{type(no).__name__} definido")
+
+    def compilar_BlocoNode(self, no: BlocoNode) -> None:
+        for comando in no.lista_comandos:
+            if comando:
+                self.compilar_comando(comando)
+
+    def compilar_ListaComandosNode(self, no: ListaComandosNode) -> None:
+        for comando in no.comandos:
+            self.compilar_comando(comando)
+
+    def compilar_AtribuicaoNode(self, no: AtribuicaoNode) -> None:
+        self.compilar_expr(no.direita)
+        self._emitir(ARMAZENAR, no.esquerda.slot)
+
+    def compilar_LerNode(self, no: LerNode) -> None:
+        for variavel in no.variaveis:
+            self._emitir(LER, variavel.slot)
+
+    def compilar_EscreverNode(self, no: EscreverNode) -> None:
+        for expr in no.expressoes:
+            if expr.tipo == "string":
+                self._emitir(CONST, self._constante(expr.valor))
+            else:
+                self.compilar_expr(expr.expr)
+        self._emitir(ESCREVER, len(no.expressoes))
+
+    def compilar_SeNode(self, no: SeNode) -> None:
+        self.compilar_condicao(no.condicao)
+        salto_senao = self._emitir(SALTAR_SE_FALSO)
+        if no.ramo_entao:
+            self.compilar_comando(no.ramo_entao)
+        if no.ramo_senao:
+            salto_fim = self._emitir(SALTAR)
+            self._corrigir_salto(salto_senao)
+            self.compilar_comando(no.ramo_senao)
+            self._corrigir_salto(salto_fim)
+        else:
+            self._corrigir_salto(salto_senao)
+
+    def compilar_EnquantoNode(self, no: EnquantoNode) -> None:
+        inicio = len(self.codigo)
+        self.compilar_condicao(no.condicao)
+        salto_fim = self._emitir(SALTAR_SE_FALSO)
+        self.compilar_comando(no.corpo)
+        self._emitir(SALTAR, inicio)
+        self._corrigir_salto(salto_fim)
+
+    def compilar_condicao(self, no: ASTNode) -> None:
+        if isinstance(no, ExprLogicoSimpleNode):
+            self._emitir(CARREGAR, no.id_node.slot)
+            return
+        operador_valor = no.operador.valor
+        if operador_valor not in OPERADORES_LOGICOS:
+            raise InterpretadorError(f"Operador lógico desconhecido: {operador_valor}")
+        self.compilar_expr(no.esquerda)
+        self.compilar_expr(no.direita)
+        self._emitir(OPERADORES_LOGICOS[operador_valor])
+
+    def compilar_expr(self, no: ASTNode) -> None:
+        if isinstance(no, OpEncadeadaNode):
+            self.compilar_expr(no.primeiro)
+            for operador, operando in no.operacoes:
+                self.compilar_expr(operando)
+                if operador.valor not in OPERADORES_ARITMETICOS:
+                    raise InterpretadorError(f"Operador desconhecido: {operador.valor}")
+                self._emitir(OPERADORES_ARITMETICOS[operador.valor])
+        elif isinstance(no, OpUnariaNode):
+            self.compilar_expr(no.expr)
+            self._emitir(NEGAR)
+        elif isinstance(no, VariavelNode):
+            self._emitir(CARREGAR, no.slot)
+        elif isinstance(no, NumeroNode):
+            self._emitir(CONST, self._constante(no.valor))
+        else:
+            self.compilador_generico(no)
+
+
+class MaquinaVirtual:
+    """Máquina de pilha que executa um ProgramaBytecode.
+
+    As instruções endereçam diretamente os slots de `interpretador.memoria`,
+    atribuídos pelo AnalisadorSemantico.
+    """
+
+    def __init__(self, interpretador: Interpretador) -> None:
+        self.interpretador = interpretador
+
+    def executar(self, programa: ProgramaBytecode) -> None:
+        memoria = self.interpretador.memoria
+        tipos = self.interpretador.tipos
+        ler_valor = self.interpretador.ler_valor
+        escrever = self.interpretador.saida.escrever
+        nomes = programa.nomes
+        constantes = programa.constantes
+        codigo = programa.codigo
+        tamanho = len(codigo)
+
+        pilha: List[Any] = []
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        pc = 0
+        while pc < tamanho:
+            operacao = codigo[pc]
+            argumento = codigo[pc + 1]
+            pc += 2
+            if operacao == CARREGAR:
+                empilhar(memoria[argumento])
+            elif operacao == CONST:
+                empilhar(constantes[argumento])
+            elif operacao == ARMAZENAR:
+                memoria[argumento] = desempilhar()
+            elif operacao == SOMAR:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] + direita
+            elif operacao == SUBTRAIR:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] - direita
+            elif operacao == SALTAR_SE_FALSO:
+                if not desempilhar():
+                    pc = argumento
+            elif operacao == SALTAR:
+                pc = argumento
+            elif operacao == MULTIPLICAR:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] * direita
+            elif operacao == DIVIDIR:
+                direita = desempilhar()
+                if direita == 0:
+                    raise InterpretadorError("Divisão por zero")
+                pilha[-1] = pilha[-1] // direita
+            elif operacao == MENOR_IGUAL:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] <= direita
+            elif operacao == MENOR:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] < direita
+            elif operacao == MAIOR_IGUAL:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] >= direita
+            elif operacao == MAIOR:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] > direita
+            elif operacao == IGUAL:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] == direita
+            elif operacao == DIFERENTE:
+                direita = desempilhar()
+                pilha[-1] = pilha[-1] != direita
+            elif operacao == NEGAR:
+                pilha[-1] = -pilha[-1]
+            elif operacao == ESCREVER:
+                partes = pilha[len(pilha) - argumento :]
+                del pilha[len(pilha) - argumento :]
+                escrever("".join([str(parte) for parte in partes]))
+            elif operacao == LER:
+                nome_var = nomes[argumento]
+                memoria[argumento] = ler_valor(nome_var, tipos[nome_var])
+            else:
+                raise InterpretadorError(f"Instrução desconhecida: {operacao}")
+
+
+def executar_programa(interpretador: Interpretador, arvore: ProgramaNode) -> None:
+    interpretador.declarar(arvore)
+    programa = CompiladorBytecode().compilar(arvore)
+    MaquinaVirtual(interpretador).executar(programa)
+
+
+if __name__ == "__main__":
+    import sys
+    from analisador_lexico import AnalisadorLexico
+    from analisador_sintatico import AnalisadorSintatico
+    from analisador_semantico import AnalisadorSemantico
+
+    if len(sys.argv) < 2:
+        print("Uso: python maquina_virtual.py <arquivo>")
+        sys.exit(1)
+
+    tokens = AnalisadorLexico.de_arquivo(sys.argv[1]).iter_tokens()
+    arvore_sintatica = AnalisadorSintatico(tokens).analisar()
+    AnalisadorSemantico().visitar(arvore_sintatica)
+    print(CompiladorBytecode().compilar(arvore_sintatica).desmontar(), end="")
@@ -0,0 +1,191 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from abstract_syntax_tree import ASTNode
+
+
+T = TypeVar("T")
+
+_atributos: Dict[type, Tuple[str, ...]] = {}
+
+
+def contar_nos(raiz: ASTNode) -> int:
+    """Conta os nós da árvore percorrendo os `__slots__` de cada classe."""
+    total = 0
+    pendentes = [raiz]
+    while pendentes:
+        valor = pendentes.pop()
+        if isinstance(valor, (list, tuple)):
+            pendentes.extend(valor)
+        elif isinstance(valor, ASTNode):
+            total += 1
+            classe = type(valor)
+            nomes = _atributos.get(classe)
+            if nomes is None:
+                nomes = _atributos[classe] = tuple(
+                    nome
+                    for base in classe.__mro__
+                    for nome in getattr(base, "__slots__", ())
+                )
+            for nome in nomes:
+                pendentes.append(getattr(valor, nome, None))
+    return total
+
+
+class ResultadoExecucao:
+    """Resultado de uma execução pelo ExecutorInterpretador.
+
+    É verdadeiro quando a execução termina sem erro, como o bool devolvido
+    antes. Tempos e contadores só são preenchidos com `metricas=True`; os
+    contadores que um backend não consegue medir ficam `None` (as avaliações
+    de nós e as iterações de laço existem apenas no backend `arvore`).
+    """
+
+    def __init__(self, backend: str) -> None:
+        self.backend = backend
+        self.sucesso = False
+        self.tipo_erro: Optional[str] = None
+        self.erro: Optional[str] = None
+        self.cache: Optional[bool] = None
+        # fase -> (tempo de parede, tempo de CPU), em segundos
+        self.fases: Dict[str, Tuple[float, float]] = {}
+        self.tokens: Optional[int] = None
+        self.nos: Optional[int] = None
+        self.nos_otimizados: Optional[int] = None
+        self.avaliacoes: Optional[int] = None
+        self.iteracoes: Optional[int] = None
+        self.leituras: Optional[int] = None
+        self.escritas: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return self.sucesso
+
+    @contextmanager
+    def medir(self, fase: str, descontar: Tuple[str, ...] = ()) -> Iterator[None]:
+        """Mede o bloco como `fase`, descontando o tempo das fases em
+        `descontar` medidas dentro dele."""
+        parede, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            parede = time.perf_counter() - parede
+            cpu = time.process_time() - cpu
+            for outra in descontar:
+                parede_outra, cpu_outra = self.fases.get(outra, (0.0, 0.0))
+                parede -= parede_outra
+                cpu -= cpu_outra
+            self.fases[fase] = (parede, cpu)
+
+    def medir_fluxo(self, fase: str, itens: Iterable[T]) -> Iterator[T]:
+        """Repassa os itens sem reuni-los em uma lista, acumulando como `fase`
+        só o tempo gasto para produzi-los e contando-os em `tokens`."""
+        relogio, relogio_cpu = time.perf_counter, time.process_time
+        iterador = iter(itens)
+        parede = cpu = 0.0
+        total = 0
+        try:
+            while True:
+                inicio, inicio_cpu = relogio(), relogio_cpu()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+                finally:
+                    parede += relogio() - inicio
+                    cpu += relogio_cpu() - inicio_cpu
+                total += 1
+                yield item
+        finally:
+            self.fases[fase] = (parede, cpu)
+            self.tokens = total
+
+    def para_dict(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "sucesso": self.sucesso,
+            "tipo_erro": self.tipo_erro,
+            "erro": self.erro,
+            "cache": self.cache,
+            "fases": {
+                fase: {"parede": parede, "cpu": cpu}
+                for fase, (parede, cpu) in self.fases.items()
+            },
+            "tokens": self.tokens,
+            "nos": self.nos,
+            "nos_otimizados": self.nos_otimizados,
+            "avaliacoes": self.avaliacoes,
+            "iteracoes": self.iteracoes,
+            "leituras": self.leituras,
+            "escritas": self.escritas,
+        }
+
+    def para_json(self, **opcoes: Any) -> str:
+        import json
+
+        return json.dumps(self.para_dict(), ensure_ascii=False, **opcoes)
+
+    def para_prometheus(
+        self, prefixo: str = "lpc", rotulos: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Formato de exposição de texto do Prometheus; `rotulos` são
+        acrescentados a todas as amostras, além do backend."""
+        base = {"backend": self.backend, **(rotulos or {})}
+        familias = [
+            (
+                "sucesso",
+                "gauge",
+                "1 se a execução terminou sem erro.",
+                [({}, int(self.sucesso))],
+            ),
+            (
+                "fase_segundos",
+                "gauge",
+                "Tempo de parede de cada fase.",
+                [({"fase": fase}, parede) for fase, (parede, _) in self.fases.items()],
+            ),
+            (
+                "fase_cpu_segundos",
+                "gauge",
+                "Tempo de CPU de cada fase.",
+                [({"fase": fase}, cpu) for fase, (_, cpu) in self.fases.items()],
+            ),
+        ]
+        for nome, tipo, ajuda, valor in (
+            ("tokens", "gauge", "Tokens do programa.", self.tokens),
+            ("nos_ast", "gauge", "Nós da árvore sintática.", self.nos),
+            (
+                "nos_ast_otimizada",
+                "gauge",
+                "Nós da árvore depois de -O.",
+                self.nos_otimizados,
+            ),
+            ("avaliacoes_total", "counter", "Nós avaliados.", self.avaliacoes),
+            ("iteracoes_total", "counter", "Iterações de enquanto.", self.iteracoes),
+            ("leituras_total", "counter", "Valores lidos por ler.", self.leituras),
+            ("escritas_total", "counter", "Linhas de escrever.", self.escritas),
+        ):
+            if valor is not None:
+                familias.append((nome, tipo, ajuda, [({}, valor)]))
+
+        linhas = []
+        for nome, tipo, ajuda, amostras in familias:
+            if not amostras:
+                continue
+            linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+            for extra, valor in amostras:
+                texto = ",".join(
+                    f'{chave}="{_escapar(str(v))}"'
+                    for chave, v in {**base, **extra}.items()
+                )
+                linhas.append(f"{prefixo}_{nome}{{{texto}}} {_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+
+def _escapar(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _numero(valor: float) -> str:
+    return repr(valor) if isinstance(valor, float) else str(int(valor))
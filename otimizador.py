@@ -0,0 +1,1056 @@
+import operator
+from collections import Counter
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from abstract_syntax_tree import *
+from analisador_lexico import Token
+from analisador_semantico import anotar_tipo
+from metricas import contar_nos
+from tabela_de_simbolos import PREFIXO_TEMPORARIA, Simbolo, eh_temporaria
+
+
+def _token_sintetico(tipo: str, valor: str, referencia: Optional[Token]) -> Token:
+    linha = referencia.linha if referencia else 0
+    coluna = referencia.coluna if referencia else 0
+    return Token(tipo, valor, linha, coluna)
+
+
+def _numero(valor: int, referencia: Optional[Token] = None) -> NumeroNode:
+    return NumeroNode(_token_sintetico("NÚMERO", str(valor), referencia))
+
+
+def _constante(no: ASTNode) -> Optional[int]:
+    if isinstance(no, NumeroNode):
+        return no.valor
+    return None
+
+
+def _aditiva(no: ASTNode) -> bool:
+    return isinstance(no, OpEncadeadaNode) and no.operacoes[0][0].valor in ("+", "-")
+
+
+def _montar(
+    primeiro: ASTNode, operacoes: List[Tuple[Token, ASTNode]]
+) -> ASTNode:
+    return OpEncadeadaNode(primeiro, operacoes) if operacoes else primeiro
+
+
+def pode_ser_logico(no: ASTNode) -> bool:
+    """Indica se a expressão pode produzir um valor lógico (bool) em tempo de execução.
+
+    Somente leituras de variável preservam o tipo Python do valor; qualquer
+    operação aritmética produz um inteiro. Simplificações que eliminariam a
+    operação em torno de uma variável mudariam `True` para `1` na saída, por
+    isso só são aplicadas quando o operando restante não pode ser lógico.
+    """
+    return isinstance(no, VariavelNode)
+
+
+def pode_falhar(no: ASTNode) -> bool:
+    """Indica se avaliar a expressão pode lançar 'Divisão por zero'."""
+    if isinstance(no, OpEncadeadaNode):
+        if pode_falhar(no.primeiro):
+            return True
+        for operador, operando in no.operacoes:
+            if operador.valor == "/" and _constante(operando) in (None, 0):
+                return True
+            if pode_falhar(operando):
+                return True
+        return False
+    if isinstance(no, OpUnariaNode):
+        return pode_falhar(no.expr)
+    return False
+
+
+def texto_expr(no: ASTNode) -> str:
+    if isinstance(no, OpEncadeadaNode):
+        partes = [_texto_operando(no.primeiro, no)]
+        for operador, operando in no.operacoes:
+            partes.append(f"{operador.valor} {_texto_operando(operando, no)}")
+        return " ".join(partes)
+    elif isinstance(no, OpUnariaNode):
+        if isinstance(no.expr, OpEncadeadaNode):
+            return f"-({texto_expr(no.expr)})"
+        return f"-{texto_expr(no.expr)}"
+    return str(no.valor)
+
+
+def _texto_operando(no: ASTNode, pai: OpEncadeadaNode) -> str:
+    # Uma cadeia multiplicativa dentro de uma aditiva dispensa parênteses; as
+    # demais cadeias aninhadas vieram de parênteses no fonte.
+    if isinstance(no, OpEncadeadaNode) and (_aditiva(no) or not _aditiva(pai)):
+        return f"({texto_expr(no)})"
+    return texto_expr(no)
+
+
+def _linha(token: Optional[Token]) -> str:
+    return f"linha {token.linha}: " if token and token.linha else ""
+
+
+def _primeiro_token(no: ASTNode) -> Optional[Token]:
+    while isinstance(no, OpEncadeadaNode):
+        no = no.primeiro
+    if isinstance(no, OpUnariaNode):
+        return no.op
+    return no.token
+
+
+class OtimizadorConstantes:
+    """Dobra subexpressões constantes e aplica identidades algébricas seguras.
+
+    A árvore é reescrita no lugar. Divisões cujo divisor é zero (ou não é
+    constante) nunca são avaliadas em tempo de compilação nem descartadas, de
+    modo que o erro 'Divisão por zero' continua acontecendo em tempo de
+    execução. Cada expressão alterada é registrada em `reescritas` e tem o
+    `tipo_resolvido` recalculado.
+    """
+
+    def __init__(self) -> None:
+        self.reescritas: List[str] = []
+
+    def otimizar(self, no: ProgramaNode) -> List[str]:
+        self.reescritas = []
+        self.otimizar_comando(no.bloco)
+        return self.reescritas
+
+    def otimizar_comando(self, no: Optional[ASTNode]) -> None:
+        if isinstance(no, BlocoNode):
+            for comando in no.lista_comandos:
+                self.otimizar_comando(comando)
+        elif isinstance(no, ListaComandosNode):
+            for comando in no.comandos:
+                self.otimizar_comando(comando)
+        elif isinstance(no, AtribuicaoNode):
+            no.direita = self._reescrever(no.direita)
+        elif isinstance(no, SeNode):
+            self.otimizar_condicao(no.condicao)
+            self.otimizar_comando(no.ramo_entao)
+            self.otimizar_comando(no.ramo_senao)
+        elif isinstance(no, EnquantoNode):
+            self.otimizar_condicao(no.condicao)
+            self.otimizar_comando(no.corpo)
+        elif isinstance(no, EscreverNode):
+            for expr in no.expressoes:
+                if expr.tipo == "expr":
+                    expr.expr = self._reescrever(expr.expr)
+
+    def otimizar_condicao(self, no: ASTNode) -> None:
+        if isinstance(no, ExprLogicoNode):
+            no.esquerda = self._reescrever(no.esquerda)
+            no.direita = self._reescrever(no.direita)
+
+    def _reescrever(self, no: ASTNode) -> ASTNode:
+        antes = texto_expr(no)
+        token = _primeiro_token(no)
+        resultado = self.expr(no)
+        anotar_tipo(resultado)
+        depois = texto_expr(resultado)
+        if antes != depois:
+            linha = _linha(token)
+            self.reescritas.append(f"{linha}{antes} → {depois}")
+        return resultado
+
+    def expr(self, no: ASTNode) -> ASTNode:
+        if isinstance(no, OpEncadeadaNode):
+            if _aditiva(no):
+                return self.soma(no)
+            return self.produto(no)
+        elif isinstance(no, OpUnariaNode):
+            return self.negacao(no)
+        return no
+
+    def soma(self, no: OpEncadeadaNode) -> ASTNode:
+        referencia = _primeiro_token(no)
+        termos: List[Tuple[Optional[Token], ASTNode]] = [(None, self.expr(no.primeiro))]
+        for operador, operando in no.operacoes:
+            termos.append((operador, self.expr(operando)))
+
+        # Soma e subtração de inteiros são exatas, então todas as constantes da
+        # cadeia podem ser acumuladas sem mudar a ordem dos demais termos.
+        soma = 0
+        houve_constante = False
+        restantes: List[Tuple[Optional[Token], ASTNode]] = []
+        for operador, termo in termos:
+            valor = _constante(termo)
+            if valor is None:
+                restantes.append((operador, termo))
+            else:
+                houve_constante = True
+                soma += -valor if operador and operador.valor == "-" else valor
+
+        if not restantes:
+            return _numero(soma, referencia)
+        if not houve_constante:
+            return _montar(restantes[0][1], restantes[1:])
+
+        operador_inicial, primeiro = restantes[0]
+        if operador_inicial is not None:
+            return _montar(_numero(soma, referencia), restantes)
+
+        resto = restantes[1:]
+        leitura_simples = not resto and pode_ser_logico(primeiro)
+        if soma != 0 or leitura_simples:
+            tipo, sinal = ("MENOS", "-") if soma < 0 else ("MAIS", "+")
+            resto.append(
+                (
+                    _token_sintetico(tipo, sinal, referencia),
+                    _numero(abs(soma), referencia),
+                )
+            )
+        return _montar(primeiro, resto)
+
+    def produto(self, no: OpEncadeadaNode) -> ASTNode:
+        fatores: List[Tuple[Optional[Token], ASTNode]] = [(None, self.expr(no.primeiro))]
+        for operador, operando in no.operacoes:
+            fatores.append((operador, self.expr(operando)))
+
+        original = _montar(fatores[0][1], fatores[1:])
+        if not pode_falhar(original):
+            for operador, fator in fatores:
+                multiplicando = operador is None or operador.valor == "*"
+                if multiplicando and _constante(fator) == 0:
+                    return _numero(0, _primeiro_token(fator))
+
+        resultado: List[Tuple[Optional[Token], ASTNode]] = []
+        for operador, fator in fatores:
+            valor = _constante(fator)
+            if resultado and valor is not None:
+                operador_anterior, anterior = resultado[-1]
+                valor_anterior = _constante(anterior)
+                if valor_anterior is not None and len(resultado) == 1:
+                    if operador.valor == "*":
+                        produto = valor_anterior * valor
+                        resultado[-1] = (None, _numero(produto, anterior.token))
+                        continue
+                    if valor != 0:
+                        quociente = valor_anterior // valor
+                        resultado[-1] = (None, _numero(quociente, anterior.token))
+                        continue
+                elif (
+                    valor_anterior is not None
+                    and operador_anterior.valor == "*"
+                    and operador.valor == "*"
+                ):
+                    resultado[-1] = (
+                        operador_anterior,
+                        _numero(valor_anterior * valor, anterior.token),
+                    )
+                    continue
+                if valor == 1:
+                    continue
+            resultado.append((operador, fator))
+
+        if (
+            len(resultado) > 1
+            and _constante(resultado[0][1]) == 1
+            and resultado[1][0].valor == "*"
+            and not (len(resultado) == 2 and pode_ser_logico(resultado[1][1]))
+        ):
+            resultado = [(None, resultado[1][1])] + resultado[2:]
+
+        primeiro = resultado[0][1]
+        resto = resultado[1:]
+        if not resto and pode_ser_logico(primeiro):
+            if len(fatores) == 2:
+                return original
+            # Mantém uma operação para que o valor continue sendo convertido
+            # para inteiro, como no programa original.
+            operador = _token_sintetico("MULT", "*", primeiro.token)
+            resto = [(operador, _numero(1, primeiro.token))]
+        return _montar(primeiro, resto)
+
+    def negacao(self, no: OpUnariaNode) -> ASTNode:
+        interno = self.expr(no.expr)
+        valor = _constante(interno)
+        if valor is not None:
+            return _numero(-valor, no.op)
+        if isinstance(interno, OpUnariaNode) and not pode_ser_logico(interno.expr):
+            return interno.expr
+        no.expr = interno
+        return no
+
+
+def usos(no: Optional[ASTNode], lidas: Set[int]) -> None:
+    """Acrescenta a `lidas` os slots das variáveis lidas por uma expressão ou
+    comando (o destino de uma atribuição e as variáveis de `ler` são
+    escritas, não leituras)."""
+    if isinstance(no, (VariavelNode, IdNode)):
+        lidas.add(no.slot)
+    elif isinstance(no, OpEncadeadaNode):
+        usos(no.primeiro, lidas)
+        for _, operando in no.operacoes:
+            usos(operando, lidas)
+    elif isinstance(no, OpUnariaNode):
+        usos(no.expr, lidas)
+    elif isinstance(no, ExprLogicoNode):
+        usos(no.esquerda, lidas)
+        usos(no.direita, lidas)
+    elif isinstance(no, ExprLogicoSimpleNode):
+        usos(no.id_node, lidas)
+    elif isinstance(no, StringVarNode):
+        usos(no.expr, lidas)
+    elif isinstance(no, AtribuicaoNode):
+        usos(no.direita, lidas)
+    elif isinstance(no, SeNode):
+        usos(no.condicao, lidas)
+        usos(no.ramo_entao, lidas)
+        usos(no.ramo_senao, lidas)
+    elif isinstance(no, EnquantoNode):
+        usos(no.condicao, lidas)
+        usos(no.corpo, lidas)
+    elif isinstance(no, BlocoNode):
+        for comando in no.lista_comandos:
+            usos(comando, lidas)
+    elif isinstance(no, EscreverNode):
+        for expr in no.expressoes:
+            usos(expr, lidas)
+
+
+def definicoes(no: Optional[ASTNode], escritas: Counter) -> bool:
+    """Conta em `escritas` quantas vezes cada slot é escrito pelo comando
+    (atribuições e `ler`). Devolve verdadeiro se o comando contém um `ler`."""
+    if isinstance(no, AtribuicaoNode):
+        escritas[no.esquerda.slot] += 1
+        return False
+    if isinstance(no, LerNode):
+        for variavel in no.variaveis:
+            escritas[variavel.slot] += 1
+        return True
+    if isinstance(no, SeNode):
+        leitura = definicoes(no.ramo_entao, escritas)
+        return definicoes(no.ramo_senao, escritas) or leitura
+    if isinstance(no, EnquantoNode):
+        return definicoes(no.corpo, escritas)
+    if isinstance(no, BlocoNode):
+        leitura = False
+        for comando in no.lista_comandos:
+            leitura = definicoes(comando, escritas) or leitura
+        return leitura
+    return False
+
+
+def copiar(valor):
+    """Cópia de uma subárvore; tokens e símbolos são compartilhados."""
+    if isinstance(valor, ASTNode):
+        copia = object.__new__(type(valor))
+        for classe in type(valor).__mro__:
+            for nome in getattr(classe, "__slots__", ()):
+                setattr(copia, nome, copiar(getattr(valor, nome)))
+        return copia
+    if isinstance(valor, list):
+        return [copiar(item) for item in valor]
+    if isinstance(valor, tuple):
+        return tuple(copiar(item) for item in valor)
+    return valor
+
+
+def declarar_temporaria(
+    programa: ProgramaNode, tipo: Optional[str], referencia: Optional[Token]
+) -> VariavelNode:
+    """Declara uma variável nova para o otimizador, no slot seguinte aos do
+    programa. Temporárias não aparecem em `Interpretador.variaveis`."""
+    slot = programa.total_slots
+    programa.total_slots += 1
+    tipo = tipo if tipo in ("inteiro", "lógico") else "inteiro"
+    token = _token_sintetico("ID", f"{PREFIXO_TEMPORARIA}t{slot}", referencia)
+    variavel = VariavelNode(token)
+    variavel.simbolo = Simbolo(token.valor, tipo, slot)
+    variavel.slot = slot
+    variavel.tipo_resolvido = tipo
+    tipo_node = TipoNode(_token_sintetico(tipo.upper(), tipo, referencia))
+    if programa.declaracoes is None:
+        programa.declaracoes = DeclaracoesNode([])
+    programa.declaracoes.declaracoes.append(DeclaracaoVarNode([variavel], tipo_node))
+    return variavel
+
+
+def _unico(comandos: List[ComandoNode]) -> ComandoNode:
+    return comandos[0] if len(comandos) == 1 else BlocoNode(comandos)
+
+
+def _ler_variavel(declarada: VariavelNode) -> VariavelNode:
+    variavel = VariavelNode(declarada.token)
+    variavel.simbolo = declarada.simbolo
+    variavel.slot = declarada.slot
+    variavel.tipo_resolvido = declarada.tipo_resolvido
+    return variavel
+
+
+class MovimentacaoInvariantes:
+    """Move para antes de cada `enquanto` o que não muda entre as iterações.
+
+    Uma atribuição do corpo (no primeiro nível, e antes de qualquer `ler`) é
+    movida quando a expressão só lê variáveis que o laço não escreve, a
+    variável de destino é escrita uma única vez no laço e não é lida antes
+    dela (nem na condição). Como o laço pode não executar nenhuma vez, as
+    atribuições movidas ficam sob um `se` com a mesma condição:
+
+        se <cond> então início <movidas>; enquanto <cond> faça <corpo> fim
+
+    Além disso, cada subexpressão invariante do laço (na condição ou em
+    qualquer comando do corpo) passa a ser calculada uma vez, antes do laço,
+    em uma variável temporária. Só são movidas expressões que não podem
+    lançar 'Divisão por zero' (veja `pode_falhar`), de modo que o erro
+    continua acontecendo no mesmo ponto da execução. Laços internos são
+    tratados antes dos externos.
+    """
+
+    def __init__(self, programa: ProgramaNode) -> None:
+        self.programa = programa
+        self.reescritas: List[str] = []
+        self.variantes: Set[int] = set()
+        self.calculadas: Dict[str, VariavelNode] = {}
+        self.preparacao: List[ComandoNode] = []
+        self.referencia: Optional[Token] = None
+
+    def otimizar(self) -> List[str]:
+        bloco = self.programa.bloco
+        bloco.lista_comandos = self.lista(bloco.lista_comandos)
+        return self.reescritas
+
+    def lista(self, comandos: List[ComandoNode]) -> List[ComandoNode]:
+        resultado: List[ComandoNode] = []
+        for comando in comandos:
+            resultado.extend(self.comando(comando))
+        return resultado
+
+    def comando(self, no: ComandoNode) -> List[ComandoNode]:
+        """Devolve os comandos que substituem `no`."""
+        if isinstance(no, BlocoNode):
+            no.lista_comandos = self.lista(no.lista_comandos)
+        elif isinstance(no, SeNode):
+            no.ramo_entao = _unico(self.comando(no.ramo_entao))
+            if no.ramo_senao:
+                no.ramo_senao = _unico(self.comando(no.ramo_senao))
+        elif isinstance(no, EnquantoNode):
+            no.corpo = _unico(self.comando(no.corpo))
+            return self.laco(no)
+        return [no]
+
+    def laco(self, no: EnquantoNode) -> List[ComandoNode]:
+        corpo = no.corpo.lista_comandos if isinstance(no.corpo, BlocoNode) else [no.corpo]
+        escritas: Counter = Counter()
+        definicoes(no.corpo, escritas)
+        self.variantes = set(escritas)
+        self.referencia = no.token
+        linha = _linha(no.token)
+
+        lidas: Set[int] = set()
+        usos(no.condicao, lidas)
+        movidas: List[ComandoNode] = []
+        restantes: List[ComandoNode] = []
+        depois_de_ler = False
+        for comando in corpo:
+            if not depois_de_ler and self._movivel(comando, escritas, lidas):
+                movidas.append(comando)
+                self.variantes.discard(comando.esquerda.slot)
+                continue
+            usos(comando, lidas)
+            depois_de_ler = definicoes(comando, Counter()) or depois_de_ler
+            restantes.append(comando)
+        if not restantes:
+            # O laço não terminaria ou não executaria: nada a ganhar.
+            return [no]
+
+        guarda = None
+        if any(not eh_temporaria(movida.esquerda.valor) for movida in movidas):
+            guarda = copiar(no.condicao)
+        for movida in movidas:
+            self.reescritas.append(
+                f"{linha}{movida.esquerda.valor} := {texto_expr(movida.direita)} "
+                "movido para antes do laço"
+            )
+        if movidas:
+            if isinstance(no.corpo, BlocoNode):
+                no.corpo.lista_comandos = restantes
+            else:
+                no.corpo = restantes[0]
+
+        self.calculadas = {}
+        self.preparacao = []
+        self.extrair_condicao(no.condicao)
+        self.extrair_comando(no.corpo)
+        for calculo in self.preparacao:
+            self.reescritas.append(
+                f"{linha}{calculo.esquerda.valor} := {texto_expr(calculo.direita)} "
+                "calculado antes do laço"
+            )
+
+        antes = movidas + self.preparacao
+        if guarda is not None:
+            return [SeNode(guarda, BlocoNode(antes + [no]), None, no.token)]
+        return antes + [no]
+
+    def _movivel(self, no: ComandoNode, escritas: Counter, lidas: Set[int]) -> bool:
+        if not isinstance(no, AtribuicaoNode):
+            return False
+        slot = no.esquerda.slot
+        if escritas[slot] != 1 or slot in lidas:
+            return False
+        return self._invariante(no.direita) and not pode_falhar(no.direita)
+
+    def _invariante(self, no: ASTNode) -> bool:
+        lidas: Set[int] = set()
+        usos(no, lidas)
+        return not lidas & self.variantes
+
+    def extrair_comando(self, no: Optional[ASTNode]) -> None:
+        if isinstance(no, AtribuicaoNode):
+            no.direita = self.extrair(no.direita)
+        elif isinstance(no, SeNode):
+            self.extrair_condicao(no.condicao)
+            self.extrair_comando(no.ramo_entao)
+            self.extrair_comando(no.ramo_senao)
+        elif isinstance(no, EnquantoNode):
+            self.extrair_condicao(no.condicao)
+            self.extrair_comando(no.corpo)
+        elif isinstance(no, BlocoNode):
+            for comando in no.lista_comandos:
+                self.extrair_comando(comando)
+        elif isinstance(no, EscreverNode):
+            for expr in no.expressoes:
+                if expr.tipo == "expr":
+                    expr.expr = self.extrair(expr.expr)
+
+    def extrair_condicao(self, no: ASTNode) -> None:
+        if isinstance(no, ExprLogicoNode):
+            no.esquerda = self.extrair(no.esquerda)
+            no.direita = self.extrair(no.direita)
+
+    def extrair(self, no: ASTNode) -> ASTNode:
+        """Troca as maiores subexpressões invariantes de `no` por temporárias
+        calculadas antes do laço."""
+        if not isinstance(no, (OpEncadeadaNode, OpUnariaNode)):
+            return no
+        lidas: Set[int] = set()
+        usos(no, lidas)
+        if lidas and not lidas & self.variantes and not pode_falhar(no):
+            return self._temporaria(no)
+        if isinstance(no, OpUnariaNode):
+            no.expr = self.extrair(no.expr)
+        else:
+            no.primeiro = self.extrair(no.primeiro)
+            no.operacoes = [
+                (operador, self.extrair(operando)) for operador, operando in no.operacoes
+            ]
+        return no
+
+    def _temporaria(self, no: ASTNode) -> VariavelNode:
+        # Expressões iguais no mesmo laço compartilham a temporária.
+        chave = texto_expr(no)
+        temporaria = self.calculadas.get(chave)
+        if temporaria is None:
+            temporaria = declarar_temporaria(
+                self.programa, no.tipo_resolvido, self.referencia
+            )
+            self.calculadas[chave] = temporaria
+            self.preparacao.append(
+                AtribuicaoNode(
+                    temporaria, _token_sintetico("ATRIBUIÇÃO", ":=", self.referencia), no
+                )
+            )
+        return _ler_variavel(temporaria)
+
+
+COMPARACOES = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def condicao_constante(no: ASTNode) -> Optional[bool]:
+    """Valor da condição quando ela compara duas constantes; None se não."""
+    if isinstance(no, ExprLogicoNode):
+        esquerda = _constante(no.esquerda)
+        direita = _constante(no.direita)
+        if esquerda is not None and direita is not None:
+            return COMPARACOES[no.operador.valor](esquerda, direita)
+    return None
+
+
+def condicao_pode_falhar(no: ASTNode) -> bool:
+    return isinstance(no, ExprLogicoNode) and (
+        pode_falhar(no.esquerda) or pode_falhar(no.direita)
+    )
+
+
+class EliminacaoCodigoMorto:
+    """Remove o código que nunca executa e o que não tem efeito observável.
+
+    Um `se` cuja condição compara constantes (depois do dobramento) é trocado
+    pelo ramo que executa, e um `enquanto` com condição sempre falsa é
+    removido; depois de um `enquanto` com condição sempre verdadeira, os
+    comandos seguintes nunca executam. Atribuições cujo valor não é lido
+    depois são removidas, pela análise de variáveis vivas de trás para frente
+    (com ponto fixo em cada laço), assim como um `se` cujos ramos ficaram
+    vazios.
+
+    O estado final das variáveis é mostrado ao usuário (só quando a execução
+    termina sem erro), por isso todas as variáveis do programa, exceto as
+    temporárias do otimizador, estão vivas no fim: só deixa de existir a
+    atribuição sobrescrita antes de ser lida.
+    `ler` e `escrever` nunca são removidos, nem atribuições ou condições que
+    podem lançar 'Divisão por zero'.
+    """
+
+    def __init__(self, programa: ProgramaNode) -> None:
+        self.programa = programa
+        self.remocoes: List[Tuple[int, str]] = []
+        self.removidos = 0
+
+    def otimizar(self) -> List[str]:
+        vivas: Set[int] = set()
+        if self.programa.declaracoes:
+            for declaracao in self.programa.declaracoes.declaracoes:
+                for variavel in declaracao.var_nodes:
+                    if not eh_temporaria(variavel.valor):
+                        vivas.add(variavel.slot)
+
+        bloco = self.programa.bloco
+        bloco.lista_comandos, _ = self.lista(bloco.lista_comandos, vivas)
+
+        # O programa é percorrido de trás para frente; as remoções são
+        # relatadas na ordem do código fonte.
+        self.remocoes.sort(key=lambda remocao: remocao[0])
+        reescritas = [texto for _, texto in self.remocoes]
+        if self.removidos:
+            reescritas.append(f"código morto: {self.removidos} nós removidos")
+        return reescritas
+
+    def registrar(self, token: Optional[Token], texto: str, removidos: int) -> None:
+        """Relata uma remoção de `removidos` nós da árvore."""
+        linha = token.linha if token and token.linha else 0
+        self.remocoes.append((linha, f"{_linha(token)}{texto}"))
+        self.removidos += removidos
+
+    def unico(self, comandos: List[ComandoNode]) -> ComandoNode:
+        """Como `_unico`; o bloco criado para reunir os comandos (ou no lugar
+        de um ramo vazio) é descontado, para que o total de nós removidos seja
+        exatamente a redução da árvore."""
+        if len(comandos) != 1:
+            self.removidos -= 1
+        return _unico(comandos)
+
+    def lista(
+        self, comandos: List[ComandoNode], vivas: Set[int]
+    ) -> Tuple[List[ComandoNode], Set[int]]:
+        """Devolve os comandos que restam, dadas as variáveis vivas depois
+        deles, e as variáveis vivas antes do primeiro."""
+        for indice, comando in enumerate(comandos[:-1]):
+            if isinstance(comando, EnquantoNode) and condicao_constante(
+                comando.condicao
+            ):
+                self.registrar(
+                    comando.token,
+                    "comandos depois de laço que não termina removidos",
+                    sum(contar_nos(removido) for removido in comandos[indice + 1 :]),
+                )
+                comandos = comandos[: indice + 1]
+                break
+
+        substitutos: List[List[ComandoNode]] = []
+        for comando in reversed(comandos):
+            novos, vivas = self.comando(comando, vivas)
+            substitutos.append(novos)
+        resultado: List[ComandoNode] = []
+        for novos in reversed(substitutos):
+            resultado.extend(novos)
+        return resultado, vivas
+
+    def comando(
+        self, no: ComandoNode, vivas: Set[int]
+    ) -> Tuple[List[ComandoNode], Set[int]]:
+        """Devolve os comandos que substituem `no` e as variáveis vivas antes
+        dele. `vivas` nunca é modificado."""
+        if isinstance(no, AtribuicaoNode):
+            if no.esquerda.slot not in vivas and not pode_falhar(no.direita):
+                self.registrar(
+                    no.esquerda.token,
+                    f"{no.esquerda.valor} := {texto_expr(no.direita)} removido "
+                    "(valor nunca lido)",
+                    contar_nos(no),
+                )
+                return [], vivas
+        elif isinstance(no, BlocoNode):
+            no.lista_comandos, vivas = self.lista(no.lista_comandos, vivas)
+            if not no.lista_comandos:
+                self.removidos += 1
+                return [], vivas
+            return [no], vivas
+        elif isinstance(no, SeNode):
+            return self.se(no, vivas)
+        elif isinstance(no, EnquantoNode):
+            return self.enquanto(no, vivas)
+        return [no], self.vivas_antes(no, vivas)
+
+    def se(self, no: SeNode, vivas: Set[int]) -> Tuple[List[ComandoNode], Set[int]]:
+        constante = condicao_constante(no.condicao)
+        if constante is not None:
+            ramo = no.ramo_entao if constante else no.ramo_senao
+            if ramo is None:
+                self.registrar(
+                    no.token, "se com condição sempre falsa removido", contar_nos(no)
+                )
+                return [], vivas
+            descartado = no.ramo_senao if constante else no.ramo_entao
+            self.registrar(
+                no.token,
+                "se com condição sempre "
+                f"{'verdadeira' if constante else 'falsa'} trocado pelo ramo "
+                f"{'então' if constante else 'senão'}",
+                1
+                + contar_nos(no.condicao)
+                + (contar_nos(descartado) if descartado else 0)
+                + isinstance(ramo, BlocoNode),
+            )
+            comandos = ramo.lista_comandos if isinstance(ramo, BlocoNode) else [ramo]
+            return self.lista(comandos, vivas)
+
+        entao, vivas_entao = self.comando(no.ramo_entao, vivas)
+        senao, vivas_senao = [], vivas
+        if no.ramo_senao:
+            senao, vivas_senao = self.comando(no.ramo_senao, vivas)
+        if not entao and not senao and not condicao_pode_falhar(no.condicao):
+            self.registrar(
+                no.token, "se sem efeito removido", 1 + contar_nos(no.condicao)
+            )
+            return [], vivas
+        no.ramo_entao = self.unico(entao)
+        no.ramo_senao = self.unico(senao) if senao else None
+        antes = vivas_entao | vivas_senao
+        usos(no.condicao, antes)
+        return [no], antes
+
+    def enquanto(
+        self, no: EnquantoNode, vivas: Set[int]
+    ) -> Tuple[List[ComandoNode], Set[int]]:
+        if condicao_constante(no.condicao) is False:
+            self.registrar(
+                no.token, "enquanto com condição sempre falsa removido", contar_nos(no)
+            )
+            return [], vivas
+        cabeca = self.vivas_laco(no, vivas)
+        corpo, _ = self.comando(no.corpo, cabeca)
+        no.corpo = self.unico(corpo)
+        return [no], cabeca
+
+    def vivas_laco(self, no: EnquantoNode, vivas: Set[int]) -> Set[int]:
+        """Variáveis vivas a cada teste da condição: as que ela lê, as vivas
+        depois do laço (se ele pode terminar) e as vivas antes do corpo,
+        repetido até não mudar."""
+        base = set() if condicao_constante(no.condicao) else set(vivas)
+        usos(no.condicao, base)
+        cabeca = base
+        while True:
+            novas = base | self.vivas_antes(no.corpo, cabeca)
+            if novas == cabeca:
+                return cabeca
+            cabeca = novas
+
+    def vivas_antes(self, no: Optional[ASTNode], vivas: Set[int]) -> Set[int]:
+        """Variáveis vivas antes de `no`, sem modificar a árvore."""
+        if isinstance(no, AtribuicaoNode):
+            if no.esquerda.slot not in vivas and not pode_falhar(no.direita):
+                return vivas
+            antes = vivas - {no.esquerda.slot}
+            usos(no.direita, antes)
+            return antes
+        if isinstance(no, LerNode):
+            return vivas - {variavel.slot for variavel in no.variaveis}
+        if isinstance(no, BlocoNode):
+            for comando in reversed(no.lista_comandos):
+                vivas = self.vivas_antes(comando, vivas)
+            return vivas
+        if isinstance(no, SeNode):
+            constante = condicao_constante(no.condicao)
+            if constante is not None:
+                ramo = no.ramo_entao if constante else no.ramo_senao
+                return self.vivas_antes(ramo, vivas) if ramo else vivas
+            antes = self.vivas_antes(no.ramo_entao, vivas)
+            if no.ramo_senao:
+                antes = antes | self.vivas_antes(no.ramo_senao, vivas)
+            else:
+                antes = antes | vivas
+            usos(no.condicao, antes)
+            return antes
+        if isinstance(no, EnquantoNode):
+            if condicao_constante(no.condicao) is False:
+                return vivas
+            return self.vivas_laco(no, vivas)
+        antes = set(vivas)
+        usos(no, antes)
+        return antes
+
+
+class Ocorrencia(NamedTuple):
+    no: ASTNode
+    substituir: Callable[[ASTNode], None]
+    # Comando do trecho em que a expressão aparece e ordem em que ela termina
+    # de ser avaliada, para que temporárias aninhadas sejam calculadas antes.
+    comando: int
+    ordem: int
+
+
+class EliminacaoSubexpressoes:
+    """Reaproveita expressões repetidas por numeração de valores local.
+
+    Cada trecho sem desvios de uma lista de comandos (atribuições, `escrever`
+    e `ler` seguidos, mais a condição do `se` que os encerra) é percorrido em
+    ordem, dando a cada expressão um número de valor calculado a partir dos
+    números dos operandos (em `+` e `*`, independente da ordem deles).
+    Atribuições dão à variável o número do valor atribuído e `ler` dá um
+    número novo, de modo que expressões com o mesmo número têm o mesmo valor
+    onde quer que apareçam no trecho.
+
+    Uma expressão repetida, ou o início de uma cadeia, é trocada pela
+    variável do programa que guarda o seu valor, se ainda houver uma; senão,
+    quando compensa, a expressão é calculada uma vez em uma temporária, logo
+    antes do comando em que aparece pela primeira vez. Como um comando sempre avalia todas as suas
+    expressões antes de ter qualquer efeito, isso não muda o ponto em que um
+    erro acontece. As temporárias não passam de um trecho para outro e são
+    reaproveitadas entre trechos.
+    """
+
+    def __init__(self, programa: ProgramaNode) -> None:
+        self.programa = programa
+        self.reescritas: List[str] = []
+        self.temporarias: Dict[str, List[VariavelNode]] = {}
+        self.usadas: Counter = Counter()
+        self.proximo_numero = 0
+        self.numeros: Dict[int, int] = {}
+        self.valores: Dict[tuple, int] = {}
+        self.guardados: Dict[int, VariavelNode] = {}
+        self.calculados: Dict[int, int] = {}
+        self.prefixos: Dict[int, List[int]] = {}
+        self.ocorrencias: Dict[int, List[Ocorrencia]] = {}
+        self.comando_atual = 0
+        self.ordem = 0
+
+    def otimizar(self) -> List[str]:
+        bloco = self.programa.bloco
+        bloco.lista_comandos = self.lista(bloco.lista_comandos)
+        return self.reescritas
+
+    def lista(self, comandos: List[ComandoNode]) -> List[ComandoNode]:
+        resultado: List[ComandoNode] = []
+        trecho: List[ComandoNode] = []
+        for comando in comandos:
+            if isinstance(comando, (AtribuicaoNode, EscreverNode, LerNode)):
+                trecho.append(comando)
+                continue
+            condicao = comando.condicao if isinstance(comando, SeNode) else None
+            resultado.extend(self.trecho(trecho, condicao))
+            trecho = []
+            self.desvio(comando)
+            resultado.append(comando)
+        resultado.extend(self.trecho(trecho))
+        return resultado
+
+    def desvio(self, no: Optional[ComandoNode]) -> None:
+        if isinstance(no, BlocoNode):
+            no.lista_comandos = self.lista(no.lista_comandos)
+        elif isinstance(no, SeNode):
+            no.ramo_entao = _unico(self.lista([no.ramo_entao]))
+            if no.ramo_senao:
+                no.ramo_senao = _unico(self.lista([no.ramo_senao]))
+        elif isinstance(no, EnquantoNode):
+            no.corpo = _unico(self.lista([no.corpo]))
+
+    def trecho(
+        self, comandos: List[ComandoNode], condicao: Optional[ASTNode] = None
+    ) -> List[ComandoNode]:
+        """Devolve os comandos do trecho, com o cálculo das temporárias
+        inserido antes de cada comando que as usa pela primeira vez."""
+        self.numeros = {}
+        self.valores = {}
+        self.guardados = {}
+        self.calculados = {}
+        self.prefixos = {}
+        self.ocorrencias = {}
+        self.usadas = Counter()
+        self.ordem = 0
+
+        for indice, comando in enumerate(comandos):
+            self.comando_atual = indice
+            if isinstance(comando, AtribuicaoNode):
+                numero = self.expressao(
+                    comando.direita, partial(setattr, comando, "direita")
+                )
+                if self.guardado(numero) is None:
+                    self.guardados[numero] = comando.esquerda
+                self.numeros[comando.esquerda.slot] = numero
+            elif isinstance(comando, EscreverNode):
+                for expr in comando.expressoes:
+                    if expr.tipo == "expr":
+                        self.expressao(expr.expr, partial(setattr, expr, "expr"))
+            elif isinstance(comando, LerNode):
+                for variavel in comando.variaveis:
+                    self.numeros[variavel.slot] = self.novo_numero()
+        self.comando_atual = len(comandos)
+        if isinstance(condicao, ExprLogicoNode):
+            self.expressao(condicao.esquerda, partial(setattr, condicao, "esquerda"))
+            self.expressao(condicao.direita, partial(setattr, condicao, "direita"))
+
+        antes: Dict[int, List[Tuple[int, AtribuicaoNode]]] = {}
+        for ocorrencias in self.ocorrencias.values():
+            if len(ocorrencias) < 2:
+                continue
+            primeira = ocorrencias[0]
+            # Avaliar a expressão custa tantas visitas quantos são os seus nós;
+            # a temporária custa a atribuição e uma leitura por ocorrência.
+            tamanho = contar_nos(primeira.no)
+            if (len(ocorrencias) - 1) * (tamanho - 1) <= 2:
+                continue
+            temporaria = self.temporaria(primeira.no)
+            self.reescritas.append(
+                f"{_linha(_primeiro_token(primeira.no))}{texto_expr(primeira.no)} "
+                f"calculado uma vez em {temporaria.valor} "
+                f"({len(ocorrencias)} ocorrências)"
+            )
+            token = _token_sintetico("ATRIBUIÇÃO", ":=", temporaria.token)
+            antes.setdefault(primeira.comando, []).append(
+                (primeira.ordem, AtribuicaoNode(temporaria, token, primeira.no))
+            )
+            for ocorrencia in ocorrencias:
+                ocorrencia.substituir(_ler_variavel(temporaria))
+
+        if not antes:
+            return comandos
+        resultado: List[ComandoNode] = []
+        for indice in range(len(comandos) + 1):
+            calculos = antes.get(indice, ())
+            for _, calculo in sorted(calculos, key=lambda calculo: calculo[0]):
+                resultado.append(calculo)
+            if indice < len(comandos):
+                resultado.append(comandos[indice])
+        return resultado
+
+    def novo_numero(self) -> int:
+        self.proximo_numero += 1
+        return self.proximo_numero
+
+    def numero(self, no: ASTNode) -> int:
+        """Número do valor da expressão, com os números atuais das variáveis.
+
+        Cadeias são numeradas como são avaliadas, uma operação de cada vez da
+        esquerda para a direita, de modo que cada prefixo também tem número.
+        """
+        if isinstance(no, (VariavelNode, IdNode)):
+            numero = self.numeros.get(no.slot)
+            if numero is None:
+                numero = self.numeros[no.slot] = self.novo_numero()
+            return numero
+        if isinstance(no, NumeroNode):
+            numero = self.valor(("número", no.valor))
+        elif isinstance(no, OpUnariaNode):
+            numero = self.valor(("-", self.numero(no.expr)))
+        elif isinstance(no, OpEncadeadaNode):
+            numero = self.numero(no.primeiro)
+            prefixos = []
+            for operador, operando in no.operacoes:
+                prefixos.append(numero)
+                direita = self.numero(operando)
+                if operador.valor in ("+", "*") and direita < numero:
+                    numero, direita = direita, numero
+                numero = self.valor((operador.valor, numero, direita))
+            self.prefixos[id(no)] = prefixos
+        else:
+            return self.novo_numero()
+        self.calculados[id(no)] = numero
+        return numero
+
+    def valor(self, chave: tuple) -> int:
+        numero = self.valores.get(chave)
+        if numero is None:
+            numero = self.valores[chave] = self.novo_numero()
+        return numero
+
+    def guardado(self, numero: int) -> Optional[VariavelNode]:
+        """Variável do programa que ainda guarda o valor `numero`."""
+        variavel = self.guardados.get(numero)
+        if variavel is not None and self.numeros.get(variavel.slot) == numero:
+            return variavel
+        return None
+
+    def expressao(self, no: ASTNode, substituir: Callable[[ASTNode], None]) -> int:
+        numero = self.numero(no)
+        self.planejar(no, substituir)
+        return numero
+
+    def planejar(self, no: ASTNode, substituir: Callable[[ASTNode], None]) -> None:
+        if not isinstance(no, (OpEncadeadaNode, OpUnariaNode)):
+            return
+        numero = self.calculados[id(no)]
+        guardado = self.guardado(numero)
+        if guardado is not None:
+            self.reescritas.append(
+                f"{_linha(_primeiro_token(no))}{texto_expr(no)} → {guardado.valor} "
+                "(valor já calculado)"
+            )
+            substituir(_ler_variavel(guardado))
+            return
+        ocorrencias = self.ocorrencias.get(numero)
+        if ocorrencias:
+            # Repetição: se virar temporária, o que está dentro dela não é
+            # mais avaliado.
+            ocorrencias.append(Ocorrencia(no, substituir, self.comando_atual, 0))
+            return
+
+        if isinstance(no, OpUnariaNode):
+            self.planejar(no.expr, partial(setattr, no, "expr"))
+        else:
+            self.reaproveitar_prefixo(no)
+            self.planejar(no.primeiro, partial(setattr, no, "primeiro"))
+            for indice, (_, operando) in enumerate(no.operacoes):
+                self.planejar(operando, self._substituir_operando(no, indice))
+        self.ordem += 1
+        self.ocorrencias[numero] = [
+            Ocorrencia(no, substituir, self.comando_atual, self.ordem)
+        ]
+
+    def reaproveitar_prefixo(self, no: OpEncadeadaNode) -> None:
+        """Troca o maior prefixo da cadeia (com ao menos uma operação) cujo
+        valor está guardado em uma variável por uma leitura dela."""
+        prefixos = self.prefixos[id(no)]
+        for tamanho in range(len(prefixos) - 1, 0, -1):
+            guardado = self.guardado(prefixos[tamanho])
+            if guardado is None:
+                continue
+            prefixo = _montar(no.primeiro, no.operacoes[:tamanho])
+            self.reescritas.append(
+                f"{_linha(_primeiro_token(no))}{texto_expr(prefixo)} → "
+                f"{guardado.valor} (valor já calculado)"
+            )
+            no.primeiro = _ler_variavel(guardado)
+            no.operacoes = no.operacoes[tamanho:]
+            return
+
+    @staticmethod
+    def _substituir_operando(
+        no: OpEncadeadaNode, indice: int
+    ) -> Callable[[ASTNode], None]:
+        def substituir(operando: ASTNode) -> None:
+            no.operacoes[indice] = (no.operacoes[indice][0], operando)
+
+        return substituir
+
+    def temporaria(self, no: ASTNode) -> VariavelNode:
+        tipo = no.tipo_resolvido if no.tipo_resolvido == "lógico" else "inteiro"
+        livres = self.temporarias.setdefault(tipo, [])
+        if self.usadas[tipo] == len(livres):
+            livres.append(declarar_temporaria(self.programa, tipo, _primeiro_token(no)))
+        temporaria = livres[self.usadas[tipo]]
+        self.usadas[tipo] += 1
+        return temporaria
+
+
+def otimizar(programa: ProgramaNode) -> List[str]:
+    reescritas = OtimizadorConstantes().otimizar(programa)
+    reescritas += EliminacaoCodigoMorto(programa).otimizar()
+    reescritas += MovimentacaoInvariantes(programa).otimizar()
+    reescritas += EliminacaoSubexpressoes(programa).otimizar()
+    return reescritas
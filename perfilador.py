@@ -0,0 +1,194 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from abstract_syntax_tree import (
+    ASTNode,
+    AtribuicaoNode,
+    EnquantoNode,
+    EscreverNode,
+    LerNode,
+    ProgramaNode,
+    SeNode,
+)
+from entrada import EntradaPrograma
+from interpretador import Interpretador
+from saida import SaidaPrograma
+
+
+COMANDOS_PERFILADOS = {
+    AtribuicaoNode: "atribuição",
+    LerNode: "ler",
+    EscreverNode: "escrever",
+    SeNode: "se",
+    EnquantoNode: "enquanto",
+}
+
+
+class EstatisticaLinha:
+    __slots__ = ("execucoes", "tempo_total", "tempo_proprio")
+
+    def __init__(self) -> None:
+        self.execucoes = 0
+        # Tempo dos comandos da linha, incluindo os comandos aninhados de
+        # outras linhas; comandos da mesma linha aninhados não contam duas vezes.
+        self.tempo_total = 0.0
+        # Tempo gasto na própria linha, sem os comandos aninhados.
+        self.tempo_proprio = 0.0
+
+
+class EstatisticaControle:
+    """Contagens de um `se` ou `enquanto`: para o `se`, `desvios` é o número de
+    vezes em que o ramo `então` foi tomado; para o `enquanto`, o número de
+    iterações."""
+
+    __slots__ = ("tipo", "linha", "coluna", "execucoes", "desvios", "tempo")
+
+    def __init__(self, tipo: str, linha: int, coluna: int) -> None:
+        self.tipo = tipo
+        self.linha = linha
+        self.coluna = coluna
+        self.execucoes = 0
+        self.desvios = 0
+        self.tempo = 0.0
+
+
+class InterpretadorPerfilado(Interpretador):
+    """Interpretador que mede, por comando, o número de execuções e o tempo
+    gasto em cada linha do código fonte.
+
+    A medição é feita só nos comandos (dois acessos ao relógio por comando);
+    as expressões passam direto ao Interpretador. Com o perfil desativado, o
+    ExecutorInterpretador usa o Interpretador comum.
+    """
+
+    def __init__(
+        self,
+        saida: Optional[SaidaPrograma] = None,
+        entrada: Optional[EntradaPrograma] = None,
+        relogio: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        super().__init__(saida, entrada)
+        self.relogio = relogio
+        self.linhas: Dict[int, EstatisticaLinha] = {}
+        self.controles: Dict[int, EstatisticaControle] = {}
+        self.pilhas: Dict[Tuple[str, ...], float] = {}
+        self.pilha: List[str] = []
+        self.linhas_ativas: Dict[int, int] = {}
+        self.tempo_filhos = 0.0
+
+    def interpretar_ProgramaNode(self, no: ProgramaNode) -> None:
+        self.pilha = [f"programa {no.nome}"]
+        super().interpretar_ProgramaNode(no)
+
+    def interpretar(self, no: Optional[ASTNode]) -> Any:
+        rotulo = COMANDOS_PERFILADOS.get(type(no))
+        if rotulo is None:
+            return super().interpretar(no)
+
+        token = no.esquerda.token if rotulo == "atribuição" else no.token
+        linha = token.linha if token else 0
+        estatistica = self.linhas.get(linha)
+        if estatistica is None:
+            estatistica = self.linhas[linha] = EstatisticaLinha()
+        estatistica.execucoes += 1
+
+        pilha = self.pilha
+        pilha.append(f"{rotulo} (linha {linha})")
+        linhas_ativas = self.linhas_ativas
+        linhas_ativas[linha] = linhas_ativas.get(linha, 0) + 1
+        tempo_filhos_externo = self.tempo_filhos
+        self.tempo_filhos = 0.0
+        inicio = self.relogio()
+        try:
+            return super().interpretar(no)
+        finally:
+            decorrido = self.relogio() - inicio
+            proprio = decorrido - self.tempo_filhos
+            self.tempo_filhos = tempo_filhos_externo + decorrido
+            estatistica.tempo_proprio += proprio
+            linhas_ativas[linha] -= 1
+            if not linhas_ativas[linha]:
+                estatistica.tempo_total += decorrido
+            chave = tuple(pilha)
+            self.pilhas[chave] = self.pilhas.get(chave, 0.0) + proprio
+            pilha.pop()
+
+    def _controle(self, no: ASTNode, tipo: str) -> EstatisticaControle:
+        controle = self.controles.get(id(no))
+        if controle is None:
+            token = no.token
+            controle = self.controles[id(no)] = EstatisticaControle(
+                tipo, token.linha if token else 0, token.coluna if token else 0
+            )
+        controle.execucoes += 1
+        return controle
+
+    def interpretar_SeNode(self, no):
+        controle = self._controle(no, "se")
+        inicio = self.relogio()
+        try:
+            if self.interpretar(no.condicao):
+                controle.desvios += 1
+                if no.ramo_entao:
+                    self.interpretar(no.ramo_entao)
+            elif no.ramo_senao:
+                self.interpretar(no.ramo_senao)
+        finally:
+            controle.tempo += self.relogio() - inicio
+
+    def interpretar_EnquantoNode(self, no):
+        controle = self._controle(no, "enquanto")
+        inicio = self.relogio()
+        try:
+            if no.condicao and no.corpo:
+                while self.interpretar(no.condicao):
+                    controle.desvios += 1
+                    self.interpretar(no.corpo)
+        finally:
+            controle.tempo += self.relogio() - inicio
+
+    def listagem_anotada(self, codigo_fonte: str) -> str:
+        """Código fonte com execuções, tempo total e tempo próprio por linha,
+        seguido de um resumo de cada `se` e `enquanto`."""
+        total = sum(e.tempo_proprio for e in self.linhas.values()) or 1.0
+        linhas = [
+            f"{'execuções':>10} {'total ms':>10} {'próprio ms':>10} {'%':>6}  linha"
+        ]
+        for numero, texto in enumerate(codigo_fonte.splitlines(), start=1):
+            estatistica = self.linhas.get(numero)
+            if estatistica is None:
+                prefixo = " " * 40
+            else:
+                prefixo = (
+                    f"{estatistica.execucoes:>10} "
+                    f"{estatistica.tempo_total * 1000:>10.3f} "
+                    f"{estatistica.tempo_proprio * 1000:>10.3f} "
+                    f"{estatistica.tempo_proprio / total * 100:>5.1f}%"
+                )
+            linhas.append(f"{prefixo}  {numero:>4} | {texto}")
+
+        if self.controles:
+            linhas.append("")
+            linhas.append(
+                f"{'comando':<10} {'posição':>10} {'execuções':>10} "
+                f"{'então/iterações':>16} {'total ms':>10}"
+            )
+            for controle in sorted(
+                self.controles.values(), key=lambda c: (c.linha, c.coluna)
+            ):
+                posicao = f"{controle.linha}:{controle.coluna}"
+                linhas.append(
+                    f"{controle.tipo:<10} {posicao:>10} {controle.execucoes:>10} "
+                    f"{controle.desvios:>16} {controle.tempo * 1000:>10.3f}"
+                )
+        return "\n".join(linhas) + "\n"
+
+    def pilhas_colapsadas(self) -> str:
+        """Pilhas no formato "quadro;quadro;quadro peso" lido por flamegraph.pl,
+        speedscope e similares, com o tempo próprio em microssegundos."""
+        linhas = []
+        for pilha, tempo in sorted(self.pilhas.items()):
+            microssegundos = round(tempo * 1_000_000)
+            if microssegundos > 0:
+                linhas.append(f"{';'.join(pilha)} {microssegundos}")
+        return "\n".join(linhas) + "\n" if linhas else ""
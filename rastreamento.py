@@ -0,0 +1,94 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, List, Optional, TextIO
+
+
+NIVEL_DESATIVADO = 0
+NIVEL_FASES = 1
+NIVEL_COMANDOS = 2
+NIVEL_NOS = 3
+
+NIVEIS = {
+    "desativado": NIVEL_DESATIVADO,
+    "fases": NIVEL_FASES,
+    "comandos": NIVEL_COMANDOS,
+    "nos": NIVEL_NOS,
+}
+
+
+class SaidaRastreamento(ABC):
+    """Destino dos eventos de rastreamento já formatados."""
+
+    @abstractmethod
+    def registrar(self, nivel: int, mensagem: str) -> None:
+        pass
+
+    def fechar(self) -> None:
+        pass
+
+
+class SaidaStream(SaidaRastreamento):
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+
+    def registrar(self, nivel: int, mensagem: str) -> None:
+        print(mensagem, file=self.stream or sys.stderr)
+
+
+class SaidaArquivo(SaidaRastreamento):
+    def __init__(self, caminho: str) -> None:
+        self.arquivo = open(caminho, "w", encoding="utf-8")
+
+    def registrar(self, nivel: int, mensagem: str) -> None:
+        self.arquivo.write(mensagem + "\n")
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+class SaidaBufferCircular(SaidaRastreamento):
+    """Guarda apenas os últimos `capacidade` eventos, útil para inspecionar o
+    que aconteceu imediatamente antes de um erro."""
+
+    def __init__(self, capacidade: int = 1000) -> None:
+        self.eventos: Deque[str] = deque(maxlen=capacidade)
+
+    def registrar(self, nivel: int, mensagem: str) -> None:
+        self.eventos.append(mensagem)
+
+    def conteudo(self) -> List[str]:
+        return list(self.eventos)
+
+
+class Rastreador:
+    """Emite eventos de rastreamento com formatação preguiçosa.
+
+    A mensagem é passada como string de formato mais argumentos, e só é
+    formatada se o nível do evento estiver habilitado.
+    """
+
+    def __init__(
+        self,
+        nivel: int = NIVEL_DESATIVADO,
+        saidas: Optional[List[SaidaRastreamento]] = None,
+    ) -> None:
+        self.nivel = nivel
+        self.saidas = saidas if saidas is not None else [SaidaStream()]
+
+    def habilitado(self, nivel: int) -> bool:
+        return nivel <= self.nivel
+
+    def emitir(self, nivel: int, formato: str, *args: Any) -> None:
+        if nivel > self.nivel:
+            return
+        mensagem = formato.format(*args) if args else formato
+        for saida in self.saidas:
+            saida.registrar(nivel, mensagem)
+
+    def fechar(self) -> None:
+        for saida in self.saidas:
+            saida.fechar()
+
+
+RASTREADOR_DESATIVADO = Rastreador(NIVEL_DESATIVADO, saidas=[])
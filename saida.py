@@ -0,0 +1,149 @@
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import BinaryIO, List, Optional, TextIO, Union
+
+
+LIMITE_BUFFER_PADRAO = 64 * 1024
+
+
+class SaidaPrograma(ABC):
+    """Destino do texto produzido por `escrever`.
+
+    `escrever` recebe uma linha já montada, sem a quebra final, e deve produzir
+    exatamente o mesmo texto que `print(linha)`.
+    """
+
+    def escrever(self, linha: str) -> None:
+        self.escrever_texto(linha + "\n")
+
+    @abstractmethod
+    def escrever_texto(self, texto: str) -> None:
+        pass
+
+    def descarregar(self) -> None:
+        pass
+
+    def fechar(self) -> None:
+        self.descarregar()
+
+
+class SaidaTexto(SaidaPrograma):
+    """Escreve em um stream de texto; sem `stream`, usa o `sys.stdout` vigente
+    no momento da escrita, como `print`."""
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+
+    def escrever_texto(self, texto: str) -> None:
+        (self.stream or sys.stdout).write(texto)
+
+    def descarregar(self) -> None:
+        (self.stream or sys.stdout).flush()
+
+
+class SaidaBinaria(SaidaPrograma):
+    """Escreve bytes codificados diretamente em um descritor de arquivo ou em um
+    `io.BufferedWriter` (como `sys.stdout.buffer`), sem a camada de texto."""
+
+    def __init__(
+        self, destino: Union[int, BinaryIO] = 1, codificacao: str = "utf-8"
+    ) -> None:
+        self.destino = destino
+        self.codificacao = codificacao
+
+    def escrever_texto(self, texto: str) -> None:
+        dados = texto.encode(self.codificacao)
+        if isinstance(self.destino, int):
+            visao = memoryview(dados)
+            while visao:
+                visao = visao[os.write(self.destino, visao) :]
+        else:
+            self.destino.write(dados)
+
+    def descarregar(self) -> None:
+        if not isinstance(self.destino, int):
+            self.destino.flush()
+
+
+class SaidaMemoria(SaidaPrograma):
+    """Acumula a saída em memória, para testes e correção automática."""
+
+    def __init__(self) -> None:
+        self.partes: List[str] = []
+
+    def escrever_texto(self, texto: str) -> None:
+        self.partes.append(texto)
+
+    def conteudo(self) -> str:
+        return "".join(self.partes)
+
+
+class SaidaBufferizada(SaidaPrograma):
+    """Acumula linhas e as repassa a `destino` em uma única escrita quando o
+    buffer atinge `limite_caracteres` ou `limite_linhas` (`limite_linhas=1`
+    equivale a um buffer por linha).
+
+    Quem usa a saída deve chamar `descarregar` antes de ler da entrada padrão e
+    antes de relatar erros, para que a ordem do texto no terminal se mantenha.
+    """
+
+    def __init__(
+        self,
+        destino: SaidaPrograma,
+        limite_caracteres: int = LIMITE_BUFFER_PADRAO,
+        limite_linhas: Optional[int] = None,
+    ) -> None:
+        self.destino = destino
+        self.limite_caracteres = limite_caracteres
+        self.limite_linhas = limite_linhas or sys.maxsize
+        self.pendentes: List[str] = []
+        self.tamanho = 0
+
+    def escrever(self, linha: str) -> None:
+        pendentes = self.pendentes
+        pendentes.append(linha)
+        self.tamanho += len(linha) + 1
+        if (
+            self.tamanho >= self.limite_caracteres
+            or len(pendentes) >= self.limite_linhas
+        ):
+            self.descarregar()
+
+    def escrever_texto(self, texto: str) -> None:
+        self.descarregar()
+        self.destino.escrever_texto(texto)
+
+    def descarregar(self) -> None:
+        if self.pendentes:
+            self.pendentes.append("")
+            texto = "\n".join(self.pendentes)
+            self.pendentes = []
+            self.tamanho = 0
+            self.destino.escrever_texto(texto)
+        self.destino.descarregar()
+
+    def fechar(self) -> None:
+        self.descarregar()
+        self.destino.fechar()
+
+
+class SaidaContada(SaidaPrograma):
+    """Repassa tudo a `destino`, contando as linhas escritas."""
+
+    def __init__(self, destino: SaidaPrograma) -> None:
+        self.destino = destino
+        self.linhas = 0
+
+    def escrever(self, linha: str) -> None:
+        self.linhas += 1
+        self.destino.escrever(linha)
+
+    def escrever_texto(self, texto: str) -> None:
+        self.destino.escrever_texto(texto)
+
+    def descarregar(self) -> None:
+        self.destino.descarregar()
+
+    def fechar(self) -> None:
+        self.destino.fechar()
@@ -0,0 +1,298 @@
+"""Servidor de compilação e execução em um socket Unix local.
+
+Mantém em memória os módulos do compilador, os analisadores já inicializados
+e os programas já compilados (CacheMemoria), de modo que um pedido não paga
+a inicialização do Python nem as importações. Cada conexão é atendida em uma
+thread; o protocolo está descrito em `cliente.py`.
+
+Uso: python servidor.py [--socket CAMINHO] [--max-programas N]
+"""
+
+import os
+import signal
+import socketserver
+import sys
+import threading
+import traceback
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from analisador_lexico import AnalisadorLexico
+from cache_compilacao import PROGRAMAS_EM_MEMORIA_PADRAO, CacheMemoria
+from cliente import caminho_socket_padrao, conectar, enviar, receber
+from entrada import EntradaBlocos, EntradaIteravel, EntradaMapeada, EntradaPrograma
+from interpretador import BACKENDS, ExecutorInterpretador
+from saida import LIMITE_BUFFER_PADRAO, SaidaBufferizada, SaidaMemoria, SaidaPrograma
+from verificador_lote import classificar_erro
+
+
+PROGRAMA_AQUECIMENTO = """programa aquecimento;
+var x: inteiro; p: lógico;
+início
+    x := 1;
+    enquanto x < 3 faça x := x + 1;
+    se x = 3 então p := 1;
+    escrever("x = ", x / 1)
+fim.
+"""
+
+
+class ExecutorServidor(ExecutorInterpretador):
+    """Guarda o erro para a resposta em vez de imprimi-lo na saída do
+    servidor."""
+
+    rastro: Optional[str] = None
+
+    def relatar_erro(self, erro: Exception) -> None:
+        self.rastro = traceback.format_exc()
+
+
+class SaidaConexao(SaidaPrograma):
+    def __init__(self, atendimento: "AtendimentoConexao") -> None:
+        self.atendimento = atendimento
+
+    def escrever_texto(self, texto: str) -> None:
+        self.atendimento.responder({"saida": texto})
+
+
+class AtendimentoConexao(socketserver.StreamRequestHandler):
+    """Atende os pedidos de uma conexão, um de cada vez."""
+
+    server: "ServidorCompilacao"
+
+    def responder(self, mensagem: Dict[str, Any]) -> None:
+        enviar(self.wfile, mensagem)
+
+    def handle(self) -> None:
+        try:
+            while True:
+                try:
+                    pedido = receber(self.rfile)
+                except ValueError as e:
+                    resposta = _erro("protocolo", f"JSON inválido: {e}")
+                    resposta["fim"] = True
+                    self.responder(resposta)
+                    continue
+                if pedido is None:
+                    return
+                self.responder(self.atender(pedido))
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente desconectou; a execução dele já foi interrompida.
+            pass
+
+    def atender(self, pedido: Any) -> Dict[str, Any]:
+        operacao = pedido.get("operacao") if isinstance(pedido, dict) else None
+        atender = getattr(self, f"atender_{operacao}", None)
+        if atender is None:
+            resposta = _erro("protocolo", f"Operação desconhecida: {operacao!r}")
+        else:
+            self.server.contar_atendimento()
+            try:
+                resposta = atender(pedido)
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                resposta = _erro(type(e).__name__, str(e))
+        resposta["fim"] = True
+        return resposta
+
+    def atender_executar(self, pedido: Dict[str, Any]) -> Dict[str, Any]:
+        saida = SaidaBufferizada(
+            SaidaConexao(self),
+            pedido.get("saida_buffer") or LIMITE_BUFFER_PADRAO,
+            pedido.get("saida_linhas"),
+        )
+        metricas = pedido.get("metricas")
+        executor = ExecutorServidor(
+            backend=pedido.get("backend", "arvore"),
+            otimizar=bool(pedido.get("otimizar")),
+            cache=self.server.cache,
+            saida=saida,
+            entrada=self._entrada(pedido),
+            metricas=bool(metricas),
+        )
+        if "arquivo" in pedido:
+            resultado = executor.interpretar_arquivo(pedido["arquivo"])
+        else:
+            resultado = executor.interpretar_codigo(pedido["codigo"])
+
+        resposta = {
+            "sucesso": resultado.sucesso,
+            "tipo_erro": resultado.tipo_erro,
+            "erro": resultado.erro,
+            "cache": resultado.cache,
+        }
+        if executor.rastro:
+            resposta["rastro"] = executor.rastro
+        if metricas == "prometheus":
+            resposta["metricas"] = resultado.para_prometheus()
+        elif metricas:
+            resposta["metricas"] = resultado.para_json(indent=2) + "\n"
+        return resposta
+
+    def atender_compilar(self, pedido: Dict[str, Any]) -> Dict[str, Any]:
+        """Compila (com `otimizar`, se pedido) e guarda o programa para os
+        próximos `executar`."""
+        resposta, reescritas = self._compilar(pedido, bool(pedido.get("otimizar")))
+        if resposta["sucesso"]:
+            resposta["reescritas"] = reescritas
+        return resposta
+
+    def atender_verificar(self, pedido: Dict[str, Any]) -> Dict[str, Any]:
+        """Análises léxica, sintática e semântica, com o tipo, a linha e a
+        coluna do erro, como o `verificador_lote`."""
+        return self._compilar(pedido, False)[0]
+
+    def atender_estado(self, pedido: Dict[str, Any]) -> Dict[str, Any]:
+        cache = self.server.cache
+        return {
+            "sucesso": True,
+            "pid": os.getpid(),
+            "atendimentos": self.server.atendimentos,
+            "conexoes_ativas": threading.active_count() - 1,
+            "programas": len(cache.programas),
+            "cache": cache.estatisticas(),
+        }
+
+    def _compilar(
+        self, pedido: Dict[str, Any], otimizar: bool
+    ) -> Tuple[Dict[str, Any], Any]:
+        cache = self.server.cache
+        executor = ExecutorServidor(otimizar=otimizar, cache=cache)
+        caminho = pedido.get("arquivo", "<codigo>")
+        try:
+            if "arquivo" in pedido:
+                chave = cache.chave_arquivo(caminho, otimizar)
+                analisador_lexico = AnalisadorLexico.de_arquivo(caminho)
+            else:
+                codigo_fonte = pedido["codigo"]
+                chave = cache.chave(codigo_fonte.encode("utf-8"), otimizar)
+                analisador_lexico = AnalisadorLexico(codigo_fonte)
+            carregado = cache.carregar(chave)
+            if carregado is None:
+                arvore = executor.compilar(analisador_lexico)
+                cache.gravar(chave, arvore, executor.reescritas)
+                reescritas = executor.reescritas
+            else:
+                reescritas = carregado[1]
+        except Exception as e:
+            resultado = classificar_erro(caminho, e)._asdict()
+            del resultado["caminho"]
+            resultado["erro"] = resultado.pop("mensagem")
+            return resultado, None
+        return {"sucesso": True, "cache": carregado is not None}, reescritas
+
+    def _entrada(self, pedido: Dict[str, Any]) -> EntradaPrograma:
+        if "entrada" in pedido:
+            return EntradaIteravel([pedido["entrada"]])
+        if "entrada_arquivo" in pedido:
+            return EntradaMapeada(pedido["entrada_arquivo"])
+        return EntradaBlocos(self._blocos_do_cliente())
+
+    def _blocos_do_cliente(self) -> Iterator[str]:
+        while True:
+            self.responder({"ler": True})
+            mensagem = receber(self.rfile)
+            bloco = mensagem.get("entrada") if isinstance(mensagem, dict) else None
+            if not bloco:
+                return
+            yield bloco
+
+
+def _erro(tipo_erro: str, mensagem: str) -> Dict[str, Any]:
+    return {"sucesso": False, "tipo_erro": tipo_erro, "erro": mensagem}
+
+
+class ServidorCompilacao(socketserver.ThreadingUnixStreamServer):
+    """Cada conexão ganha uma thread. Execuções simultâneas compartilham o
+    GIL: a concorrência evita que um programa longo bloqueie os demais
+    pedidos, mas não os executa em paralelo."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, caminho: str, maximo_programas: int = PROGRAMAS_EM_MEMORIA_PADRAO
+    ) -> None:
+        self.caminho = caminho
+        self.cache = CacheMemoria(maximo_programas)
+        self.atendimentos = 0
+        self.trava = threading.Lock()
+        _remover_socket_abandonado(caminho)
+        # Só o próprio usuário pode se conectar ao socket.
+        mascara = os.umask(0o177)
+        try:
+            super().__init__(caminho, AtendimentoConexao)
+        finally:
+            os.umask(mascara)
+
+    def contar_atendimento(self) -> None:
+        with self.trava:
+            self.atendimentos += 1
+
+    def aquecer(self) -> None:
+        """Executa um programa pequeno em cada backend, para que módulos
+        importados sob demanda e estruturas criadas na primeira análise já
+        estejam prontos no primeiro pedido."""
+        for backend in BACKENDS:
+            for otimizar in (False, True):
+                ExecutorServidor(
+                    backend=backend,
+                    otimizar=otimizar,
+                    saida=SaidaMemoria(),
+                    entrada=EntradaIteravel(()),
+                ).interpretar_codigo(PROGRAMA_AQUECIMENTO)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.caminho)
+        except OSError:
+            pass
+
+
+def _remover_socket_abandonado(caminho: str) -> None:
+    if not os.path.exists(caminho):
+        return
+    conexao = conectar(caminho)
+    if conexao is not None:
+        conexao.close()
+        raise OSError(f"Já há um servidor atendendo em {caminho}")
+    os.remove(caminho)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Servidor de compilação e execução em um socket Unix."
+    )
+    parser.add_argument(
+        "--socket",
+        default=caminho_socket_padrao(),
+        help="Caminho do socket (padrão: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-programas",
+        type=int,
+        default=PROGRAMAS_EM_MEMORIA_PADRAO,
+        help="Programas compilados mantidos em memória (padrão: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    try:
+        servidor = ServidorCompilacao(args.socket, args.max_programas)
+    except OSError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+    # SIGTERM encerra como Ctrl+C, removendo o socket.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    with servidor:
+        servidor.aquecer()
+        print(f"Servidor atendendo em {args.socket}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
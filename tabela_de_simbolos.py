@@ -1,10 +1,20 @@
 from typing import Dict, Optional
 
 
+# Prefixo das variáveis criadas pelo otimizador. Não é um identificador válido,
+# de modo que não colide com as variáveis do programa.
+PREFIXO_TEMPORARIA = "$"
+
+
+def eh_temporaria(nome: str) -> bool:
+    return nome.startswith(PREFIXO_TEMPORARIA)
+
+
 class Simbolo:
-    def __init__(self, nome: str, tipo: str) -> None:
+    def __init__(self, nome: str, tipo: str, slot: Optional[int] = None) -> None:
         self.nome = nome
         self.tipo = tipo
+        self.slot = slot
 
 
 class TabelaDeSimbolos:
@@ -12,7 +22,12 @@ class TabelaDeSimbolos:
         self._simbolos: Dict[str, Simbolo] = {}
 
     def definir(self, simbolo: Simbolo) -> None:
+        if simbolo.slot is None:
+            simbolo.slot = len(self._simbolos)
         self._simbolos[simbolo.nome] = simbolo
 
     def buscar(self, nome: str) -> Optional[Simbolo]:
         return self._simbolos.get(nome)
+
+    def total_slots(self) -> int:
+        return len(self._simbolos)
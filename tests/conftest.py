@@ -0,0 +1,43 @@
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+# Os módulos do compilador ficam na raiz do repositório.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entrada import EntradaIteravel
+from interpretador import ExecutorInterpretador
+from saida import SaidaMemoria
+
+
+Observado = Tuple[str, bool, Optional[str], Optional[Dict[str, Any]]]
+
+
+class ExecutorSilencioso(ExecutorInterpretador):
+    def relatar_erro(self, erro: Exception) -> None:
+        pass
+
+
+def executar_programa(
+    codigo_fonte: str, backend: str, otimizar: bool, entradas: Sequence[str]
+) -> Tuple[Observado, List[str]]:
+    """Saída, sucesso, erro e estado final das variáveis (só com sucesso) de
+    uma execução, e as reescritas aplicadas pelo otimizador."""
+    saida = SaidaMemoria()
+    executor = ExecutorSilencioso(
+        backend=backend,
+        otimizar=otimizar,
+        saida=saida,
+        entrada=EntradaIteravel(entradas),
+    )
+    resultado = executor.interpretar_codigo(codigo_fonte)
+    variaveis = executor.interpretador.variaveis if resultado.sucesso else None
+    observado = (saida.conteudo(), resultado.sucesso, resultado.erro, variaveis)
+    return observado, executor.reescritas
+
+
+@pytest.fixture
+def executar() -> Callable[..., Tuple[Observado, List[str]]]:
+    return executar_programa
@@ -0,0 +1,130 @@
+"""Aplica edições aleatórias a um DocumentoIncremental e compara, depois de
+cada uma, os tokens, a árvore e o tipo do erro com os de uma análise completa
+do texto editado."""
+
+import glob
+import os
+import random
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+import analisador_incremental
+from abstract_syntax_tree import ASTNode
+from analisador_incremental import DocumentoIncremental
+from analisador_lexico import AnalisadorLexico, Token
+from analisador_sintatico import AnalisadorSintatico
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMAS = sorted(
+    os.path.relpath(caminho, RAIZ)
+    for pasta in ("codigos", "codigos_otimizacao")
+    for caminho in glob.glob(os.path.join(RAIZ, pasta, "*.txt"))
+)
+
+# Trechos inseridos: quebras de linha, comentários (inclusive abertos ou
+# fechados pela metade), strings, palavras reservadas e caracteres inválidos.
+TRECHOS = (
+    "\n",
+    "\n\n",
+    " ",
+    "x",
+    "1 + ",
+    ";",
+    "a := 2;\n",
+    "escrever(a);\n",
+    "se ",
+    "então ",
+    "senão ",
+    "início ",
+    "fim ",
+    "enquanto ",
+    "faça ",
+    "/*",
+    "*/",
+    "/* c\n */",
+    '"s"',
+    '"',
+    '"a\nb"',
+    "(",
+    ")",
+    "@",
+    "",
+)
+
+EDICOES = 150
+
+
+def estrutura(valor: Any) -> Any:
+    """Árvore como listas e tuplas comparáveis por valor."""
+    if isinstance(valor, Token):
+        return (valor.tipo, valor.valor, valor.linha, valor.coluna)
+    if isinstance(valor, (list, tuple)):
+        return [estrutura(item) for item in valor]
+    if isinstance(valor, ASTNode):
+        campos: List[Any] = [type(valor).__name__]
+        for classe in type(valor).__mro__:
+            for nome in getattr(classe, "__slots__", ()):
+                campos.append((nome, estrutura(getattr(valor, nome, None))))
+        return campos
+    return valor
+
+
+def tokens_de(tokens: List[Token]) -> List[Tuple[str, str, int, int]]:
+    return [(token.tipo, token.valor, token.linha, token.coluna) for token in tokens]
+
+
+def analisar_completo(
+    codigo_fonte: str,
+) -> Tuple[Optional[list], Any, Optional[type]]:
+    try:
+        tokens = AnalisadorLexico(codigo_fonte).analisar()
+    except Exception as erro:
+        return None, None, type(erro)
+    try:
+        arvore = AnalisadorSintatico(tokens).analisar()
+    except Exception as erro:
+        return tokens_de(tokens), None, type(erro)
+    return tokens_de(tokens), estrutura(arvore), None
+
+
+@pytest.fixture
+def blocos_pequenos(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Blocos de tokens e marcos de linha pequenos, para que as edições
+    # dividam e esvaziem blocos e atravessem marcos.
+    monkeypatch.setattr(analisador_incremental, "TAMANHO_MINIMO_BLOCO", 4)
+    monkeypatch.setattr(analisador_incremental, "ESPACO_MARCOS", 64)
+
+
+@pytest.mark.parametrize("semente", range(3))
+@pytest.mark.parametrize("programa", PROGRAMAS)
+def test_edicoes_equivalem_a_analise_completa(
+    blocos_pequenos: None, programa: str, semente: int
+) -> None:
+    with open(os.path.join(RAIZ, programa), encoding="utf-8") as arquivo:
+        texto = arquivo.read()
+    aleatorio = random.Random(semente)
+    documento = DocumentoIncremental(texto)
+
+    for _ in range(EDICOES):
+        posicao = aleatorio.randint(0, len(texto))
+        removidos = min(aleatorio.choice((0, 0, 1, 2, 5)), len(texto) - posicao)
+        inseridos = aleatorio.choice(TRECHOS)
+        texto = texto[:posicao] + inseridos + texto[posicao + removidos :]
+        tokens, arvore, erro = analisar_completo(texto)
+
+        descricao = f"{posicao}, {removidos}, {inseridos!r}"
+        try:
+            obtida = estrutura(documento.editar(posicao, removidos, inseridos))
+        except Exception as erro_incremental:
+            assert type(erro_incremental) is erro, descricao
+        else:
+            assert erro is None, descricao
+            assert obtida == arvore, descricao
+
+        if tokens is None:
+            assert documento.tokens is None, descricao
+        else:
+            assert tokens_de(documento.tokens) == tokens, descricao
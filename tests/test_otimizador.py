@@ -0,0 +1,129 @@
+"""Executa os programas de `codigos_otimizacao/` com e sem `-O` em todos os
+backends: a saída, o erro e o estado final das variáveis têm de ser os da
+execução sem otimização no backend `arvore`. A entrada de `ler` de cada
+`nome.txt` fica em `nome.entrada`."""
+
+import glob
+import os
+from typing import Callable, List, Tuple
+
+import pytest
+
+from interpretador import BACKENDS
+
+
+PASTA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "codigos_otimizacao"
+)
+
+PROGRAMAS = sorted(
+    os.path.splitext(os.path.basename(caminho))[0]
+    for caminho in glob.glob(os.path.join(PASTA, "*.txt"))
+)
+
+
+def carregar(nome: str) -> Tuple[str, List[str]]:
+    with open(os.path.join(PASTA, nome + ".txt"), encoding="utf-8") as arquivo:
+        codigo_fonte = arquivo.read()
+    entradas: List[str] = []
+    caminho_entrada = os.path.join(PASTA, nome + ".entrada")
+    if os.path.exists(caminho_entrada):
+        with open(caminho_entrada, encoding="utf-8") as arquivo:
+            entradas = arquivo.read().split()
+    return codigo_fonte, entradas
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("nome", PROGRAMAS)
+def test_otimizacao_preserva_comportamento(
+    executar: Callable, nome: str, backend: str
+) -> None:
+    codigo_fonte, entradas = carregar(nome)
+    esperado, _ = executar(codigo_fonte, "arvore", False, entradas)
+    sem_otimizacao, _ = executar(codigo_fonte, backend, False, entradas)
+    otimizado, reescritas = executar(codigo_fonte, backend, True, entradas)
+    assert reescritas, "o programa deve exercitar o otimizador"
+    assert sem_otimizacao == esperado
+    assert otimizado == esperado
+
+
+def test_divisao_invariante_em_laco_que_nao_executa(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("divisao_laco_vazio")
+    for backend in BACKENDS:
+        (saida, sucesso, erro, _), reescritas = executar(
+            codigo_fonte, backend, True, entradas
+        )
+        assert sucesso, erro
+        assert saida == "5 -1\n 5\n 14\n"
+        # Só o que não pode falhar sai do laço: -a, nunca uma divisão.
+        movidas = [r for r in reescritas if "antes do laço" in r]
+        assert movidas
+        assert not any("/" in reescrita for reescrita in movidas)
+
+
+def test_divisao_por_zero_depois_da_saida_do_laco(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("divisao_por_zero")
+    for backend in BACKENDS:
+        (saida, sucesso, erro, _), _ = executar(codigo_fonte, backend, True, entradas)
+        assert not sucesso
+        assert erro == "Divisão por zero"
+        assert saida == "14 \n"
+
+
+def test_condicoes_logicas(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("condicoes_logicas")
+    (saida, sucesso, _, variaveis), reescritas = executar(
+        codigo_fonte, "arvore", True, entradas
+    )
+    assert sucesso
+    assert saida == "True False 0 1\n 24 24 0\n 0 -1\n 1\n"
+    assert variaveis["h"] == 0 and variaveis["k"] == 1
+    assert any(
+        "h := f * -g" in reescrita and "antes do laço" in reescrita
+        for reescrita in reescritas
+    )
+    assert any("sempre verdadeira" in reescrita for reescrita in reescritas)
+    assert any("sempre falsa" in reescrita for reescrita in reescritas)
+
+
+def test_temporarias_nao_aparecem_no_estado_final(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("subexpressoes_temporarias")
+    for backend in BACKENDS:
+        (saida, sucesso, _, variaveis), reescritas = executar(
+            codigo_fonte, backend, True, entradas
+        )
+        assert sucesso
+        assert saida == "29 29\n42\n42 12\nmenor\n-6\n"
+        # O valor foi guardado em uma temporária, que não aparece no estado.
+        assert any("$" in reescrita for reescrita in reescritas)
+        assert sorted(variaveis) == ["a", "b", "c", "d"]
+
+
+def test_subexpressao_invalidada_nos_ramos_do_se(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("subexpressoes_se")
+    for backend in BACKENDS:
+        (saida, sucesso, _, variaveis), reescritas = executar(
+            codigo_fonte, backend, True, entradas
+        )
+        assert sucesso
+        assert saida == "13 \n10 13 30 17 17\n38\n"
+        assert (variaveis["y"], variaveis["z"], variaveis["w"]) == (13, 30, 17)
+        # O valor de a * b + c só é reaproveitado dentro do ramo então (antes
+        # de c := c * 2) e na condição do se logo depois de w; y, depois do
+        # primeiro se, não pode reaproveitá-lo.
+        assert len([r for r in reescritas if "a * b + c" in r]) == 2
+
+
+def test_subexpressao_invalidada_no_corpo_do_enquanto(executar: Callable) -> None:
+    codigo_fonte, entradas = carregar("subexpressoes_enquanto")
+    for backend in BACKENDS:
+        (saida, sucesso, _, variaveis), reescritas = executar(
+            codigo_fonte, backend, True, entradas
+        )
+        assert sucesso
+        assert saida == "10 10 \n9 \n14 14 \n13 \n18 18 \n17 \n10 18 42 22\n"
+        assert variaveis["y"] == 18 and variaveis["s"] == 42
+        # a * b - c só é reaproveitado no escrever logo depois de y; depois do
+        # ler(c), só a * b, que não depende de c.
+        assert len([r for r in reescritas if "a * b - c" in r]) == 1
+        assert any("a * b " in r and "a * b -" not in r for r in reescritas)
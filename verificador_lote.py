@@ -0,0 +1,151 @@
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional
+
+from analisador_lexico import AnalisadorLexico, LexicalError
+from analisador_semantico import AnalisadorSemantico, SemanticError
+from analisador_sintatico import AnalisadorSintatico, SyntacticError
+
+
+TIPOS_ERRO = (
+    (LexicalError, "lexico"),
+    (SyntacticError, "sintatico"),
+    (SemanticError, "semantico"),
+    (OSError, "leitura"),
+    (UnicodeDecodeError, "leitura"),
+)
+
+
+class ResultadoArquivo(NamedTuple):
+    caminho: str
+    sucesso: bool
+    tipo_erro: Optional[str] = None
+    mensagem: Optional[str] = None
+    linha: Optional[int] = None
+    coluna: Optional[int] = None
+
+
+def classificar_erro(caminho: str, erro: Exception) -> ResultadoArquivo:
+    tipo_erro = "interno"
+    for classe, nome in TIPOS_ERRO:
+        if isinstance(erro, classe):
+            tipo_erro = nome
+            break
+    token = getattr(erro, "token", None)
+    return ResultadoArquivo(
+        caminho,
+        False,
+        tipo_erro,
+        str(erro),
+        token.linha if token else None,
+        token.coluna if token else None,
+    )
+
+
+def verificar_arquivo(caminho: str) -> ResultadoArquivo:
+    """Executa as análises léxica, sintática e semântica de um arquivo, em uma
+    única passagem e sem guardar a árvore."""
+    try:
+        tokens = AnalisadorLexico.de_arquivo(caminho).iter_tokens()
+        AnalisadorSintatico(tokens, AnalisadorSemantico()).verificar()
+    except Exception as e:
+        return classificar_erro(caminho, e)
+    return ResultadoArquivo(caminho, True)
+
+
+def expandir_entradas(entradas: List[str], padrao: str = "*.txt") -> List[str]:
+    """Converte diretórios (percorridos recursivamente), globs e arquivos em uma
+    lista ordenada de caminhos, sem repetições."""
+    caminhos: List[str] = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            encontrados = glob.glob(
+                os.path.join(entrada, "**", padrao), recursive=True
+            )
+        elif glob.has_magic(entrada):
+            encontrados = glob.glob(entrada, recursive=True)
+        else:
+            encontrados = [entrada]
+        caminhos.extend(sorted(c for c in encontrados if not os.path.isdir(c)))
+    return list(dict.fromkeys(caminhos))
+
+
+def verificar_em_lote(
+    caminhos: List[str],
+    trabalhadores: Optional[int] = None,
+    tamanho_lote: Optional[int] = None,
+) -> Iterator[ResultadoArquivo]:
+    """Distribui os arquivos entre `trabalhadores` processos, em lotes de
+    `tamanho_lote` arquivos por envio. Os resultados saem na ordem de `caminhos`."""
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores == 1 or len(caminhos) <= 1:
+        yield from map(verificar_arquivo, caminhos)
+        return
+
+    if not tamanho_lote:
+        # Lotes grandes o bastante para diluir o custo de comunicação entre
+        # processos, mas com folga para balancear arquivos de tamanhos desiguais.
+        tamanho_lote = max(1, len(caminhos) // (trabalhadores * 4))
+    with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+        yield from executor.map(verificar_arquivo, caminhos, chunksize=tamanho_lote)
+
+
+def formatar_resultado(resultado: ResultadoArquivo) -> str:
+    if resultado.sucesso:
+        return f"{resultado.caminho}: OK"
+    posicao = ""
+    if resultado.linha is not None:
+        posicao = f" (linha {resultado.linha}, coluna {resultado.coluna})"
+    return f"{resultado.caminho}: erro {resultado.tipo_erro}{posicao}: {resultado.mensagem}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Verifica em paralelo as análises léxica, sintática e semântica de vários arquivos."
+    )
+    parser.add_argument(
+        "entradas", nargs="+", help="Arquivos, diretórios ou padrões glob"
+    )
+    parser.add_argument(
+        "-j",
+        "--trabalhadores",
+        type=int,
+        default=None,
+        help="Número de processos (padrão: número de CPUs)",
+    )
+    parser.add_argument(
+        "--lote",
+        type=int,
+        default=None,
+        help="Arquivos enviados a um processo por vez (padrão: automático)",
+    )
+    parser.add_argument(
+        "--padrao",
+        default="*.txt",
+        help="Padrão dos arquivos procurados dentro de diretórios (padrão: *.txt)",
+    )
+    parser.add_argument(
+        "--formato",
+        choices=("texto", "jsonl"),
+        default="texto",
+        help="Formato da saída: uma linha legível ou um objeto JSON por arquivo",
+    )
+    args = parser.parse_args()
+
+    caminhos = expandir_entradas(args.entradas, args.padrao)
+    falhas = 0
+    for resultado in verificar_em_lote(caminhos, args.trabalhadores, args.lote):
+        falhas += not resultado.sucesso
+        if args.formato == "jsonl":
+            print(json.dumps(resultado._asdict(), ensure_ascii=False))
+        else:
+            print(formatar_resultado(resultado))
+
+    if args.formato == "texto":
+        print(f"\n{len(caminhos)} arquivos, {len(caminhos) - falhas} sem erros, {falhas} com erros")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,51 @@
+from typing import Any, Callable, Dict, Iterator
+
+from abstract_syntax_tree import ASTNode
+
+
+def classes_nos(base: type = ASTNode) -> Iterator[type]:
+    for classe in base.__subclasses__():
+        yield classe
+        yield from classes_nos(classe)
+
+
+class TabelaDespacho(Dict[type, Callable[[Any, ASTNode], Any]]):
+    """Método de uma classe de visitante para cada classe de nó.
+
+    As classes de `abstract_syntax_tree` são resolvidas quando a classe do
+    visitante é criada; classes de nó definidas depois, na primeira vez em
+    que aparecem. Nós sem método próprio vão para o método genérico.
+    """
+
+    def __init__(self, visitante: type) -> None:
+        super().__init__()
+        self.visitante = visitante
+        for classe in classes_nos():
+            self[classe]
+
+    def __missing__(self, classe: type) -> Callable[[Any, ASTNode], Any]:
+        visitante = self.visitante
+        metodo = getattr(visitante, visitante.PREFIXO_METODO + classe.__name__, None)
+        if metodo is None:
+            metodo = getattr(visitante, visitante.METODO_GENERICO)
+        self[classe] = metodo
+        return metodo
+
+
+class Visitante:
+    """Base dos percursos da AST que despacham pelo nome da classe do nó
+    (`<PREFIXO_METODO><Classe>`).
+
+    Cada subclasse ganha a própria `despacho`, montada uma única vez quando a
+    classe é criada, de modo que métodos redefinidos em subclasses são
+    respeitados sem que cada visita monte o nome do método e chame `getattr`.
+    """
+
+    PREFIXO_METODO = "visitar_"
+    METODO_GENERICO = "visitante_generico"
+
+    despacho: TabelaDespacho
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.despacho = TabelaDespacho(cls)